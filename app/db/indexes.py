@@ -0,0 +1,360 @@
+"""
+Declarative index registry.
+
+Modules declare the indexes their queries rely on next to the
+collection they own::
+
+    register_indexes(
+        "orders",
+        IndexSpec("orders_customer_created", [("customerId", 1), ("createdAt", -1)]),
+    )
+
+``init_database`` applies every registered index at boot through
+``ensure_indexes``. Creation is idempotent: an index that already exists
+with the same name and options is left untouched.
+
+Indexes a module no longer uses are listed with ``retire_indexes``;
+``ensure_indexes`` drops them where they still exist::
+
+    retire_indexes("products", "products_text_search")
+
+Representative hot queries can be registered with ``register_query_probe``.
+The report mode diffs declared against actual indexes and runs
+``explain()`` on each probe, flagging plans that fall back to a
+collection scan::
+
+    python -m app.db.indexes
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from pymongo.errors import OperationFailure
+
+from app.db.mongo import db
+
+
+class IndexBuildError(RuntimeError):
+    """A unique index the application relies on is missing."""
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    keys: list[tuple[str, Any]]
+    unique: bool = False
+    sparse: bool = False
+    expire_after_seconds: Optional[int] = None
+    options: dict[str, Any] = field(default_factory=dict)
+
+    def create_kwargs(self) -> dict[str, Any]:
+        kwargs = {
+            "name": self.name,
+            **self.options,
+        }
+
+        if self.unique:
+            kwargs["unique"] = True
+        if self.sparse:
+            kwargs["sparse"] = True
+        if self.expire_after_seconds is not None:
+            kwargs["expireAfterSeconds"] = self.expire_after_seconds
+
+        return kwargs
+
+
+@dataclass(frozen=True)
+class QueryProbe:
+    collection: str
+    filter: dict[str, Any]
+    sort: Optional[list[tuple[str, Any]]] = None
+    description: str = ""
+
+
+_index_registry: dict[str, dict[str, IndexSpec]] = {}
+_retired_indexes: dict[str, set[str]] = {}
+_query_probes: list[QueryProbe] = []
+
+
+def register_indexes(collection_name: str, *specs: IndexSpec) -> None:
+    declared = _index_registry.setdefault(collection_name, {})
+
+    for spec in specs:
+        existing = declared.get(spec.name)
+
+        if existing is not None and existing != spec:
+            raise ValueError(
+                f"Index '{spec.name}' on '{collection_name}' is declared twice "
+                "with different definitions."
+            )
+
+        declared[spec.name] = spec
+
+
+def retire_indexes(collection_name: str, *names: str) -> None:
+    _retired_indexes.setdefault(collection_name, set()).update(names)
+
+
+def register_query_probe(
+    collection_name: str,
+    filter: dict[str, Any],
+    sort: Optional[list[tuple[str, Any]]] = None,
+    description: str = "",
+) -> None:
+    _query_probes.append(
+        QueryProbe(
+            collection=collection_name,
+            filter=filter,
+            sort=sort,
+            description=description,
+        )
+    )
+
+
+def declared_indexes() -> dict[str, list[IndexSpec]]:
+    return {
+        collection_name: list(specs.values())
+        for collection_name, specs in _index_registry.items()
+    }
+
+
+# ============================================================
+# APPLY
+# ============================================================
+
+
+async def ensure_indexes(database=db) -> None:
+    """
+    Drop every retired index, then create every registered one.
+
+    A conflicting definition (same name or keys with different
+    options) is reported and skipped so one stale index does not
+    block boot; run the report mode to inspect it.
+
+    Unique indexes are the exception: writes rely on them to reject
+    duplicates (one cart per owner, ...), so a unique index that
+    cannot be built, typically because existing documents already
+    collide, fails boot with `IndexBuildError` instead of leaving
+    the application running without the guarantee.
+    """
+
+    for collection_name, names in _retired_indexes.items():
+        collection = database[collection_name]
+
+        for name in sorted(names):
+            try:
+                await collection.drop_index(name)
+                print(f"🗑️ Index '{name}' on '{collection_name}' dropped.")
+
+            except OperationFailure as exc:
+                # NamespaceNotFound / IndexNotFound: already gone.
+                if exc.code not in (26, 27):
+                    print(
+                        f"⚠️ Index '{name}' on '{collection_name}' "
+                        f"was not dropped: {exc}"
+                    )
+
+    failed_unique = []
+
+    for collection_name, specs in declared_indexes().items():
+        collection = database[collection_name]
+
+        for spec in specs:
+            try:
+                await collection.create_index(
+                    spec.keys,
+                    **spec.create_kwargs(),
+                )
+
+            except OperationFailure as exc:
+                print(
+                    f"⚠️ Index '{spec.name}' on '{collection_name}' "
+                    f"was not applied: {exc}"
+                )
+
+                if spec.unique:
+                    failed_unique.append(f"{collection_name}.{spec.name}")
+
+    if failed_unique:
+        raise IndexBuildError(
+            "Unique indexes could not be built: "
+            f"{', '.join(failed_unique)}. Remove the duplicate documents "
+            "and restart."
+        )
+
+    print("✅ Indexes ensured.")
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+
+def _normalize_keys(keys) -> list[tuple[str, Any]]:
+    return [
+        (name, int(direction) if isinstance(direction, (int, float)) else direction)
+        for name, direction in keys
+    ]
+
+
+def _index_matches(spec: IndexSpec, actual: dict[str, Any]) -> bool:
+    if _normalize_keys(actual["key"].items()) != _normalize_keys(spec.keys):
+        return False
+
+    if bool(actual.get("unique")) != spec.unique:
+        return False
+
+    if bool(actual.get("sparse")) != spec.sparse:
+        return False
+
+    return actual.get("expireAfterSeconds") == spec.expire_after_seconds
+
+
+def _winning_stages(plan: dict[str, Any]) -> list[str]:
+    stages = []
+
+    while plan:
+        if "stage" in plan:
+            stages.append(plan["stage"])
+
+        if "inputStage" in plan:
+            plan = plan["inputStage"]
+        elif plan.get("inputStages"):
+            for child in plan["inputStages"]:
+                stages.extend(_winning_stages(child))
+            break
+        elif "queryPlan" in plan:
+            plan = plan["queryPlan"]
+        else:
+            break
+
+    return stages
+
+
+async def _explain(probe: QueryProbe) -> list[str]:
+    cursor = db[probe.collection].find(probe.filter)
+
+    if probe.sort:
+        cursor = cursor.sort(probe.sort)
+
+    explanation = await cursor.explain()
+    winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+
+    return _winning_stages(winning_plan)
+
+
+async def index_report() -> dict[str, Any]:
+    """
+    Diff declared against actual indexes and explain every query
+    probe.
+    """
+
+    collections = []
+
+    for collection_name, specs in declared_indexes().items():
+        actual = {
+            index["name"]: index
+            async for index in db[collection_name].list_indexes()
+        }
+
+        missing = []
+        mismatched = []
+
+        for spec in specs:
+            index = actual.get(spec.name)
+
+            if index is None:
+                missing.append(spec.name)
+            elif not _index_matches(spec, index):
+                mismatched.append(spec.name)
+
+        declared_names = {spec.name for spec in specs}
+
+        collections.append(
+            {
+                "collection": collection_name,
+                "missing": missing,
+                "mismatched": mismatched,
+                "undeclared": sorted(
+                    name
+                    for name in actual
+                    if name != "_id_" and name not in declared_names
+                ),
+            }
+        )
+
+    probes = []
+
+    for probe in _query_probes:
+        stages = await _explain(probe)
+
+        probes.append(
+            {
+                "collection": probe.collection,
+                "description": probe.description,
+                "stages": stages,
+                "collectionScan": "COLLSCAN" in stages,
+            }
+        )
+
+    return {
+        "collections": collections,
+        "probes": probes,
+    }
+
+
+def _print_report(report: dict[str, Any]) -> bool:
+    healthy = True
+
+    print("📋 Index report")
+
+    for entry in report["collections"]:
+        problems = [
+            (label, entry[key])
+            for label, key in (
+                ("missing", "missing"),
+                ("mismatched", "mismatched"),
+                ("undeclared", "undeclared"),
+            )
+            if entry[key]
+        ]
+
+        if entry["missing"] or entry["mismatched"]:
+            healthy = False
+
+        if not problems:
+            print(f"✅ {entry['collection']}")
+            continue
+
+        print(f"⚠️ {entry['collection']}")
+        for label, names in problems:
+            print(f"    {label}: {', '.join(names)}")
+
+    print("🔎 Query plans")
+
+    for probe in report["probes"]:
+        marker = "❌" if probe["collectionScan"] else "✅"
+        stages = " <- ".join(probe["stages"]) or "unknown"
+
+        if probe["collectionScan"]:
+            healthy = False
+
+        print(
+            f"{marker} {probe['collection']}: "
+            f"{probe['description'] or 'query'} [{stages}]"
+        )
+
+    return healthy
+
+
+async def _run_report() -> bool:
+    # Importing the routers imports every module, which registers
+    # their indexes and probes.
+    import core.routes  # noqa: F401
+
+    return _print_report(await index_report())
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(_run_report()) else 1)
@@ -0,0 +1,290 @@
+"""
+Server-side merge of line-item documents (carts, wishlists).
+
+A guest document is merged into its owner's document with one
+`find_one_and_delete` of the source and one pipeline update of the
+target, inside a transaction where the deployment supports it::
+
+    cart_merge = LineMerge(
+        cart_collection,
+        quantity_field="quantity",
+        max_quantity=999,
+        keep_fields=("customizedDetails",),
+        version_field="version",
+    )
+
+    cart = await cart_merge.merge(
+        source_filter={"guestCartId": "...", "customerId": None},
+        target_filter={"customerId": "...", "guestCartId": None},
+        prepare=validate_lines,
+    )
+
+Lines are reconciled by the database, so the target is never read
+into Python and rewritten. Concurrent writes to the target cannot be
+lost, and the cost of a merge does not grow with the target size on
+the application side.
+
+Benchmark against a read-modify-write merge (needs MongoDB)::
+
+    python -m benchmarks.line_merge
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+
+from app.db.mongo import client, supports_transactions
+
+
+# Values `keep_fields` treats as empty (Python's falsy values).
+EMPTY_VALUES = [None, "", {}, [], 0, False]
+
+PrepareLines = Callable[[list[dict[str, Any]]], Awaitable[list[dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class LineMerge:
+    """
+    How lines of two documents in `collection` are combined.
+
+    Lines match on `key_field`. For a matching line the target keeps
+    its own fields, except that `quantity_field` (when set) is summed
+    and capped at `max_quantity`, and empty `keep_fields` are filled
+    from the source. Source lines without a match are appended.
+
+    Without `quantity_field` the merge is a set union (wishlists).
+    `version_field`, when set, is incremented on every merge; a
+    missing version counts as 0, so a merge never leaves a document
+    at a version a client may already hold. `final_stages` run after
+    the lines are merged, to rebuild fields derived from them.
+    """
+
+    collection: Any
+    lines_field: str = "items"
+    key_field: str = "productId"
+    quantity_field: Optional[str] = None
+    max_quantity: Optional[int] = None
+    keep_fields: tuple[str, ...] = ()
+    version_field: Optional[str] = None
+    final_stages: tuple[dict[str, Any], ...] = ()
+
+    # --------------------------------------------------------
+    # PIPELINE
+    # --------------------------------------------------------
+
+    def collapse(self, lines: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Combine source lines that share a key, in first-seen order.
+        """
+        collapsed: dict[Any, dict[str, Any]] = {}
+
+        for line in lines:
+            key = line.get(self.key_field)
+            existing = collapsed.get(key)
+
+            if existing is None:
+                collapsed[key] = dict(line)
+                continue
+
+            if self.quantity_field:
+                existing[self.quantity_field] = self._cap(
+                    existing.get(self.quantity_field, 0)
+                    + line.get(self.quantity_field, 0)
+                )
+
+            for field in self.keep_fields:
+                if not existing.get(field) and line.get(field):
+                    existing[field] = line[field]
+
+        if self.quantity_field:
+            for line in collapsed.values():
+                line[self.quantity_field] = self._cap(
+                    line.get(self.quantity_field, 0)
+                )
+
+        return list(collapsed.values())
+
+    def _cap(self, quantity: int) -> int:
+        if self.max_quantity is None:
+            return quantity
+        return min(quantity, self.max_quantity)
+
+    def pipeline(
+        self,
+        lines: list[dict[str, Any]],
+        *,
+        now: datetime,
+        on_insert: Optional[dict[str, Any]] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Update pipeline that merges `lines` into the target.
+
+        Source lines are passed as a `$literal`, so user data such as
+        strings starting with `$` is never evaluated.
+        """
+        key = self.key_field
+        target_lines = {"$ifNull": [f"${self.lines_field}", []]}
+
+        match = {
+            "$arrayElemAt": [
+                {
+                    "$filter": {
+                        "input": "$_incoming",
+                        "cond": {"$eq": [f"$$this.{key}", f"$$line.{key}"]},
+                    }
+                },
+                0,
+            ]
+        }
+
+        # A keep field is empty when Python would call it falsy, as
+        # in `collapse()`.
+        merged_fields: dict[str, Any] = {
+            field: {
+                "$cond": [
+                    {
+                        "$in": [
+                            {"$ifNull": [f"$$line.{field}", None]},
+                            {"$literal": EMPTY_VALUES},
+                        ]
+                    },
+                    f"$$match.{field}",
+                    f"$$line.{field}",
+                ]
+            }
+            for field in self.keep_fields
+        }
+
+        if self.quantity_field:
+            total = {
+                "$add": [
+                    {"$ifNull": [f"$$line.{self.quantity_field}", 0]},
+                    f"$$match.{self.quantity_field}",
+                ]
+            }
+            merged_fields[self.quantity_field] = (
+                total
+                if self.max_quantity is None
+                else {"$min": [total, self.max_quantity]}
+            )
+
+        merged_existing = {
+            "$map": {
+                "input": target_lines,
+                "as": "line",
+                "in": {
+                    "$let": {
+                        "vars": {"match": match},
+                        "in": {
+                            "$cond": [
+                                {"$eq": [{"$type": "$$match"}, "missing"]},
+                                "$$line",
+                                {"$mergeObjects": ["$$line", merged_fields]},
+                            ]
+                        },
+                    }
+                },
+            }
+        }
+
+        new_lines = {
+            "$filter": {
+                "input": "$_incoming",
+                "cond": {
+                    "$not": [
+                        {
+                            "$in": [
+                                f"$$this.{key}",
+                                {"$ifNull": [f"${self.lines_field}.{key}", []]},
+                            ]
+                        }
+                    ]
+                },
+            }
+        }
+
+        changes: dict[str, Any] = {
+            self.lines_field: {"$concatArrays": [merged_existing, new_lines]},
+            "updatedAt": now,
+        }
+
+        for field, value in (on_insert or {}).items():
+            changes[field] = {"$ifNull": [f"${field}", {"$literal": value}]}
+
+        if self.version_field:
+            changes[self.version_field] = {
+                "$add": [{"$ifNull": [f"${self.version_field}", 0]}, 1]
+            }
+
+        return [
+            {"$set": {"_incoming": {"$literal": lines}}},
+            {"$set": changes},
+            {"$unset": "_incoming"},
+            *self.final_stages,
+        ]
+
+    # --------------------------------------------------------
+    # MERGE
+    # --------------------------------------------------------
+
+    async def merge(
+        self,
+        *,
+        source_filter: dict[str, Any],
+        target_filter: dict[str, Any],
+        prepare: Optional[PrepareLines] = None,
+        on_insert: Optional[dict[str, Any]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Move the source document's lines into the target.
+
+        The source is deleted and the target upserted. `prepare`
+        validates or reshapes the source lines; when it raises,
+        nothing changes. Returns the merged target, or None when
+        there is no source document.
+
+        On a standalone mongod the source is inserted again if the
+        target update fails.
+        """
+        now = datetime.now(timezone.utc)
+        on_insert = {"createdAt": now, **(on_insert or {})}
+
+        async def run(session=None) -> Optional[dict[str, Any]]:
+            source = await self.collection.find_one_and_delete(
+                source_filter,
+                session=session,
+            )
+
+            if source is None:
+                return None
+
+            try:
+                lines = source.get(self.lines_field) or []
+
+                if prepare is not None:
+                    lines = await prepare(lines)
+
+                return await self.collection.find_one_and_update(
+                    target_filter,
+                    self.pipeline(
+                        self.collapse(lines),
+                        now=now,
+                        on_insert=on_insert,
+                    ),
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    session=session,
+                )
+            except Exception:
+                if session is None:
+                    await self.collection.insert_one(source)
+                raise
+
+        if await supports_transactions():
+            async with await client.start_session() as session:
+                return await session.with_transaction(run)
+
+        return await run()
+
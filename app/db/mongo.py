@@ -1,17 +1,198 @@
-import os
+"""
+Managed MongoDB client.
+
+The client is built at import so modules can bind collections at
+module level, but it does not connect until first use. The lifespan
+calls `connect_database()` to verify the server at startup and
+`close_database()` on shutdown.
+
+Pool limits, timeouts and wire compression come from `Settings`.
+Storefront catalog reads can be routed to secondaries with
+`MONGO_CATALOG_READ_PREFERENCE` via `catalog_collection()`.
+"""
+
 import certifi
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
+
+from app.db.query_metrics import command_metrics
+from app.utils.latency_histogram import LatencyHistogram
+from config import settings
+
+
+MONGO_URL = settings.MONGO_URL or "mongodb://localhost:27017"
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+# ============================================================
+# POOL METRICS
+# ============================================================
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters and checkout wait times."""
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkout_failures: dict[str, int] = {}
+        self.pool_clears = 0
+        self.checkout_wait = LatencyHistogram(
+            buckets_ms=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+        )
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        reason = str(event.reason)
+        self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+        # `duration` (seconds) is reported by PyMongo 4.7+.
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            self.checkout_wait.observe(duration * 1000)
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def stats(self) -> dict:
+        return {
+            "open": self.created - self.closed,
+            "created": self.created,
+            "closed": self.closed,
+            "checkedOut": self.checked_out,
+            "maxCheckedOut": self.max_checked_out,
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "poolClears": self.pool_clears,
+            "checkoutFailures": dict(self.checkout_failures),
+            "checkoutWait": self.checkout_wait.snapshot(),
+        }
 
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 
-print("MongoDB URL:", MONGO_URL)
+pool_metrics = PoolMetrics()
 
-if MONGO_URL.startswith("mongodb+srv://"):
-    client = AsyncIOMotorClient(
-        MONGO_URL,
-        tlsCAFile=certifi.where()
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_metrics, command_metrics],
+    }
+
+    compressors = [
+        name.strip()
+        for name in settings.MONGO_COMPRESSORS.split(",")
+        if name.strip()
+    ]
+    if compressors:
+        # The server picks the first one both sides support;
+        # zstd and snappy need the zstandard / python-snappy packages.
+        options["compressors"] = compressors
+
+    if MONGO_URL.startswith("mongodb+srv://"):
+        options["tlsCAFile"] = certifi.where()
+
+    return options
+
+
+client = AsyncIOMotorClient(MONGO_URL, **_client_options())
+
+db = client[settings.MONGO_DB_NAME]
+
+_catalog_read_preference = READ_PREFERENCES[settings.MONGO_CATALOG_READ_PREFERENCE]
+
+
+def catalog_collection(name: str):
+    """
+    Collection handle for storefront catalog reads, which tolerate
+    replication lag. Writes must go through `db[name]`.
+    """
+    return db.get_collection(
+        name,
+        read_preference=_catalog_read_preference,
     )
-else:
-    client = AsyncIOMotorClient(MONGO_URL)
 
-db = client["artisanstudios_db"]
+
+def _redacted_url() -> str:
+    """MONGO_URL without credentials, database or options."""
+    scheme, _, rest = MONGO_URL.partition("://")
+    hosts = rest.rpartition("@")[2].split("/", 1)[0].split("?", 1)[0]
+    return f"{scheme}://{hosts}"
+
+
+_supports_transactions: bool | None = None
+
+
+async def supports_transactions() -> bool:
+    """
+    Whether the deployment accepts multi-document transactions
+    (replica set or sharded cluster, not a standalone mongod).
+    """
+    global _supports_transactions
+
+    if _supports_transactions is None:
+        hello = await client.admin.command("hello")
+        _supports_transactions = bool(
+            hello.get("setName") or hello.get("msg") == "isdbgrid"
+        )
+
+    return _supports_transactions
+
+
+# ============================================================
+# LIFESPAN
+# ============================================================
+
+
+async def connect_database() -> None:
+    await client.admin.command("ping")
+    print(f"✅ Connected to MongoDB at {_redacted_url()} ({settings.MONGO_DB_NAME})")
+
+
+def close_database() -> None:
+    client.close()
+    print("🔌 MongoDB connection closed.")
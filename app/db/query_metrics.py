@@ -0,0 +1,252 @@
+"""
+Per-request MongoDB command accounting.
+
+A PyMongo `CommandListener` attributes every command to the request
+that issued it through a context variable. Motor copies the caller's
+context into its executor threads, so the listener sees the request
+that awaited the operation.
+
+Per request it records command count and total server time, plus
+reply bytes with `QUERY_METRICS_BYTES`. PyMongo does not report the
+wire size, so counting bytes re-encodes every reply; it is off by
+default. `QueryMetricsMiddleware` folds each request into per-route
+totals and, with `QUERY_METRICS_HEADERS`, returns them as
+`X-DB-Queries` / `X-DB-Time-Ms` (and `X-DB-Bytes` when counted). Commands slower than
+`MONGO_SLOW_COMMAND_MS` are logged with the shape of their filter
+(values replaced by "?").
+
+Query budgets can be asserted in tests::
+
+    with track_queries() as queries:
+        await merge_guest_cart(...)
+    assert queries.count <= 6
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import bson
+from pymongo import monitoring
+
+from config import settings
+
+
+class QueryStats:
+    """Command totals for one request or one `track_queries` block."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.duration_ms = 0.0
+        self.bytes = 0
+        self.commands: dict[str, int] = {}
+
+    def record(self, command_name: str, duration_ms: float, size: int) -> None:
+        # Commands of one request can finish on several executor
+        # threads at once (asyncio.gather).
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.bytes += size
+            self.commands[command_name] = self.commands.get(command_name, 0) + 1
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("mongo_query_stats", default=None)
+
+
+@contextmanager
+def track_queries():
+    stats = QueryStats()
+    token = _current.set(stats)
+
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+# ============================================================
+# FILTER SHAPE
+# ============================================================
+
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+
+
+def _shape(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        # Operator lists ($and/$or/$in) keep their structure,
+        # plain value lists collapse.
+        shapes = [_shape(item) for item in value[:3]]
+        return shapes if any(isinstance(item, dict) for item in shapes) else "?"
+
+    return "?"
+
+
+def filter_shape(command_name: str, command: dict) -> Any:
+    if command_name in _FILTER_FIELDS:
+        return _shape(command.get(_FILTER_FIELDS[command_name], {}))
+
+    if command_name in ("update", "delete"):
+        statements = command.get(f"{command_name}s") or [{}]
+        return _shape(statements[0].get("q", {}))
+
+    if command_name == "aggregate":
+        return [
+            {stage: _shape(body) if stage == "$match" else "…"}
+            for pipeline_stage in command.get("pipeline", [])
+            for stage, body in pipeline_stage.items()
+        ]
+
+    return None
+
+
+# ============================================================
+# LISTENER
+# ============================================================
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self, slow_command_ms: int, count_bytes: bool = False):
+        self.slow_command_ms = slow_command_ms
+        self.count_bytes = count_bytes
+        self._started: dict[tuple, tuple[Optional[QueryStats], str, dict]] = {}
+        self.slow_commands: deque[dict] = deque(maxlen=50)
+
+    def started(self, event):
+        self._started[(event.request_id, event.connection_id)] = (
+            _current.get(),
+            event.command.get(event.command_name),
+            event.command,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, len(bson.encode(event.reply)) if self.count_bytes else 0)
+
+    def failed(self, event):
+        self._finish(event, 0)
+
+    def _finish(self, event, size: int) -> None:
+        stats, collection, command = self._started.pop(
+            (event.request_id, event.connection_id),
+            (None, None, {}),
+        )
+        duration_ms = event.duration_micros / 1000
+
+        if stats is not None:
+            stats.record(event.command_name, duration_ms, size)
+
+        if duration_ms >= self.slow_command_ms:
+            entry = {
+                "command": event.command_name,
+                "collection": collection if isinstance(collection, str) else None,
+                "durationMs": round(duration_ms, 2),
+                "filter": filter_shape(event.command_name, command),
+                "at": datetime.now(timezone.utc),
+            }
+            self.slow_commands.append(entry)
+            print(
+                f"🐢 Slow Mongo {entry['command']} on {entry['collection']}: "
+                f"{entry['durationMs']} ms, filter {entry['filter']}"
+            )
+
+
+command_metrics = CommandMetrics(
+    slow_command_ms=settings.MONGO_SLOW_COMMAND_MS,
+    count_bytes=settings.QUERY_METRICS_BYTES,
+)
+
+
+# ============================================================
+# ROUTE TOTALS
+# ============================================================
+
+
+class RouteTotals:
+    def __init__(self):
+        self.requests = 0
+        self.count = 0
+        self.duration_ms = 0.0
+        self.bytes = 0
+        self.max_count = 0
+
+    def add(self, stats: QueryStats) -> None:
+        self.requests += 1
+        self.count += stats.count
+        self.duration_ms += stats.duration_ms
+        self.bytes += stats.bytes
+        self.max_count = max(self.max_count, stats.count)
+
+    def snapshot(self) -> dict[str, Any]:
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "commands": self.count,
+            "avgCommands": round(self.count / requests, 2),
+            "maxCommands": self.max_count,
+            "avgDbMs": round(self.duration_ms / requests, 2),
+            "avgBytes": self.bytes // requests,
+        }
+
+
+route_totals: dict[str, RouteTotals] = {}
+
+
+def query_stats() -> dict[str, Any]:
+    return {
+        "routes": {
+            route: totals.snapshot()
+            for route, totals in sorted(route_totals.items())
+        },
+        "slowCommands": list(command_metrics.slow_commands),
+    }
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware that scopes command accounting to a request."""
+
+    def __init__(self, app, headers: bool = False):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.headers:
+                headers = [
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.duration_ms:.2f}".encode()),
+                ]
+                if command_metrics.count_bytes:
+                    headers.append((b"x-db-bytes", str(stats.bytes).encode()))
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+
+            # FastAPI stores the matched route in the scope, so
+            # totals group by path template, not by concrete URL.
+            route = scope.get("route")
+            if route is not None and stats.count:
+                key = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+                route_totals.setdefault(key, RouteTotals()).add(stats)
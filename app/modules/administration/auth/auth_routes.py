@@ -2,14 +2,16 @@ import uuid
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Body, Cookie
 from datetime import datetime, timedelta, timezone
+from app.db.indexes import IndexSpec, register_indexes
 from app.db.mongo import db
 
 from app.modules.administration.auth.schemas.auth_schemas import ForgotPasswordRequest, LoginRequest, ResetPasswordRequest, TokenResponse
 from app.modules.administration.user.schemas.users import UserIn, UserOut
 from app.modules.administration.user.schemas.users import AppInitOut, ChangePasswordRequest, UpdateUserProfileRequest
 from app.modules.administration.user.services.user_service import get_user_with_permissions
-from app.services.mail_service import send_email
-from app.utils.auth_utils import create_access_token, create_refresh_token, decode_token, authenticate, hash_password, verify_password
+from app.services.auth.password_service import password_service
+from app.services.mail_outbox import mail_outbox
+from app.utils.auth_utils import create_access_token, create_refresh_token, decode_token, authenticate
 from core.sanitize import stringify_object_ids
 from config import settings
 
@@ -18,6 +20,19 @@ router = APIRouter()  # ✅ no global dependency
 users_collection = db["users"]
 reset_tokens_collection = db["reset_tokens"]
 
+register_indexes(
+    "users",
+    IndexSpec("users_username", [("userName", 1)]),
+    IndexSpec("users_email", [("emailAddress", 1)]),
+)
+register_indexes(
+    "reset_tokens",
+    IndexSpec("reset_tokens_token", [("token", 1)]),
+    # Expired tokens are removed by MongoDB; reset_password still
+    # checks expiresAt because the TTL monitor runs about once a minute.
+    IndexSpec("reset_tokens_expiry", [("expiresAt", 1)], expire_after_seconds=0),
+)
+
 # -------------------- Public Routes -------------------- #
 #region
 @router.post("/login")
@@ -26,9 +41,20 @@ async def login(data: LoginRequest, response: Response):
         {"$or": [{"userName": data.userName}, {"emailAddress": data.userName}]}
     )
 
-    if not user or not verify_password(data.password, user.get("password", "")):
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    valid, new_hash = await password_service.verify_and_update(data.password, user.get("password"))
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    if new_hash:
+        # Stored hash uses outdated bcrypt parameters; upgrade it while we have the password.
+        await users_collection.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": {"password": new_hash}},
+        )
+
     if not user.get("isActive", False):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not active")
 
@@ -122,7 +148,7 @@ async def forgot_password(data: ForgotPasswordRequest):
         "CRM Team, Artisan Studios"
     )
 
-    send_email(
+    await mail_outbox.enqueue(
         subject="Password Reset Request",
         recipients=user["emailAddress"],
         body=email_body
@@ -143,7 +169,7 @@ async def reset_password(data: ResetPasswordRequest):
     if expiresAt < datetime.now(timezone.utc):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token expired")
 
-    hashed_pw = hash_password(data.newPassword)
+    hashed_pw = await password_service.hash(data.newPassword)
     await users_collection.update_one({"_id": ObjectId(token_doc["userId"])}, {"$set": {"password": hashed_pw}})
     await reset_tokens_collection.delete_one({"_id": token_doc["_id"]})
 
@@ -161,10 +187,10 @@ async def change_password(id: str, request: ChangePasswordRequest, user=Depends(
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    if not verify_password(request.currentPassword, db_user.get("password", "")):
+    if not await password_service.verify(request.currentPassword, db_user.get("password")):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
 
-    hashed_password = hash_password(request.newPassword)
+    hashed_password = await password_service.hash(request.newPassword)
     await users_collection.update_one({"_id": ObjectId(id)}, {"$set": {"password": hashed_password}})
 
     return {"message": "Password updated successfully"}
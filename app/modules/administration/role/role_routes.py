@@ -1,8 +1,8 @@
+import re
 from datetime import datetime, timezone
 from typing import List
 from bson import ObjectId
 from fastapi import APIRouter, Body, Depends, HTTPException
-from math import ceil
 from app.modules.administration.role.schemas.roles import (
     GetRolesFilterIn,
     RoleIn,
@@ -12,6 +12,7 @@ from app.modules.administration.role.schemas.roles import (
 )
 from app.utils.auth_utils import authenticate
 from app.utils.generate_unique_id_util import generate_role_code
+from app.utils.pagination import paginate
 from core.sanitize import stringify_object_ids
 from app.db.mongo import db
 
@@ -28,39 +29,34 @@ async def list_roles(filters: GetRolesFilterIn = Body(...)):
     # Only fetch non-deleted roles
     query = {"$or": [{"isDeleted": {"$exists": False}}, {"isDeleted": False}]}
 
+    # Search in MongoDB so pages and cursors stay full
+    if filters.searchText:
+        regex = {"$regex": re.escape(filters.searchText), "$options": "i"}
+        query = {
+            "$and": [
+                query,
+                {"$or": [{"name": regex}, {"displayName": regex}]},
+            ]
+        }
+
     # Determine sort order (using creationTime for now)
     sort_order = -1 if filters.sort == "newest" else 1
 
-    # Count total docs
-    total = await collection.count_documents(query)
-
     # Apply pagination and sorting
-    skip = (filters.page - 1) * filters.pageSize
-    cursor = (
-        collection.find(query)
-        .sort("creationTime", sort_order)
-        .skip(skip)
-        .limit(filters.pageSize)
+    result = await paginate(
+        collection,
+        query,
+        page=filters.page,
+        page_size=filters.pageSize,
+        sort_field="creationTime",
+        sort_order=sort_order,
+        after=filters.after,
+        total_mode=filters.totalMode,
     )
 
-    roles = []
-    async for doc in cursor:
-        if filters.searchText:
-            ql = filters.searchText.lower()
-            if not (
-                (ql in (doc.get("name") or "").lower())
-                or (ql in (doc.get("displayName") or "").lower())
-            ):
-                continue
-
-        roles.append(stringify_object_ids(doc))
-
     return {
-        "total": total,
-        "page": filters.page,
-        "pageSize": filters.pageSize,
-        "pages": ceil(total / filters.pageSize) if total > 0 else 1,
-        "items": roles,
+        **result,
+        "items": [stringify_object_ids(doc) for doc in result["items"]],
     }
 
 # ✅ Get All Roles ----------
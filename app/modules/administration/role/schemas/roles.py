@@ -2,9 +2,11 @@ from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
+from app.utils.pagination import CursorPageIn
+
 
 # ---------- Filter ----------
-class GetRolesFilterIn(BaseModel):
+class GetRolesFilterIn(CursorPageIn):
     page: int = 1
     pageSize: int = 10
     searchText: Optional[str] = None
@@ -40,8 +42,9 @@ class RoleWithPermissions(BaseModel):
 
 # ---------- Paginated ----------
 class PaginatedRolesOut(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
-    pages: int
+    pages: Optional[int] = None
     items: List[RoleOut]
+    nextCursor: Optional[str] = None
@@ -2,12 +2,14 @@ from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
+from app.utils.pagination import CursorPageIn
+
 from app.modules.administration.organisation_units.schemas.organisation_units import OrganisationUnitOut
 from app.modules.administration.role.schemas.roles import RoleIn, RoleOut
 
 
 # ---------- Filter ----------
-class GetUsersFilterIn(BaseModel):
+class GetUsersFilterIn(CursorPageIn):
     page: int = 1
     pageSize: int = 10
     searchText: Optional[str] = None
@@ -71,11 +73,12 @@ class UserWithPermissionsOut(BaseModel):
 
 # ---------- Pagination ----------
 class PaginatedUsersOut(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
-    pages: int
+    pages: Optional[int] = None
     items: List[UserOut]
+    nextCursor: Optional[str] = None
 
 # --------- user-permission --------
 
@@ -5,7 +5,8 @@ from app.db.mongo import db
 from app.modules.administration.organisation_units.schemas.organisation_units import OrganisationUnitOut
 from app.modules.administration.user.schemas.users import UserIn, UserOut, UserWithPermissionsOut
 from app.modules.administration.role.schemas.roles import RoleOut
-from app.utils.auth_utils import generate_random_password, hash_password
+from app.services.auth.password_service import password_service
+from app.utils.auth_utils import generate_random_password
 from core.sanitize import sanitize_user, stringify_object_ids
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorCollection
@@ -19,7 +20,7 @@ roles_collection = db["roles"]
 org_units_collection = db["organisation_units"]
 
 
-def handle_password_logic(user_data: UserIn, is_update: bool = False) -> UserIn:
+async def handle_password_logic(user_data: UserIn, is_update: bool = False) -> UserIn:
     """
     Handle password logic for both add and update cases.
     - On create: ensures password is set if provided, or can generate random.
@@ -35,12 +36,12 @@ def handle_password_logic(user_data: UserIn, is_update: bool = False) -> UserIn:
         # Always override with random password
         random_password = generate_random_password()
         update_data["tempPassword"] = random_password
-        update_data["password"] = hash_password(random_password)
+        update_data["password"] = await password_service.hash(random_password)
         update_data["shouldChangePasswordOnNextLogin"] = True
 
     elif password:
         # Hash password if provided
-        update_data["password"] = hash_password(password)
+        update_data["password"] = await password_service.hash(password)
 
     else:
         # In update mode, don’t overwrite password if not provided
@@ -2,7 +2,6 @@ from datetime import datetime, timezone
 from typing import Optional
 from bson import ObjectId
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from math import ceil
 
 from app.modules.administration.user.schemas.users import (
     GetUsersFilterIn,
@@ -15,6 +14,7 @@ from app.modules.administration.user.schemas.users import (
 from app.modules.administration.role.services.role_service import get_roles_by_ids
 from app.modules.administration.user.services.user_service import ensure_unique_user, get_user_with_permissions, handle_password_logic
 from app.utils.auth_utils import authenticate, generate_random_password, hash_password
+from app.utils.pagination import paginate
 from core.sanitize import sanitize_user, stringify_object_ids
 from app.db.mongo import db
 
@@ -24,7 +24,6 @@ roles_collection = db["roles"]
 org_units_collection = db["organisation_units"]
 
 
-from math import ceil
 from fastapi import Body, APIRouter
 
 router = APIRouter(
@@ -50,28 +49,22 @@ async def list_users(filters: GetUsersFilterIn = Body(...)):
     # Determine sort order
     sort_order = -1 if filters.sort == "newest" else 1
 
-    # Count total docs
-    total = await collection.count_documents(query)
-
     # Apply pagination + exclude password at DB level
-    skip = (filters.page - 1) * filters.pageSize
-    cursor = (
-        collection.find(query, projection={"password": 0, "tempPassword": 0})  # ✅ exclude password
-        .sort("creationTime", sort_order)
-        .skip(skip)
-        .limit(filters.pageSize)
+    result = await paginate(
+        collection,
+        query,
+        page=filters.page,
+        page_size=filters.pageSize,
+        sort_field="creationTime",
+        sort_order=sort_order,
+        after=filters.after,
+        total_mode=filters.totalMode,
+        projection={"password": 0, "tempPassword": 0},  # ✅ exclude password
     )
 
-    users = []
-    async for doc in cursor:
-        users.append(stringify_object_ids(doc))
-
     return {
-        "total": total,
-        "page": filters.page,
-        "pageSize": filters.pageSize,
-        "pages": ceil(total / filters.pageSize) if total > 0 else 1,
-        "items": users,
+        **result,
+        "items": [stringify_object_ids(doc) for doc in result["items"]],
     }
 
 # ✅ Create User ----------
@@ -80,7 +73,7 @@ async def create_user(user_with_permissions: UserWithPermissionsIn = Body(...)):
 
     now = datetime.now(timezone.utc)
     new_user_doc = user_with_permissions.user.model_dump()
-    new_user_doc = handle_password_logic(new_user_doc, is_update=False)
+    new_user_doc = await handle_password_logic(new_user_doc, is_update=False)
     new_user_doc["grantedRoles"] = user_with_permissions.grantedRoles or []
     new_user_doc["creationTime"] = now
     new_user_doc["lastModificationTime"] = None
@@ -117,7 +110,7 @@ async def update_user(id: str, user_with_permissions: UserWithPermissionsIn = Bo
     await ensure_unique_user(collection, update_data, exclude_id=id)
 
     # ✅ Handle password separately
-    update_data = handle_password_logic(update_data, is_update=True)
+    update_data = await handle_password_logic(update_data, is_update=True)
     
     update_data["grantedRoles"] = user_with_permissions.grantedRoles or []
     update_data["lastModificationTime"] = datetime.now(timezone.utc)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Response, status
 from bson import ObjectId
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from uuid import uuid4
 
+from app.db.indexes import IndexSpec, register_indexes, register_query_probe
+from app.db.line_merge import LineMerge
 from app.db.mongo import db
 from app.modules.cart.schemas.cart import (
     AddCartItemIn,
@@ -12,13 +18,42 @@ from app.modules.cart.schemas.cart import (
     ClearCartIn,
 )
 from app.modules.products.schemas.product import ProductIn
-from app.utils.pricing import calculate_item_pricing
+from app.modules.products.service.product_cache import product_cache
+from app.utils.pricing import calculate_item_pricing, pricing_version
+from app.utils.server_timing import ServerTiming
+
 
 router = APIRouter()
 
 cart_collection = db["carts"]
 products_collection = db["products"]
 
+MAX_LINE_QUANTITY = 999
+
+register_indexes(
+    "carts",
+    # One cart per owner, so concurrent first writes cannot
+    # create duplicates. Partial: the other owner field is null.
+    IndexSpec(
+        "carts_customer_unique",
+        [("customerId", 1)],
+        unique=True,
+        options={"partialFilterExpression": {"customerId": {"$type": "string"}}},
+    ),
+    IndexSpec(
+        "carts_guest_unique",
+        [("guestCartId", 1)],
+        unique=True,
+        options={"partialFilterExpression": {"guestCartId": {"$type": "string"}}},
+    ),
+)
+
+register_query_probe(
+    "carts",
+    {"guestCartId": "probe", "customerId": None},
+    description="guest cart lookup",
+)
+
 
 # ============================================================
 # Helpers
@@ -98,10 +133,10 @@ def validate_quantity(quantity: int):
             detail="Quantity must be at least 1.",
         )
 
-    if quantity > 999:
+    if quantity > MAX_LINE_QUANTITY:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Quantity cannot exceed 999.",
+            detail=f"Quantity cannot exceed {MAX_LINE_QUANTITY}.",
         )
 
 
@@ -116,13 +151,61 @@ async def get_product(product_id: str):
             detail="Invalid product ID.",
         )
 
-    product = await products_collection.find_one(
-        {
-            "_id": ObjectId(product_id),
-            "status": "published",
-        }
+    product = await product_cache.get(
+        ObjectId(product_id)
+    )
+
+    if not product or product.get("status") != "published":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found.",
+        )
+
+    return product
+
+
+async def get_products(product_ids: list[str]) -> dict[str, dict]:
+    """
+    Fetch published products for many cart lines.
+
+    Served from the product cache; all misses are loaded
+    with a single `$in` query.
+
+    Returns a map of product id -> product. Invalid, unpublished
+    and deleted products are simply missing from the map.
+    """
+
+    products = await product_cache.get_many(
+        ObjectId(product_id)
+        for product_id in product_ids
+        if product_id and ObjectId.is_valid(product_id)
     )
 
+    return {
+        str(product_id): product
+        for product_id, product in products.items()
+        if product.get("status") == "published"
+    }
+
+
+def require_product(
+    products: dict[str, dict],
+    product_id: str,
+) -> dict:
+    """
+    Look up a product preloaded by `get_products`.
+
+    Raises the same errors as `get_product`.
+    """
+
+    if not product_id or not ObjectId.is_valid(product_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid product ID.",
+        )
+
+    product = products.get(product_id)
+
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,21 +254,432 @@ def get_product_discount(product: ProductIn) -> dict:
     }
 
 
+# ============================================================
+# Priced Line Snapshots
+# ============================================================
+
+# Keep the cart response summary in this order.
+_SUMMARY_FIELDS = (
+    "totalItems",
+    "totalQuantity",
+    "mrp",
+    "discount",
+    "subtotal",
+    "shipping",
+    "totalTax",
+    "taxToAdd",
+    "miscCharges",
+    "grandTotal",
+)
+
+# Strong references for fire-and-forget snapshot writes.
+_snapshot_tasks: set[asyncio.Task] = set()
+
+
+def is_snapshot_fresh(
+    snapshot: dict | None,
+    product: dict,
+    quantity: int,
+) -> bool:
+    """
+    A snapshot stays valid while the product's `pricing_version`
+    and the line quantity are unchanged.
+
+    This is the same price-change check checkout and quotes use.
+    `updatedAt` is not used: any product edit bumps it, including
+    ones that do not affect pricing.
+    """
+
+    if not snapshot:
+        return False
+
+    return (
+        snapshot.get("quantity") == quantity
+        and snapshot.get("pricingVersion") == pricing_version(product)
+    )
+
+
+def cart_line_details(product: dict) -> dict:
+    """
+    Display fields of a cart line.
+
+    Read from the current product on every response, so they
+    are not part of the priced snapshot.
+    """
+
+    media = product.get("media") or []
+
+    image = None
+
+    if (
+        media
+        and isinstance(media, list)
+        and isinstance(media[0], dict)
+    ):
+        image = media[0].get("url")
+
+    return {
+        "name": product.get("name"),
+
+        "description": product.get(
+            "description"
+        ),
+
+        "image": image,
+    }
+
+
+def price_cart_line(
+    product: dict,
+    quantity: int,
+) -> dict:
+    """
+    Price one cart line from the current product.
+
+    Returns the snapshot stored on the cart line: the priced
+    response fields, plus the line totals the summary is built
+    from. Raises ValueError for invalid pricing.
+    """
+
+    pricing = calculate_item_pricing(
+        product,
+        quantity,
+    )
+
+    # ========================================================
+    # IMPORTANT
+    # ========================================================
+    #
+    # pricing["mrp"]              = total MRP
+    # pricing["discount"]         = float
+    # pricing["subtotal"]         = total selling price
+    # pricing["taxAmount"]        = total tax
+    # pricing["excludedTaxAmount"] = tax to add
+    #
+    # Do NOT multiply these values by quantity again.
+    # ========================================================
+
+    # --------------------------------------------------------
+    # Product tax
+    # --------------------------------------------------------
+
+    tax = pricing.get("tax") or {}
+
+    line = {
+        "price": {
+            # ----------------------------------------
+            # UNIT prices
+            # ----------------------------------------
+
+            "mrp": round(
+                float(
+                    pricing.get(
+                        "unitMrp",
+                        0,
+                    )
+                ),
+                2,
+            ),
+
+            "sellingPrice": round(
+                float(
+                    pricing.get(
+                        "unitSellingPrice",
+                        0,
+                    )
+                ),
+                2,
+            ),
+
+            # ----------------------------------------
+            # Configured discount
+            # ----------------------------------------
+
+            "discount": get_product_discount(
+                product
+            ),
+
+            # ----------------------------------------
+            # Tax
+            # ----------------------------------------
+
+            "tax": {
+                "rate": float(
+                    tax.get(
+                        "rate",
+                        0,
+                    )
+                ),
+
+                "included": bool(
+                    tax.get(
+                        "included",
+                        False,
+                    )
+                ),
+
+                "className": tax.get(
+                    "className"
+                ),
+
+                # This is the TOTAL tax
+                # for this line.
+                "amount": round(
+                    float(
+                        tax.get(
+                            "amount",
+                            0,
+                        )
+                    ),
+                    2,
+                ),
+            },
+        },
+
+        # ------------------------------------------------
+        # Total item selling price before excluded tax.
+        #
+        # Example:
+        #
+        # unit selling price = 100
+        # quantity = 3
+        #
+        # itemTotal = 300
+        # ------------------------------------------------
+
+        "itemTotal": round(
+            float(
+                pricing["subtotal"]
+            ),
+            2,
+        ),
+    }
+
+    return {
+        "pricingVersion": pricing_version(product),
+        "quantity": quantity,
+        "line": line,
+        "totals": {
+            "quantity": quantity,
+            "mrp": float(pricing["mrp"]),
+            "discount": float(pricing["discount"]),
+            "subtotal": float(pricing["subtotal"]),
+            "taxAmount": float(pricing["taxAmount"]),
+            "excludedTaxAmount": float(pricing["excludedTaxAmount"]),
+        },
+    }
+
+
+def summarize_lines(
+    line_totals: list[dict],
+) -> dict:
+    """Build the cart summary from per-line totals."""
+
+    mrp_total = sum(line["mrp"] for line in line_totals)
+    discount_total = sum(line["discount"] for line in line_totals)
+    subtotal = sum(line["subtotal"] for line in line_totals)
+    tax_total = sum(line["taxAmount"] for line in line_totals)
+    excluded_tax_total = sum(line["excludedTaxAmount"] for line in line_totals)
+
+    # TODO:
+    # Replace these with your actual shipping/misc calculation
+    # when those rules are implemented.
+
+    shipping = 0.0
+    misc_charges = 0.0
+
+    grand_total = (
+        subtotal
+        + excluded_tax_total
+        + shipping
+        + misc_charges
+    )
+
+    values = {
+        "totalItems": len(line_totals),
+        "totalQuantity": sum(line["quantity"] for line in line_totals),
+        "mrp": round(mrp_total, 2),
+        "discount": round(discount_total, 2),
+        "subtotal": round(subtotal, 2),
+        "shipping": round(shipping, 2),
+        "totalTax": round(tax_total, 2),
+        "taxToAdd": round(excluded_tax_total, 2),
+        "miscCharges": round(misc_charges, 2),
+        "grandTotal": round(grand_total, 2),
+    }
+
+    return {
+        field: values[field]
+        for field in _SUMMARY_FIELDS
+    }
+
+
+def summary_stage() -> dict:
+    """
+    Pipeline stage that rebuilds `summary` from the line snapshots.
+
+    Runs as the last stage of every cart mutation, so the summary
+    is written with the lines and tagged with the new version.
+    When a line has no snapshot for its current quantity (an
+    incremented line, merged lines), `summary` is removed and the
+    next read prices the cart.
+
+    Line totals are already rounded to 2 places, so summing them
+    here gives the same result as `summarize_lines`.
+    """
+
+    items = {"$ifNull": ["$items", []]}
+
+    def total(field: str) -> dict:
+        return {"$sum": f"$items.priced.totals.{field}"}
+
+    subtotal = total("subtotal")
+    excluded_tax = total("excludedTaxAmount")
+
+    # Shipping and misc charges are 0 until `summarize_lines`
+    # implements them.
+    values = {
+        "totalItems": {"$size": items},
+        "totalQuantity": {"$sum": "$items.quantity"},
+        "mrp": {"$round": [total("mrp"), 2]},
+        "discount": {"$round": [total("discount"), 2]},
+        "subtotal": {"$round": [subtotal, 2]},
+        "shipping": 0.0,
+        "totalTax": {"$round": [total("taxAmount"), 2]},
+        "taxToAdd": {"$round": [excluded_tax, 2]},
+        "miscCharges": 0.0,
+        "grandTotal": {"$round": [{"$add": [subtotal, excluded_tax]}, 2]},
+    }
+
+    all_priced = {
+        "$allElementsTrue": [
+            {
+                "$map": {
+                    "input": items,
+                    "in": {"$eq": ["$$this.priced.quantity", "$$this.quantity"]},
+                }
+            }
+        ]
+    }
+
+    return {
+        "$set": {
+            "summary": {
+                "$cond": [
+                    all_priced,
+                    {
+                        **{field: values[field] for field in _SUMMARY_FIELDS},
+                        "version": "$version",
+                    },
+                    "$$REMOVE",
+                ]
+            }
+        }
+    }
+
+
+# The summary stage keeps `summary` in step with the merged
+# lines. Merged and appended lines have no snapshot for their new
+# quantity, so it is dropped and the next read prices the cart.
+cart_merge = LineMerge(
+    cart_collection,
+    quantity_field="quantity",
+    max_quantity=MAX_LINE_QUANTITY,
+    keep_fields=("customizedDetails",),
+    version_field="version",
+    final_stages=(summary_stage(),),
+)
+
+
+async def save_snapshots(
+    cart: dict,
+    repriced: dict[int, dict],
+    summary: dict | None,
+) -> None:
+    """
+    Store refreshed line snapshots and the summary on the cart.
+
+    Guarded by the cart version: if the cart changed since it
+    was read, positions may have moved, so nothing is written
+    and the next read reprices again. Does not bump the version.
+    """
+
+    changes = {
+        f"items.{index}.priced": snapshot
+        for index, snapshot in repriced.items()
+    }
+
+    if summary is not None:
+        changes["summary"] = summary
+
+    if not changes:
+        return
+
+    await cart_collection.update_one(
+        {
+            "_id": cart["_id"],
+            **version_filter(cart.get("version", 0)),
+        },
+        {
+            "$set": changes,
+        },
+    )
+
+
+def save_snapshots_in_background(
+    cart: dict,
+    repriced: dict[int, dict],
+    summary: dict | None,
+) -> None:
+    """Write snapshots without delaying the response."""
+
+    async def run() -> None:
+        try:
+            await save_snapshots(
+                cart,
+                repriced,
+                summary,
+            )
+        except Exception as exc:
+            print(f"⚠️ Cart snapshot update failed: {exc}")
+
+    task = asyncio.create_task(run())
+    _snapshot_tasks.add(task)
+    task.add_done_callback(_snapshot_tasks.discard)
+
+
 # ============================================================
 # Cart Response
 # ============================================================
 
-async def build_cart_response(cart: dict | None):
+async def build_cart_response(
+    cart: dict | None,
+    response: Response | None = None,
+):
     """
     Build the cart response using CURRENT product pricing.
 
+    All cart products are loaded in one batch from the product cache.
+    When `response` is supplied, the time spent loading and
+    pricing products is reported in the `Server-Timing` header.
+
     Cart database stores only:
         - productId
         - productType
         - quantity
         - customizedDetails
+        - priced (line snapshot, see `price_cart_line`)
+
+    plus the cart `summary` tagged with the cart version.
 
-    Pricing is always recalculated from the current product.
+    Mutations write the snapshot of the lines they price and
+    rebuild `summary` in the same update (`summary_stage`), so
+    the cart they return is served as stored.
+
+    Pricing always reflects the current product: a line is
+    repriced only when its product's `price` or its quantity no
+    longer match the snapshot. Only then are the refreshed
+    snapshots and summary written back, in the background.
 
     Pricing utility contract:
 
@@ -232,265 +726,147 @@ async def build_cart_response(cart: dict | None):
             },
         }
 
+    timing = ServerTiming()
+
+    with timing.measure("products"):
+        products = await get_products(
+            [
+                item.get("productId")
+                for item in cart.get("items", [])
+            ]
+        )
+
     response_items = []
+    line_totals = []
 
-    mrp_total = 0.0
-    discount_total = 0.0
-    subtotal = 0.0
-    total_quantity = 0
-    tax_total = 0.0
-    excluded_tax_total = 0.0
+    # Index in `items` -> refreshed snapshot.
+    repriced: dict[int, dict] = {}
+
+    # Lines left out of the response (product gone, bad data).
+    skipped = False
 
     # ========================================================
     # Cart items
     # ========================================================
 
-    for item in cart.get("items", []):
-        product_id = item.get("productId")
+    with timing.measure("pricing"):
+        for index, item in enumerate(cart.get("items", [])):
+            product_id = item.get("productId")
 
-        if not product_id:
-            continue
+            if not product_id:
+                skipped = True
+                continue
 
-        # ----------------------------------------------------
-        # Get current product
-        # ----------------------------------------------------
+            # ----------------------------------------------------
+            # Get current product
+            # ----------------------------------------------------
 
-        try:
-            product = await get_product(product_id)
-        except HTTPException:
-            # Product may have been unpublished/deleted.
-            # Ignore it from cart response.
-            continue
+            product = products.get(product_id)
 
-        # ----------------------------------------------------
-        # Quantity
-        # ----------------------------------------------------
+            if not product:
+                # Product may have been unpublished/deleted.
+                # Ignore it from cart response.
+                skipped = True
+                continue
 
-        try:
-            quantity = int(
-                item.get("quantity", 1)
-            )
-        except (TypeError, ValueError):
-            continue
+            # ----------------------------------------------------
+            # Quantity
+            # ----------------------------------------------------
+
+            try:
+                quantity = int(
+                    item.get("quantity", 1)
+                )
+            except (TypeError, ValueError):
+                skipped = True
+                continue
+
+            if quantity < 1:
+                skipped = True
+                continue
 
-        if quantity < 1:
-            continue
+            # ----------------------------------------------------
+            # Reuse the stored snapshot unless the product or
+            # the quantity changed since it was priced
+            # ----------------------------------------------------
 
-        # ----------------------------------------------------
-        # Calculate current pricing
-        # ----------------------------------------------------
+            snapshot = item.get("priced")
 
-        try:
-            pricing = calculate_item_pricing(
+            if not is_snapshot_fresh(
+                snapshot,
                 product,
                 quantity,
-            )
-        except ValueError:
-            # Invalid product pricing.
-            continue
-
-        # ====================================================
-        # IMPORTANT
-        # ====================================================
-        #
-        # pricing["mrp"]              = total MRP
-        # pricing["discount"]         = float
-        # pricing["subtotal"]         = total selling price
-        # pricing["taxAmount"]        = total tax
-        # pricing["excludedTaxAmount"] = tax to add
-        #
-        # Do NOT multiply these values by quantity again.
-        # ====================================================
+            ):
+                try:
+                    snapshot = price_cart_line(
+                        product,
+                        quantity,
+                    )
+                except ValueError:
+                    # Invalid product pricing.
+                    skipped = True
+                    continue
 
-        mrp_total += float(
-            pricing["mrp"]
-        )
+                repriced[index] = snapshot
 
-        discount_total += float(
-            pricing["discount"]
-        )
+            line_totals.append(
+                snapshot["totals"]
+            )
 
-        subtotal += float(
-            pricing["subtotal"]
-        )
+            response_items.append(
+                {
+                    "productId": product_id,
 
-        total_quantity += quantity
+                    "productType": item.get(
+                        "productType",
+                        "physical",
+                    ),
 
-        tax_total += float(
-            pricing["taxAmount"]
-        )
+                    "quantity": quantity,
 
-        excluded_tax_total += float(
-            pricing["excludedTaxAmount"]
-        )
+                    **cart_line_details(product),
 
-        # ----------------------------------------------------
-        # Product image
-        # ----------------------------------------------------
+                    **snapshot["line"],
 
-        media = product.get("media") or []
+                    "customizedDetails": item.get(
+                        "customizedDetails"
+                    ),
+                }
+            )
 
-        image = None
+    timing.apply(response)
 
-        if (
-            media
-            and isinstance(media, list)
-            and isinstance(media[0], dict)
-        ):
-            image = media[0].get("url")
+    # ========================================================
+    # Summary
+    # ========================================================
 
-        # ----------------------------------------------------
-        # Product tax
-        # ----------------------------------------------------
+    version = cart.get("version", 0)
+    summary = cart.get("summary")
 
-        tax = pricing.get("tax") or {}
+    if (
+        repriced
+        or skipped
+        or not summary
+        or summary.get("version") != version
+        or summary.get("totalItems") != len(line_totals)
+    ):
+        summary = summarize_lines(line_totals)
+        summary["version"] = version
+
+        if (repriced or not skipped) and cart.get("_id"):
+            save_snapshots_in_background(
+                cart,
+                repriced,
+                None if skipped else summary,
+            )
 
-        # ----------------------------------------------------
-        # Response item
-        # ----------------------------------------------------
+    # ========================================================
+    # Response
+    # ========================================================
 
-        response_items.append(
-            {
-                "productId": product_id,
-
-                "productType": item.get(
-                    "productType",
-                    "physical",
-                ),
-
-                "quantity": quantity,
-
-                "name": product.get("name"),
-
-                "description": product.get(
-                    "description"
-                ),
-
-                "image": image,
-
-                "price": {
-                    # ----------------------------------------
-                    # UNIT prices
-                    # ----------------------------------------
-
-                    "mrp": round(
-                        float(
-                            pricing.get(
-                                "unitMrp",
-                                0,
-                            )
-                        ),
-                        2,
-                    ),
-
-                    "sellingPrice": round(
-                        float(
-                            pricing.get(
-                                "unitSellingPrice",
-                                0,
-                            )
-                        ),
-                        2,
-                    ),
-
-                    # ----------------------------------------
-                    # Configured discount
-                    # ----------------------------------------
-
-                    "discount": get_product_discount(
-                        product
-                    ),
-
-                    # ----------------------------------------
-                    # Tax
-                    # ----------------------------------------
-
-                    "tax": {
-                        "rate": float(
-                            tax.get(
-                                "rate",
-                                0,
-                            )
-                        ),
-
-                        "included": bool(
-                            tax.get(
-                                "included",
-                                False,
-                            )
-                        ),
-
-                        "className": tax.get(
-                            "className"
-                        ),
-
-                        # This is the TOTAL tax
-                        # for this line.
-                        "amount": round(
-                            float(
-                                tax.get(
-                                    "amount",
-                                    0,
-                                )
-                            ),
-                            2,
-                        ),
-                    },
-                },
-
-                # ------------------------------------------------
-                # Total item selling price before excluded tax.
-                #
-                # Example:
-                #
-                # unit selling price = 100
-                # quantity = 3
-                #
-                # itemTotal = 300
-                # ------------------------------------------------
-
-                "itemTotal": round(
-                    float(
-                        pricing["subtotal"]
-                    ),
-                    2,
-                ),
-
-                "customizedDetails": item.get(
-                    "customizedDetails"
-                ),
-            }
-        )
-
-    # ========================================================
-    # Additional charges
-    # ========================================================
-
-    # TODO:
-    # Replace these with your actual shipping/misc calculation
-    # when those rules are implemented.
-
-    shipping = 0.0
-    misc_charges = 0.0
-
-    # ========================================================
-    # Grand total
-    # ========================================================
-
-    grand_total = (
-        subtotal
-        + excluded_tax_total
-        + shipping
-        + misc_charges
-    )
-
-    # ========================================================
-    # Response
-    # ========================================================
-
-    return {
-        # MongoDB uses _id, not id.
-        "id": str(cart["_id"]),
+    return {
+        # MongoDB uses _id, not id.
+        "id": str(cart["_id"]),
 
         "customerId": cart.get(
             "customerId"
@@ -500,54 +876,15 @@ async def build_cart_response(cart: dict | None):
             "guestCartId"
         ),
 
+        # Send back as expectedVersion to reject stale writes.
+        "version": version,
+
         "items": response_items,
 
         "summary": {
-            "totalItems": len(
-                response_items
-            ),
-
-            "totalQuantity": total_quantity,
-
-            "mrp": round(
-                mrp_total,
-                2,
-            ),
-
-            "discount": round(
-                discount_total,
-                2,
-            ),
-
-            "subtotal": round(
-                subtotal,
-                2,
-            ),
-
-            "shipping": round(
-                shipping,
-                2,
-            ),
-
-            "totalTax": round(
-                tax_total,
-                2,
-            ),
-
-            "taxToAdd": round(
-                excluded_tax_total,
-                2,
-            ),
-
-            "miscCharges": round(
-                misc_charges,
-                2,
-            ),
-
-            "grandTotal": round(
-                grand_total,
-                2,
-            ),
+            key: value
+            for key, value in summary.items()
+            if key != "version"
         },
     }
 
@@ -589,13 +926,22 @@ async def create_cart(
         "customerId": customer_id,
         "guestCartId": guest_cart_id,
         "items": [],
+        "version": 0,
+        "summary": {**summarize_lines([]), "version": 0},
         "createdAt": now,
         "updatedAt": now,
     }
 
-    result = await cart_collection.insert_one(
-        cart
-    )
+    try:
+        result = await cart_collection.insert_one(
+            cart
+        )
+    except DuplicateKeyError:
+        # Created concurrently by another request.
+        return await find_cart(
+            customer_id=customer_id,
+            guest_cart_id=guest_cart_id,
+        )
 
     cart["_id"] = result.inserted_id
 
@@ -608,6 +954,7 @@ async def create_cart(
 
 @router.get("/create")
 async def get_or_create_cart(
+    response: Response,
     customerId: str | None = None,
     guestCartId: str | None = None,
 ):
@@ -664,10 +1011,245 @@ async def get_or_create_cart(
         )
 
     return await build_cart_response(
-        cart
+        cart,
+        response,
+    )
+
+
+# ============================================================
+# Atomic Mutations
+# ============================================================
+
+
+def version_filter(
+    expected_version: int | None,
+) -> dict:
+    """
+    Optimistic concurrency guard.
+
+    Carts created before versioning have no `version` field and
+    count as version 0.
+    """
+
+    if expected_version is None:
+        return {}
+
+    if expected_version == 0:
+        return {"version": {"$in": [0, None]}}
+
+    return {"version": expected_version}
+
+
+def bump_version(now: datetime) -> dict:
+    """Pipeline fields every mutation sets."""
+
+    return {
+        "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+        "updatedAt": now,
+    }
+
+
+def is_cart_line(product_id: str) -> dict:
+    return {"$eq": ["$$this.productId", {"$literal": product_id}]}
+
+
+def price_line_or_400(product: dict, quantity: int) -> dict:
+    try:
+        return price_cart_line(
+            product,
+            quantity,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Product price is invalid.",
+        )
+
+
+async def mutate_cart(
+    owner_query: dict,
+    update: dict | list,
+    *,
+    expected_version: int | None = None,
+    extra_filter: dict | None = None,
+    upsert: bool = False,
+):
+    """
+    Apply one atomic update and return the cart after it.
+
+    With `upsert`, a missing cart is created by the same update.
+    The unique owner indexes turn a concurrent duplicate insert,
+    or an insert attempted because `extra_filter` rejected an
+    existing cart, into a miss.
+
+    Returns None when nothing matched; `raise_mutation_error`
+    explains why.
+    """
+
+    try:
+        return await cart_collection.find_one_and_update(
+            {
+                **owner_query,
+                **version_filter(expected_version),
+                **(extra_filter or {}),
+            },
+            update,
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        return None
+
+
+async def raise_mutation_error(
+    owner_query: dict,
+    expected_version: int | None,
+    product_id: str | None = None,
+):
+    """
+    Work out why a guarded update matched nothing.
+
+    Only runs on the failure path, so successful mutations
+    stay a single round trip.
+    """
+
+    cart = await cart_collection.find_one(
+        owner_query,
+        {"version": 1, "items.productId": 1},
+    )
+
+    if not cart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cart not found.",
+        )
+
+    current_version = cart.get("version", 0)
+
+    if (
+        expected_version is not None
+        and current_version != expected_version
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Cart was changed by another request.",
+                "version": current_version,
+            },
+        )
+
+    if product_id and not any(
+        item.get("productId") == product_id
+        for item in cart.get("items", [])
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=(
+                "Product is not present in cart."
+            ),
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Quantity cannot exceed {MAX_LINE_QUANTITY}.",
     )
 
 
+def add_item_update(
+    *,
+    product_id: str,
+    quantity: int,
+    product_type: str | None,
+    customized_details: dict | None,
+    priced: dict,
+    now: datetime,
+) -> tuple[dict, list[dict]]:
+    """
+    Filter and pipeline update that adds `quantity` of a product.
+
+    Increments the existing line or appends a new one, in one
+    update. The filter rejects the update when the line would
+    exceed MAX_LINE_QUANTITY.
+
+    `priced` is the snapshot for `quantity`; it is stored on a new
+    line. An incremented line keeps its old snapshot, which no
+    longer matches its quantity, so the next read reprices it.
+    """
+
+    items = {"$ifNull": ["$items", []]}
+    is_line = is_cart_line(product_id)
+
+    existing_quantity = {
+        "$sum": {
+            "$map": {
+                "input": {"$filter": {"input": items, "cond": is_line}},
+                "in": "$$this.quantity",
+            }
+        }
+    }
+
+    changes: dict = {
+        "quantity": {
+            "$add": [{"$ifNull": ["$$this.quantity", 0]}, quantity]
+        },
+    }
+
+    if customized_details is not None:
+        changes["customizedDetails"] = {"$literal": customized_details}
+
+    # Keep the original product type unless
+    # the payload explicitly provides one.
+    if product_type:
+        changes["productType"] = {"$literal": product_type}
+
+    new_item = {
+        "productId": product_id,
+        "productType": product_type or "physical",
+        "quantity": quantity,
+        "customizedDetails": customized_details,
+        "priced": priced,
+    }
+
+    quantity_filter = {
+        "$expr": {
+            "$lte": [
+                {"$add": [existing_quantity, quantity]},
+                MAX_LINE_QUANTITY,
+            ]
+        }
+    }
+
+    pipeline = [
+        {
+            "$set": {
+                "items": {
+                    "$cond": [
+                        {"$anyElementTrue": [{"$map": {"input": items, "in": is_line}}]},
+                        {
+                            "$map": {
+                                "input": items,
+                                "in": {
+                                    "$cond": [
+                                        is_line,
+                                        {"$mergeObjects": ["$$this", changes]},
+                                        "$$this",
+                                    ]
+                                },
+                            }
+                        },
+                        {"$concatArrays": [items, [{"$literal": new_item}]]},
+                    ]
+                },
+                **bump_version(now),
+                "createdAt": {"$ifNull": ["$createdAt", now]},
+            }
+        },
+        summary_stage(),
+    ]
+
+    return quantity_filter, pipeline
+
+
 # ============================================================
 # POST /add-item
 # ============================================================
@@ -678,6 +1260,7 @@ async def get_or_create_cart(
 )
 async def add_cart_item(
     payload: AddCartItemIn,
+    response: Response,
 ):
     """
     Add product to cart.
@@ -685,6 +1268,9 @@ async def add_cart_item(
     If product already exists:
 
         existing quantity + requested quantity
+
+    The cart is changed with a single atomic update, so
+    concurrent requests never lose each other's items.
     """
 
     validate_cart_owner(
@@ -716,128 +1302,56 @@ async def add_cart_item(
             detail="Product price is invalid.",
         )
 
+    priced = price_line_or_400(
+        product,
+        payload.quantity,
+    )
+
     # --------------------------------------------------------
-    # Find cart
+    # Add atomically
     # --------------------------------------------------------
 
-    cart = await find_cart(
+    owner_query = get_cart_owner_query(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    # --------------------------------------------------------
-    # Create cart if required
-    # --------------------------------------------------------
-
-    if not cart:
-        cart = await create_cart(
-            customer_id=payload.customerId,
-            guest_cart_id=payload.guestCartId,
-        )
-
-    items = cart.get("items", [])
-
-    # --------------------------------------------------------
-    # Find existing item
-    # --------------------------------------------------------
-
-    existing_item = None
-
-    for item in items:
-        if (
-            item.get("productId")
-            == payload.productId
-        ):
-            existing_item = item
-            break
-
-    # --------------------------------------------------------
-    # Existing item
-    # --------------------------------------------------------
-
-    if existing_item:
+    quantity_filter, pipeline = add_item_update(
+        product_id=payload.productId,
+        quantity=payload.quantity,
+        product_type=payload.productType,
+        customized_details=payload.customizedDetails,
+        priced=priced,
+        now=utc_now(),
+    )
 
-        new_quantity = (
-            int(
-                existing_item.get(
-                    "quantity",
-                    0,
-                )
-            )
-            + payload.quantity
-        )
+    # The first item creates the cart in the same update. Only
+    # without expectedVersion: a versioned write needs a cart.
+    cart = await mutate_cart(
+        owner_query,
+        pipeline,
+        expected_version=payload.expectedVersion,
+        extra_filter=quantity_filter,
+        upsert=payload.expectedVersion is None,
+    )
 
-        validate_quantity(
-            new_quantity
+    if cart is None and payload.expectedVersion is None:
+        # Lost a concurrent first insert; the cart exists now.
+        cart = await mutate_cart(
+            owner_query,
+            pipeline,
+            extra_filter=quantity_filter,
         )
 
-        existing_item[
-            "quantity"
-        ] = new_quantity
-
-        if payload.customizedDetails is not None:
-            existing_item[
-                "customizedDetails"
-            ] = payload.customizedDetails
-
-        # Keep the original product type unless
-        # the payload explicitly provides one.
-        if payload.productType:
-            existing_item[
-                "productType"
-            ] = payload.productType
-
-    # --------------------------------------------------------
-    # New item
-    # --------------------------------------------------------
-
-    else:
-
-        items.append(
-            {
-                "productId": payload.productId,
-
-                "productType": (
-                    payload.productType
-                    or "physical"
-                ),
-
-                "quantity": payload.quantity,
-
-                "customizedDetails": (
-                    payload.customizedDetails
-                ),
-            }
+    if cart is None:
+        await raise_mutation_error(
+            owner_query,
+            payload.expectedVersion,
         )
 
-    # --------------------------------------------------------
-    # Save
-    # --------------------------------------------------------
-
-    await cart_collection.update_one(
-        {
-            "_id": cart["_id"],
-        },
-        {
-            "$set": {
-                "items": items,
-                "updatedAt": utc_now(),
-            }
-        },
-    )
-
-    # --------------------------------------------------------
-    # Return fresh cart
-    # --------------------------------------------------------
-
-    updated_cart = await cart_collection.find_one(
-        {
-            "_id": cart["_id"],
-        }
-    )
-
     return await build_cart_response(
-        updated_cart
+        cart,
+        response,
     )
 
 
@@ -851,6 +1365,7 @@ async def add_cart_item(
 )
 async def update_cart_item(
     payload: UpdateCartItemIn,
+    response: Response,
 ):
     """
     Set exact quantity.
@@ -865,89 +1380,75 @@ async def update_cart_item(
         payload.quantity
     )
 
+    # Validate product still exists
+    product = await get_product(
+        payload.productId
+    )
+
     # --------------------------------------------------------
-    # Find cart
+    # Update the line in place, with its new snapshot
     # --------------------------------------------------------
 
-    cart = await find_cart(
+    owner_query = get_cart_owner_query(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    if not cart:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart not found.",
-        )
-
-    items = cart.get("items", [])
-
-    # --------------------------------------------------------
-    # Find item
-    # --------------------------------------------------------
-
-    found = False
-
-    for item in items:
-
-        if (
-            item.get("productId")
-            == payload.productId
-        ):
-
-            # Validate product still exists
-            await get_product(
-                payload.productId
+    changes = {
+        "quantity": payload.quantity,
+        "priced": {
+            "$literal": price_line_or_400(
+                product,
+                payload.quantity,
             )
+        },
+    }
 
-            item[
-                "quantity"
-            ] = payload.quantity
-
-            if payload.customizedDetails is not None:
-                item[
-                    "customizedDetails"
-                ] = payload.customizedDetails
-
-            found = True
-            break
-
-    if not found:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=(
-                "Product is not present in cart."
-            ),
-        )
+    if payload.customizedDetails is not None:
+        changes["customizedDetails"] = {
+            "$literal": payload.customizedDetails
+        }
 
-    # --------------------------------------------------------
-    # Save
-    # --------------------------------------------------------
+    is_line = is_cart_line(payload.productId)
 
-    await cart_collection.update_one(
-        {
-            "_id": cart["_id"],
-        },
+    pipeline = [
         {
             "$set": {
-                "items": items,
-                "updatedAt": utc_now(),
+                "items": {
+                    "$map": {
+                        "input": "$items",
+                        "in": {
+                            "$cond": [
+                                is_line,
+                                {"$mergeObjects": ["$$this", changes]},
+                                "$$this",
+                            ]
+                        },
+                    }
+                },
+                **bump_version(utc_now()),
             }
         },
-    )
-
-    # --------------------------------------------------------
-    # Return fresh cart
-    # --------------------------------------------------------
+        summary_stage(),
+    ]
 
-    updated_cart = await cart_collection.find_one(
-        {
-            "_id": cart["_id"],
-        }
+    cart = await mutate_cart(
+        owner_query,
+        pipeline,
+        expected_version=payload.expectedVersion,
+        extra_filter={"items.productId": payload.productId},
     )
 
+    if cart is None:
+        await raise_mutation_error(
+            owner_query,
+            payload.expectedVersion,
+            product_id=payload.productId,
+        )
+
     return await build_cart_response(
-        updated_cart
+        cart,
+        response,
     )
 
 
@@ -961,76 +1462,50 @@ async def update_cart_item(
 )
 async def remove_cart_item(
     payload: RemoveCartItemIn,
+    response: Response,
 ):
     validate_cart_owner(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    # --------------------------------------------------------
-    # Find cart
-    # --------------------------------------------------------
-
-    cart = await find_cart(
+    owner_query = get_cart_owner_query(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    if not cart:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart not found.",
-        )
-
-    items = cart.get("items", [])
-
-    # --------------------------------------------------------
-    # Remove item
-    # --------------------------------------------------------
-
-    new_items = [
-        item
-        for item in items
-        if item.get("productId")
-        != payload.productId
-    ]
-
-    if len(new_items) == len(items):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=(
-                "Product is not present in cart."
-            ),
-        )
-
-    # --------------------------------------------------------
-    # Save
-    # --------------------------------------------------------
-
-    await cart_collection.update_one(
-        {
-            "_id": cart["_id"],
-        },
+    pipeline = [
         {
             "$set": {
-                "items": new_items,
-                "updatedAt": utc_now(),
+                "items": {
+                    "$filter": {
+                        "input": "$items",
+                        "cond": {"$not": [is_cart_line(payload.productId)]},
+                    }
+                },
+                **bump_version(utc_now()),
             }
         },
-    )
-
-    # --------------------------------------------------------
-    # Return fresh cart
-    # --------------------------------------------------------
+        summary_stage(),
+    ]
 
-    updated_cart = await cart_collection.find_one(
-        {
-            "_id": cart["_id"],
-        }
+    cart = await mutate_cart(
+        owner_query,
+        pipeline,
+        expected_version=payload.expectedVersion,
+        extra_filter={"items.productId": payload.productId},
     )
 
+    if cart is None:
+        await raise_mutation_error(
+            owner_query,
+            payload.expectedVersion,
+            product_id=payload.productId,
+        )
+
     return await build_cart_response(
-        updated_cart
+        cart,
+        response,
     )
 
 
@@ -1044,58 +1519,45 @@ async def remove_cart_item(
 )
 async def clear_cart(
     payload: ClearCartIn,
+    response: Response,
 ):
     validate_cart_owner(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    # --------------------------------------------------------
-    # Find cart
-    # --------------------------------------------------------
-
-    cart = await find_cart(
+    owner_query = get_cart_owner_query(
         customer_id=payload.customerId,
         guest_cart_id=payload.guestCartId,
     )
 
-    if not cart:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart not found.",
-        )
-
-    # --------------------------------------------------------
-    # Clear
-    # --------------------------------------------------------
-
-    await cart_collection.update_one(
-        {
-            "_id": cart["_id"],
-        },
+    pipeline = [
         {
             "$set": {
-                "items": [],
-                "updatedAt": utc_now(),
+                "items": {"$literal": []},
+                **bump_version(utc_now()),
             }
         },
-    )
-
-    # --------------------------------------------------------
-    # Return fresh cart
-    # --------------------------------------------------------
+        summary_stage(),
+    ]
 
-    updated_cart = await cart_collection.find_one(
-        {
-            "_id": cart["_id"],
-        }
+    cart = await mutate_cart(
+        owner_query,
+        pipeline,
+        expected_version=payload.expectedVersion,
     )
 
+    if cart is None:
+        await raise_mutation_error(
+            owner_query,
+            payload.expectedVersion,
+        )
+
     return await build_cart_response(
-        updated_cart
+        cart,
+        response,
     )
 
-
 # ============================================================
 # POST /merge
 # ============================================================
@@ -1106,6 +1568,7 @@ async def clear_cart(
 )
 async def merge_guest_cart(
     payload: MergeGuestCartIn,
+    response: Response,
 ):
     """
     Merge a guest cart into a logged-in customer's cart.
@@ -1123,7 +1586,11 @@ async def merge_guest_cart(
         B x 1
         C x 3
 
-    After successful merge, guest cart is deleted.
+    Merged quantities are capped at MAX_LINE_QUANTITY. The merge
+    is one pipeline update of the customer cart and one delete
+    of the guest cart, in a transaction where supported; see
+    `LineMerge`. If a guest product no longer exists, nothing
+    is merged.
     """
 
     # --------------------------------------------------------
@@ -1163,58 +1630,18 @@ async def merge_guest_cart(
         )
 
     # --------------------------------------------------------
-    # Find guest cart
-    # --------------------------------------------------------
-
-    guest_cart = await cart_collection.find_one(
-        {
-            "guestCartId": payload.guestCartId,
-            "customerId": None,
-        }
-    )
-
-    # --------------------------------------------------------
-    # Guest cart doesn't exist
+    # Merge guest lines into the customer cart
     # --------------------------------------------------------
 
-    if not guest_cart:
-
-        customer_cart = await find_cart(
-            customer_id=payload.customerId
-        )
-
-        if not customer_cart:
-            customer_cart = await create_cart(
-                customer_id=payload.customerId,
-                guest_cart_id=None,
-            )
-
-        return await build_cart_response(
-            customer_cart
+    async def prepare(guest_items: list[dict]) -> list[dict]:
+        # Validate that every guest product still exists.
+        guest_products = await get_products(
+            [
+                item.get("productId")
+                for item in guest_items
+            ]
         )
 
-    # --------------------------------------------------------
-    # Find customer cart
-    # --------------------------------------------------------
-
-    customer_cart = await find_cart(
-        customer_id=payload.customerId
-    )
-
-    # ========================================================
-    # Customer has no cart
-    # ========================================================
-
-    if not customer_cart:
-
-        now = utc_now()
-
-        guest_items = guest_cart.get(
-            "items",
-            [],
-        )
-
-        # Validate quantities before moving them.
         valid_items = []
 
         for guest_item in guest_items:
@@ -1239,13 +1666,9 @@ async def merge_guest_cart(
             if quantity <= 0:
                 continue
 
-            validate_quantity(
-                quantity
-            )
-
-            # Validate that the product still exists.
-            await get_product(
-                product_id
+            require_product(
+                guest_products,
+                product_id,
             )
 
             valid_items.append(
@@ -1269,201 +1692,36 @@ async def merge_guest_cart(
                 }
             )
 
-        customer_cart = {
-            "customerId": payload.customerId,
-            "guestCartId": None,
-            "items": valid_items,
-            "createdAt": now,
-            "updatedAt": now,
-        }
-
-        result = await cart_collection.insert_one(
-            customer_cart
-        )
-
-        customer_cart["_id"] = (
-            result.inserted_id
-        )
+        return valid_items
 
-    # ========================================================
-    # Customer already has cart
-    # ========================================================
+    customer_cart = await cart_merge.merge(
+        source_filter=get_cart_owner_query(
+            guest_cart_id=payload.guestCartId,
+        ),
+        target_filter=get_cart_owner_query(
+            customer_id=payload.customerId,
+        ),
+        prepare=prepare,
+    )
 
-    else:
+    # --------------------------------------------------------
+    # Guest cart doesn't exist
+    # --------------------------------------------------------
 
-        customer_items = customer_cart.get(
-            "items",
-            [],
-        )
+    if not customer_cart:
 
-        guest_items = guest_cart.get(
-            "items",
-            [],
+        customer_cart = await find_cart(
+            customer_id=payload.customerId
         )
 
-        # ----------------------------------------------------
-        # Merge guest items
-        # ----------------------------------------------------
-
-        for guest_item in guest_items:
-
-            guest_product_id = (
-                guest_item.get(
-                    "productId"
-                )
-            )
-
-            if not guest_product_id:
-                continue
-
-            try:
-                guest_quantity = int(
-                    guest_item.get(
-                        "quantity",
-                        0,
-                    )
-                )
-            except (TypeError, ValueError):
-                continue
-
-            if guest_quantity <= 0:
-                continue
-
-            validate_quantity(
-                guest_quantity
-            )
-
-            # Validate product still exists.
-            await get_product(
-                guest_product_id
-            )
-
-            # ------------------------------------------------
-            # Find same product
-            # ------------------------------------------------
-
-            existing_item = next(
-                (
-                    item
-                    for item in customer_items
-                    if item.get("productId")
-                    == guest_product_id
-                ),
-                None,
+        if not customer_cart:
+            customer_cart = await create_cart(
+                customer_id=payload.customerId,
+                guest_cart_id=None,
             )
 
-            # ------------------------------------------------
-            # Same product
-            # ------------------------------------------------
-
-            if existing_item:
-
-                try:
-                    existing_quantity = int(
-                        existing_item.get(
-                            "quantity",
-                            0,
-                        )
-                    )
-                except (TypeError, ValueError):
-                    existing_quantity = 0
-
-                new_quantity = (
-                    existing_quantity
-                    + guest_quantity
-                )
-
-                validate_quantity(
-                    new_quantity
-                )
-
-                existing_item[
-                    "quantity"
-                ] = new_quantity
-
-                # Keep customer customization
-                # if already present.
-                if (
-                    not existing_item.get(
-                        "customizedDetails"
-                    )
-                    and guest_item.get(
-                        "customizedDetails"
-                    )
-                ):
-                    existing_item[
-                        "customizedDetails"
-                    ] = guest_item.get(
-                        "customizedDetails"
-                    )
-
-            # ------------------------------------------------
-            # New product
-            # ------------------------------------------------
-
-            else:
-
-                customer_items.append(
-                    {
-                        "productId": (
-                            guest_product_id
-                        ),
-
-                        "productType": (
-                            guest_item.get(
-                                "productType",
-                                "physical",
-                            )
-                        ),
-
-                        "quantity": (
-                            guest_quantity
-                        ),
-
-                        "customizedDetails": (
-                            guest_item.get(
-                                "customizedDetails"
-                            )
-                        ),
-                    }
-                )
-
-        # ----------------------------------------------------
-        # Save customer cart
-        # ----------------------------------------------------
-
-        await cart_collection.update_one(
-            {
-                "_id": customer_cart["_id"],
-            },
-            {
-                "$set": {
-                    "items": customer_items,
-                    "updatedAt": utc_now(),
-                }
-            },
-        )
-
-    # ========================================================
-    # Delete guest cart
-    # ========================================================
-
-    await cart_collection.delete_one(
-        {
-            "_id": guest_cart["_id"]
-        }
-    )
-
-    # ========================================================
-    # Return final customer cart
-    # ========================================================
-
-    updated_cart = await cart_collection.find_one(
-        {
-            "_id": customer_cart["_id"]
-        }
+    return await build_cart_response(
+        customer_cart,
+        response,
     )
 
-    return await build_cart_response(
-        updated_cart
-    )
\ No newline at end of file
@@ -23,6 +23,10 @@ class AddCartItemIn(BaseModel):
     quantity: int = Field(default=1, ge=1)
     customizedDetails: dict[str, Any] | None = None
 
+    # Cart version the client last saw; the write is rejected
+    # with 409 if the cart changed since. Omit to skip the check.
+    expectedVersion: int | None = None
+
 
 class UpdateCartItemIn(BaseModel):
     customerId: str | None = None
@@ -32,6 +36,8 @@ class UpdateCartItemIn(BaseModel):
     quantity: int = Field(ge=1)
     customizedDetails: dict[str, Any] | None = None
 
+    expectedVersion: int | None = None
+
 
 class RemoveCartItemIn(BaseModel):
     customerId: str | None = None
@@ -39,11 +45,15 @@ class RemoveCartItemIn(BaseModel):
 
     productId: str
 
+    expectedVersion: int | None = None
+
 
 class ClearCartIn(BaseModel):
     customerId: str | None = None
     guestCartId: str | None = None
 
+    expectedVersion: int | None = None
+
 
 class MergeGuestCartIn(BaseModel):
     customerId: str
@@ -3,8 +3,11 @@ from bson import ObjectId
 from fastapi import APIRouter, Body, Depends, HTTPException
 from datetime import datetime, timezone
 from app.db.mongo import db
+from app.modules.dashboard.services.dashboard_stats import customer_active_delta, dashboard_stats
 from app.modules.customer.schemas.customer import CustomerIn, CustomerOut, GetCustomersParams
+from app.services.auth.customer_cache import customer_cache
 from app.utils.auth_utils import authenticate
+from app.utils.pagination import paginate
 from core.sanitize import stringify_object_ids
 
 router = APIRouter(
@@ -14,8 +17,6 @@ collection = db["customers"]
 
 @router.post("/search", response_model=dict)
 async def search_customers(filters: GetCustomersParams = Body(...)):
-    skip = (filters.page - 1) * filters.pageSize
-
     # Build query dynamically
     query = {}
     if filters.searchText:
@@ -26,20 +27,19 @@ async def search_customers(filters: GetCustomersParams = Body(...)):
     # Determine sort order
     sort_order = -1 if filters.sort == "newest" else 1  # newest = descending, oldest = ascending
 
-
-    # Count total
-    total_customers = await collection.count_documents(query)
+    result = await paginate(
+        collection,
+        query,
+        page=filters.page or 1,
+        page_size=filters.pageSize or 10,
+        sort_order=sort_order,
+        after=filters.after,
+        total_mode=filters.totalMode,
+    )
 
     customers_summary = []
-    cursor = (
-        collection
-        .find(query)
-        .sort("createdAt", sort_order)
-        .skip(skip)
-        .limit(filters.pageSize)
-    )
 
-    async for customer in cursor:
+    for customer in result["items"]:
         customers_summary.append(
             CustomerOut(
                 id=str(customer["_id"]),
@@ -56,10 +56,7 @@ async def search_customers(filters: GetCustomersParams = Body(...)):
         )
 
     return {
-        "total": total_customers,
-        "page": filters.page,
-        "pageSize": filters.pageSize,
-        "pages": ceil(total_customers / filters.pageSize) if total_customers > 0 else 1,
+        **result,
         "items": customers_summary
     }
 
@@ -85,6 +82,7 @@ async def create_customer(payload: CustomerIn):
         "updatedAt": now,
     }
     await collection.insert_one(customer)
+    await dashboard_stats.increment(customer_active_delta(False, customer["isActive"]))
     return stringify_object_ids(customer)
 
 @router.put("/{id}", response_model=CustomerOut)
@@ -99,12 +97,15 @@ async def update_customer(id: str, payload: CustomerIn):
     }
 
     await collection.update_one({"_id": ObjectId(id)}, {"$set": updated_data})
+    customer_cache.invalidate(id)
+    await dashboard_stats.increment(customer_active_delta(customer.get("isActive"), updated_data.get("isActive")))
     updated_customer = await collection.find_one({"_id": ObjectId(id)})
     return stringify_object_ids(updated_customer)
 
 @router.delete("/{customer_id}")
 async def delete_customer(customer_id: str):
     result = await collection.delete_one({"id": customer_id})
+    customer_cache.invalidate(customer_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
     return {"message": "Customer deleted successfully"}
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+from app.utils.pagination import CursorPageIn
+
 
 # ---------- Address ----------
 class Address(BaseModel):
@@ -35,7 +37,7 @@ class CustomerOut(CustomerIn):
 
 
 # ---------- Pagination ----------
-class GetCustomersParams(BaseModel):
+class GetCustomersParams(CursorPageIn):
     page: Optional[int] = 1
     pageSize: Optional[int] = 10
     searchText: Optional[str] = None
@@ -44,8 +46,9 @@ class GetCustomersParams(BaseModel):
 
 
 class PaginatedCustomers(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
-    pages: int
+    pages: Optional[int] = None
     items: List[CustomerOut]
+    nextCursor: Optional[str] = None
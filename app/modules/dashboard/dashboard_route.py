@@ -1,54 +1,61 @@
 from typing import List
 from fastapi import APIRouter, Depends
 
-from app.db.mongo import db
+from app.db.mongo import pool_metrics
+from app.db.query_metrics import query_stats
 from app.modules.dashboard.schemas.dashboard import DashboardStatOut
+from app.modules.dashboard.services.dashboard_stats import dashboard_stats
+from app.modules.website.order.services.razorpay_gateway import razorpay_gateway
+from app.services.mail_outbox import mail_outbox
 from app.utils.auth_utils import authenticate
 
 router = APIRouter(
     dependencies=[Depends(authenticate)]  # ✅ applies to all routes
 )
 
-products_collection = db["products"]
-customers_collection = db["customers"]
-orders_collection = db["orders"]
-
 @router.get("/stats", response_model=List[DashboardStatOut])
 async def get_dashboard_stats():
-
-    total_products = await products_collection.count_documents({
-        "status": "published"
-    })
-
-    total_draft_products = await products_collection.count_documents({
-        "status": "draft"
-    })
-
-    total_customers = await customers_collection.count_documents({
-        "isActive": True
-    })
-
-    total_orders = await orders_collection.count_documents({})
+    stats = await dashboard_stats.get()
 
     return [
         {
             "icon": "bi-box-seam",
-            "value": total_products,
+            "value": stats["publishedProducts"],
             "label": "Total Products",
         },
         {
             "icon": "bi-pencil-square",
-            "value": total_draft_products,
+            "value": stats["draftProducts"],
             "label": "Total Draft Products",
         },
         {
             "icon": "bi-people",
-            "value": total_customers,
+            "value": stats["activeCustomers"],
             "label": "Total Customers",
         },
         {
             "icon": "bi-bag-check",
-            "value": total_orders,
+            "value": stats["totalOrders"],
             "label": "Total Orders",
         },
-    ]
\ No newline at end of file
+    ]
+
+
+@router.get("/db/pool-stats")
+async def get_db_pool_stats():
+    return pool_metrics.stats()
+
+
+@router.get("/db/query-stats")
+async def get_db_query_stats():
+    return query_stats()
+
+
+@router.get("/mail/outbox-stats")
+async def get_mail_outbox_stats():
+    return await mail_outbox.stats()
+
+
+@router.get("/payments/gateway-stats")
+async def get_payment_gateway_stats():
+    return razorpay_gateway.stats()
@@ -0,0 +1,195 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.db.mongo import db
+from config import settings
+
+
+products_collection = db["products"]
+customers_collection = db["customers"]
+orders_collection = db["orders"]
+dashboard_stats_collection = db["dashboard_stats"]
+
+STATS_DOCUMENT_ID = "global"
+
+STAT_FIELDS = (
+    "publishedProducts",
+    "draftProducts",
+    "activeCustomers",
+    "totalOrders",
+)
+
+_PRODUCT_STATUS_FIELDS = {
+    "published": "publishedProducts",
+    "draft": "draftProducts",
+}
+
+_EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def product_status_delta(
+    old_status: Optional[str],
+    new_status: Optional[str],
+) -> dict[str, int]:
+    deltas: dict[str, int] = {}
+
+    if old_status == new_status:
+        return deltas
+
+    if old_status in _PRODUCT_STATUS_FIELDS:
+        deltas[_PRODUCT_STATUS_FIELDS[old_status]] = -1
+
+    if new_status in _PRODUCT_STATUS_FIELDS:
+        deltas[_PRODUCT_STATUS_FIELDS[new_status]] = 1
+
+    return deltas
+
+
+def customer_active_delta(
+    was_active: Optional[bool],
+    is_active: Optional[bool],
+) -> dict[str, int]:
+    if bool(was_active) == bool(is_active):
+        return {}
+
+    return {"activeCustomers": 1 if is_active else -1}
+
+
+class DashboardStatsService:
+    """
+    Materialized dashboard counters.
+
+    The counters live in a single `dashboard_stats` document, so a
+    dashboard load is one `_id` lookup regardless of collection size.
+    Writes that change a counter apply a `$inc` delta. Writes whose
+    previous state is not known cheaply mark the document stale
+    instead.
+
+    A document older than `max_age_seconds` is still served, and a
+    background recompute is started, so drift from missed or racing
+    deltas is bounded by that age. A full recompute only blocks the
+    request when no document exists yet.
+    """
+
+    def __init__(self, max_age_seconds: int):
+        self.max_age_seconds = max_age_seconds
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def compute(self) -> dict[str, int]:
+        """
+        Compute every counter from the source collections.
+
+        Product counts come from one grouped aggregation; the three
+        collections are queried concurrently.
+        """
+
+        async def product_counts() -> dict[str, int]:
+            counts = {}
+            async for row in products_collection.aggregate(
+                [
+                    {"$match": {"status": {"$in": list(_PRODUCT_STATUS_FIELDS)}}},
+                    {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+                ]
+            ):
+                counts[_PRODUCT_STATUS_FIELDS[row["_id"]]] = row["count"]
+            return counts
+
+        products, active_customers, total_orders = await asyncio.gather(
+            product_counts(),
+            customers_collection.count_documents({"isActive": True}),
+            orders_collection.count_documents({}),
+        )
+
+        return {
+            "publishedProducts": products.get("publishedProducts", 0),
+            "draftProducts": products.get("draftProducts", 0),
+            "activeCustomers": active_customers,
+            "totalOrders": total_orders,
+        }
+
+    async def refresh(self) -> dict[str, Any]:
+        stats = await self.compute()
+        now = _now()
+
+        await dashboard_stats_collection.update_one(
+            {"_id": STATS_DOCUMENT_ID},
+            {"$set": {**stats, "computedAt": now, "updatedAt": now}},
+            upsert=True,
+        )
+
+        return {**stats, "computedAt": now}
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        async def run() -> None:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                print(f"⚠️ Dashboard stats refresh failed: {exc}")
+
+        self._refresh_task = asyncio.create_task(run())
+
+    async def get(self) -> dict[str, Any]:
+        document = await dashboard_stats_collection.find_one(
+            {"_id": STATS_DOCUMENT_ID}
+        )
+
+        if document is None:
+            return await self.refresh()
+
+        computed_at = document.get("computedAt") or _EPOCH
+        if computed_at.tzinfo is None:
+            computed_at = computed_at.replace(tzinfo=timezone.utc)
+
+        if (_now() - computed_at).total_seconds() > self.max_age_seconds:
+            self._refresh_in_background()
+
+        return document
+
+    async def increment(self, deltas: dict[str, int]) -> None:
+        """
+        Apply counter deltas after a write.
+
+        Never raises: a lost delta is corrected by the next
+        recompute, so it must not fail the write that caused it.
+        """
+
+        deltas = {
+            field: delta
+            for field, delta in deltas.items()
+            if field in STAT_FIELDS and delta
+        }
+
+        if not deltas:
+            return
+
+        try:
+            # No upsert: without a document the next read recomputes
+            # everything, and a partial document would be wrong.
+            await dashboard_stats_collection.update_one(
+                {"_id": STATS_DOCUMENT_ID},
+                {"$inc": deltas, "$set": {"updatedAt": _now()}},
+            )
+        except Exception as exc:
+            print(f"⚠️ Dashboard stats update failed: {exc}")
+
+    async def mark_stale(self) -> None:
+        try:
+            await dashboard_stats_collection.update_one(
+                {"_id": STATS_DOCUMENT_ID},
+                {"$set": {"computedAt": _EPOCH}},
+            )
+        except Exception as exc:
+            print(f"⚠️ Dashboard stats update failed: {exc}")
+
+
+dashboard_stats = DashboardStatsService(
+    max_age_seconds=settings.DASHBOARD_STATS_MAX_AGE_SECONDS,
+)
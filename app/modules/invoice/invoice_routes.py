@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
 from bson import ObjectId
 
 from app.modules.orders.schemas.invoice import (
-    CreateInvoiceRequest, InvoiceOut, UpdatePaymentRequest, InvoiceListFilters, InvoiceListResponse
+    CreateInvoiceRequest, InvoiceOut, UpdatePaymentRequest, InvoiceListFilters, InvoiceListResponse,
+    InvoicePdfBatchRequest
 )
 from app.modules.invoice.invoice_service import InvoiceService
-from app.modules.invoice.pdf_service import PDFService
+from app.modules.invoice.pdf_renderer import invoice_pdf_filename, invoice_pdf_renderer, iter_pdf_chunks
 from app.utils.auth_utils import authenticate  # Assuming admin auth
+from app.utils.pagination import TotalMode
 
 router = APIRouter()
 
@@ -83,8 +85,10 @@ async def list_invoices(
     search: Optional[str] = None,
     customerId: Optional[str] = None,
     paymentStatus: Optional[str] = None,
-    page: int = 1,
-    limit: int = 10
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1),
+    after: Optional[str] = None,
+    totalMode: TotalMode = "exact",
 ):
     """List invoices with filters and pagination"""
     try:
@@ -95,16 +99,21 @@ async def list_invoices(
             "paymentStatus": paymentStatus
         }
 
-        invoices, total = await InvoiceService.list_invoices(filters, limit, offset)
-        pages = (total + limit - 1) // limit  # Ceiling division
+        invoices, total, next_cursor = await InvoiceService.list_invoices(
+            filters, limit, offset, after=after, total_mode=totalMode
+        )
+        pages = (total + limit - 1) // limit if total is not None else None  # Ceiling division
 
         return InvoiceListResponse(
             invoices=invoices,
             total=total,
             page=page,
             limit=limit,
-            pages=pages
+            pages=pages,
+            nextCursor=next_cursor
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -123,6 +132,39 @@ async def update_payment(
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/pdf/cache/stats")
+async def get_invoice_pdf_cache_stats():
+    """Rendered invoice PDF cache statistics"""
+    return invoice_pdf_renderer.stats()
+
+@router.post("/pdf/batch")
+async def download_invoice_pdfs(
+    request: InvoicePdfBatchRequest
+):
+    """Download several invoices as one ZIP of PDFs"""
+    invoice_ids = list(dict.fromkeys(request.invoiceIds))
+    for invoice_id in invoice_ids:
+        if not ObjectId.is_valid(invoice_id):
+            raise HTTPException(status_code=400, detail=f"Invalid invoiceId: {invoice_id}")
+
+    try:
+        invoices = await InvoiceService.get_invoices_by_ids(invoice_ids)
+        missing = set(invoice_ids) - {invoice.id for invoice in invoices}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Invoices not found: {', '.join(sorted(missing))}")
+
+        archive = await invoice_pdf_renderer.render_zip(invoices)
+
+        return Response(
+            content=archive,
+            media_type="application/zip",
+            headers={"Content-Disposition": "attachment; filename=invoices.zip"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Error generating PDF")
+
 @router.get("/{invoice_id}/pdf")
 async def download_invoice_pdf(
     invoice_id: str
@@ -133,12 +175,17 @@ async def download_invoice_pdf(
         if not invoice:
             raise HTTPException(status_code=404, detail="Invoice not found")
 
-        pdf_buffer = PDFService.generate_invoice_pdf(invoice)
+        pdf_bytes = await invoice_pdf_renderer.render(invoice)
 
         return StreamingResponse(
-            pdf_buffer,
+            iter_pdf_chunks(pdf_bytes),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=invoice_{invoice.invoiceNumber}.pdf"}
+            headers={
+                "Content-Disposition": f"attachment; filename={invoice_pdf_filename(invoice)}",
+                "Content-Length": str(len(pdf_bytes)),
+            }
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Error generating PDF")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error generating PDF")
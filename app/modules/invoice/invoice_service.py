@@ -4,9 +4,11 @@ from bson import ObjectId
 from typing import List, Dict, Any, Optional
 import math
 
+from app.db.indexes import IndexSpec, register_indexes, register_query_probe
 from app.db.mongo import db
 from app.modules.orders.schemas.invoice import InvoiceIn, InvoiceOut, InvoiceItem, PartyDetails
 from app.modules.orders.schemas.orders import OrderIn, OrderItemIn
+from app.utils.pagination import TotalMode, paginate
 from core.sanitize import stringify_object_ids
 
 # Collections
@@ -14,6 +16,19 @@ invoices_collection: AsyncIOMotorCollection = db["invoices"]
 orders_collection: AsyncIOMotorCollection = db["orders"]
 counters_collection: AsyncIOMotorCollection = db["counters"]
 
+register_indexes(
+    "invoices",
+    IndexSpec("invoices_orders", [("orderIds", 1), ("createdAt", -1)]),
+    IndexSpec("invoices_created", [("createdAt", -1), ("_id", -1)]),
+)
+
+register_query_probe(
+    "invoices",
+    {"orderIds": {"$in": [ObjectId()]}},
+    sort=[("createdAt", -1)],
+    description="latest invoice per order",
+)
+
 class InvoiceService:
     @staticmethod
     async def get_next_invoice_number() -> str:
@@ -191,8 +206,26 @@ class InvoiceService:
         return None
 
     @staticmethod
-    async def list_invoices(filters: Dict[str, Any], limit: int = 10, offset: int = 0) -> tuple[List[InvoiceOut], int]:
-        """List invoices with filters and return total count"""
+    async def get_invoices_by_ids(invoice_ids: List[str]) -> List[InvoiceOut]:
+        """Get invoices by ID with a single query, in request order"""
+        cursor = invoices_collection.find(
+            {"_id": {"$in": [ObjectId(invoice_id) for invoice_id in invoice_ids]}}
+        )
+        invoices = {
+            str(invoice["_id"]): InvoiceOut(**stringify_object_ids(invoice))
+            async for invoice in cursor
+        }
+        return [invoices[invoice_id] for invoice_id in invoice_ids if invoice_id in invoices]
+
+    @staticmethod
+    async def list_invoices(
+        filters: Dict[str, Any],
+        limit: int = 10,
+        offset: int = 0,
+        after: Optional[str] = None,
+        total_mode: TotalMode = "exact",
+    ) -> tuple[List[InvoiceOut], Optional[int], Optional[str]]:
+        """List invoices with filters and return total count and next cursor"""
         query = {}
 
         # Search by invoice number
@@ -215,12 +248,17 @@ class InvoiceService:
                 date_query["$lte"] = filters["endDate"]
             query["billDate"] = date_query
 
-        # Get total count
-        total = await invoices_collection.count_documents(query)
-
-        # Get invoices
-        invoices = await invoices_collection.find(query).skip(offset).limit(limit).sort("createdAt", -1).to_list(None)
-        return [InvoiceOut(**stringify_object_ids(inv)) for inv in invoices], total
+        # Get invoices and total count
+        result = await paginate(
+            invoices_collection,
+            query,
+            page=offset // limit + 1,
+            page_size=limit,
+            after=after,
+            total_mode=total_mode,
+        )
+        invoices = [InvoiceOut(**stringify_object_ids(inv)) for inv in result["items"]]
+        return invoices, result["total"], result["nextCursor"]
 
     @staticmethod
     async def update_payment(invoice_id: str, update_data: Dict[str, Any]) -> Optional[InvoiceOut]:
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
+
+from app.modules.invoice.pdf_service import PDFService
+from app.modules.orders.schemas.invoice import InvoiceOut
+from config import settings
+
+
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _render_invoice_pdf(invoice_data: dict[str, Any]) -> bytes:
+    """
+    Render one invoice in a worker process.
+
+    Takes plain data rather than the model so the argument pickles
+    cheaply across the process boundary.
+    """
+
+    invoice = InvoiceOut.model_validate(invoice_data)
+    return PDFService.generate_invoice_pdf(invoice).getvalue()
+
+
+def iter_pdf_chunks(
+    data: bytes,
+    chunk_size: int = PDF_STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+def invoice_pdf_filename(invoice: InvoiceOut) -> str:
+    return f"invoice_{invoice.invoiceNumber or invoice.id}.pdf"
+
+
+class InvoicePDFRenderer:
+    """
+    Render invoice PDFs off the event loop.
+
+    ReportLab is CPU bound, so rendering runs in a process pool and
+    at most `max_workers` renders are in flight; further requests wait
+    on a semaphore instead of queueing unbounded work. Rendered bytes
+    are cached by invoice id and `updatedAt`, in a size-bounded memory
+    LRU and optionally on disk, so any invoice update produces a new
+    key and stale PDFs are never served.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        cache_max_bytes: int,
+        cache_dir: Optional[str] = None,
+    ):
+        self.max_workers = max_workers
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_dir = cache_dir or None
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # --------------------------------------------------------
+    # Cache
+    # --------------------------------------------------------
+
+    @staticmethod
+    def cache_key(invoice: InvoiceOut) -> str:
+        version = invoice.updatedAt.isoformat() if invoice.updatedAt else ""
+        return f"{invoice.id}:{version}"
+
+    def _disk_path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pdf")
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        data = self._cache.get(key)
+        if data is not None:
+            self._cache.move_to_end(key)
+        return data
+
+    def _store(self, key: str, data: bytes) -> None:
+        if len(data) > self.cache_max_bytes:
+            return
+
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_bytes -= len(previous)
+
+        self._cache[key] = data
+        self._cache_bytes += len(data)
+
+        while self._cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._disk_path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as file:
+            file.write(data)
+
+        os.replace(temp_path, path)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._cache_bytes,
+            "maxBytes": self.cache_max_bytes,
+            "hits": self.hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "diskCache": bool(self.cache_dir),
+        }
+
+    # --------------------------------------------------------
+    # Rendering
+    # --------------------------------------------------------
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Forking a process that runs Motor and uvicorn threads
+            # can copy locks held by those threads and deadlock the
+            # child, so workers start from a fresh interpreter.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    async def render(self, invoice: InvoiceOut) -> bytes:
+        key = self.cache_key(invoice)
+
+        data = self._lookup(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        if self.cache_dir:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is not None:
+                self.disk_hits += 1
+                self._store(key, data)
+                return data
+
+        self.misses += 1
+
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                self._get_executor(),
+                _render_invoice_pdf,
+                invoice.model_dump(),
+            )
+
+        self._store(key, data)
+
+        if self.cache_dir:
+            await asyncio.to_thread(self._write_disk, key, data)
+
+        return data
+
+    async def render_zip(self, invoices: list[InvoiceOut]) -> bytes:
+        """
+        Render several invoices and pack them into one ZIP archive.
+
+        PDFs are already compressed, so entries are stored as-is.
+        """
+
+        pdfs = await asyncio.gather(
+            *(self.render(invoice) for invoice in invoices)
+        )
+
+        def build_zip() -> bytes:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+                for invoice, data in zip(invoices, pdfs):
+                    archive.writestr(invoice_pdf_filename(invoice), data)
+            return buffer.getvalue()
+
+        return await asyncio.to_thread(build_zip)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+invoice_pdf_renderer = InvoicePDFRenderer(
+    max_workers=settings.PDF_RENDER_WORKERS,
+    cache_max_bytes=settings.PDF_CACHE_MAX_BYTES,
+    cache_dir=settings.PDF_CACHE_DIR,
+)
+
@@ -2,12 +2,14 @@
 from typing import List
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from app.modules.meal_planner.schemas.sticky_notes import StickyNoteIn, StickyNoteOut
-from app.services.meal_generator_service import generate_meal_plan
+from app.services.meal_generator_service import generate_meal_plan, stream_meal_plan
 from app.services.meal_planner_service import MealPlannerService
 from app.services.sticky_notes_service import create_sticky_note, get_sticky_notes_list
 from app.modules.meal_planner.schemas.meal_planner import MealPlanOut, MealRequestIn, MealOut
+from app.utils.sse import SSE_HEADERS, format_sse
 
 
 router = APIRouter(
@@ -25,11 +27,36 @@ async def create_meal_request(payload: MealRequestIn):
     Create meal request and return meal plans.
     """
 
-    result = generate_meal_plan(payload)
+    result = await generate_meal_plan(payload)
 
     return result
 
 
+@router.post("/meal-request/stream")
+async def stream_meal_request(payload: MealRequestIn):
+    """
+    Stream meal plans as server-sent events.
+
+    Emits one `meal` event per meal as soon as the model has
+    produced it, then a `done` event with the meal count.
+    """
+
+    async def events():
+        count = 0
+
+        async for meal in stream_meal_plan(payload):
+            count += 1
+            yield format_sse("meal", meal.model_dump())
+
+        yield format_sse("done", {"count": count})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.get(
     "/sticky-notes",
     response_model=List[StickyNoteOut],
@@ -63,7 +90,7 @@ async def get_weekly_meals():
     Returns:
         List[MealPlanOut]: A list of meal plans for each day of the week.
     """
-    return meal_planner_service.get_weekly_meals()
+    return await meal_planner_service.get_weekly_meals()
 
 # meals/generate endpoint should return only JSON array of meals, without any wrapping object. Each meal should have the following structure:
 
@@ -75,7 +102,7 @@ async def generate_meal():
     Returns:
         MealOut: A suggested meal.
     """
-    return meal_planner_service.generate_meal()
+    return await meal_planner_service.generate_meal()
 
 
 @router.post("/meals", response_model=dict)
@@ -84,7 +111,7 @@ async def add_meal(payload: MealPlanOut):
     Add a new meal to a specific day.
     """
 
-    return meal_planner_service.add_meal(
+    return await meal_planner_service.add_meal(
         day=payload.day,
         meal_data=payload.meals[0],
     )
@@ -99,7 +126,7 @@ async def update_meal(
     Update existing meal by ID.
     """
 
-    return meal_planner_service.update_meal(
+    return await meal_planner_service.update_meal(
         meal_id=meal_id,
         meal_data=payload,
     )
@@ -114,7 +141,7 @@ async def delete_meal(
     Delete meal by day and meal ID.
     """
 
-    return meal_planner_service.delete_meal(
+    return await meal_planner_service.delete_meal(
         day=day,
         meal_id=meal_id,
     )
@@ -1,16 +1,17 @@
-from math import ceil
 from typing import Optional
 from fastapi import APIRouter, Body, Depends, HTTPException, status
 from bson import ObjectId
 from datetime import datetime, timezone
+from app.db.indexes import IndexSpec, register_indexes, register_query_probe
 from app.db.mongo import db
+from app.modules.dashboard.services.dashboard_stats import dashboard_stats
 from app.modules.orders.schemas.orders import OrderDetailOut, OrderIn, OrderOut, OrderWithInvoiceIn, OrderWithInvoiceOut
 from app.modules.orders.schemas.order_summary import GetOrdersFilterIn, OrderSummaryOut, PaginatedOrdersOut
-from math import ceil
 from fastapi import Body
 from bson import ObjectId
 from app.utils.auth_utils import authenticate
 from app.utils.generate_unique_id_util import generate_order_code
+from app.utils.pagination import TotalMode, paginate
 from core.sanitize import stringify_object_ids
 
 router = APIRouter(
@@ -20,10 +21,87 @@ orders_collection = db["orders"]
 customers_collection = db["customers"]
 invoices_collection = db["invoices"]
 
+register_indexes(
+    "orders",
+    IndexSpec("orders_created", [("createdAt", -1), ("_id", -1)]),
+    IndexSpec("orders_customer_created", [("customerId", 1), ("createdAt", -1), ("_id", -1)]),
+)
+
+register_query_probe(
+    "orders",
+    {},
+    sort=[("createdAt", -1), ("_id", -1)],
+    description="admin order listing",
+)
+register_query_probe(
+    "orders",
+    {"customerId": ObjectId()},
+    sort=[("createdAt", -1), ("_id", -1)],
+    description="customer order history",
+)
+
+
+async def build_order_summaries(orders: list[dict]) -> list[OrderSummaryOut]:
+    """
+    Build order summaries for a page of orders.
+
+    Customers and latest invoices for the whole page are loaded
+    with one `$in` query each, so a page costs three queries in
+    total instead of two per row.
+    """
+    customer_ids = {
+        ObjectId(order["customerId"])
+        for order in orders
+        if order.get("customerId") and ObjectId.is_valid(order["customerId"])
+    }
+    order_ids = [order["_id"] for order in orders]
+
+    customers = {}
+    if customer_ids:
+        async for customer in customers_collection.find(
+            {"_id": {"$in": list(customer_ids)}},
+            {"name": 1},
+        ):
+            customers[customer["_id"]] = customer
+
+    # Newest first, so the first invoice seen per order is its latest.
+    latest_invoices = {}
+    if order_ids:
+        async for invoice in invoices_collection.find(
+            {"orderIds": {"$in": order_ids}},
+            {"orderIds": 1, "paymentStatus": 1},
+        ).sort("createdAt", -1):
+            for order_id in invoice.get("orderIds", []):
+                latest_invoices.setdefault(order_id, invoice)
+
+    summaries = []
+    for order in orders:
+        customer = None
+        if order.get("customerId") and ObjectId.is_valid(order["customerId"]):
+            customer = customers.get(ObjectId(order["customerId"]))
+        if not customer:
+            customer = {"name": order.get("customerName", "")}
+
+        invoice = latest_invoices.get(order["_id"])
+        payment_status = invoice.get("paymentStatus", "pending") if invoice else "pending"
+
+        summaries.append(
+            OrderSummaryOut(
+                id=str(order["_id"]),
+                orderCode=order.get("orderCode", ""),
+                customerName=customer.get("name", ""),
+                createdAt=order.get("createdAt"),
+                itemCount=len(order.get("items", [])),
+                paymentStatus=payment_status,
+                total=order.get("totalAmount", 0.0),
+                orderStatus=order.get("orderStatus", "pending"),
+            )
+        )
+
+    return summaries
+
 @router.post("/search", response_model=dict)
 async def get_orders(filters: GetOrdersFilterIn = Body(...)):
-    skip = (filters.page - 1) * filters.pageSize
-
     # Build query dynamically
     query = {}
     or_conditions = []
@@ -41,47 +119,20 @@ async def get_orders(filters: GetOrdersFilterIn = Body(...)):
     # Determine sort order
     sort_order = -1 if filters.sort == "newest" else 1  # newest = descending, oldest = ascending
 
-    # Count total
-    total_orders = await orders_collection.count_documents(query)
-
-    orders_summary = []
-    cursor = (
-        orders_collection
-        .find(query)
-        .sort("createdAt", sort_order)
-        .skip(skip)
-        .limit(filters.pageSize)
+    result = await paginate(
+        orders_collection,
+        query,
+        page=filters.page,
+        page_size=filters.pageSize,
+        sort_order=sort_order,
+        after=filters.after,
+        total_mode=filters.totalMode,
     )
 
-    async for order in cursor:
-        customer = await customers_collection.find_one({"_id": ObjectId(order["customerId"])})
-        if not customer:
-            customer = {"name": order.get("customerName", "")}
-
-        invoice = await invoices_collection.find({"orderIds": order["_id"]}) \
-                                           .sort("createdAt", -1) \
-                                           .to_list(length=1)
-        invoice = invoice[0] if invoice else None
-        payment_status = invoice.get("paymentStatus", "pending") if invoice else "pending"
-
-        orders_summary.append(
-            OrderSummaryOut(
-                id=str(order["_id"]),
-                orderCode=order.get("orderCode", ""),
-                customerName=customer.get("name", ""),
-                createdAt=order.get("createdAt"),
-                itemCount=len(order.get("items", [])),
-                paymentStatus=payment_status,
-                total=order.get("totalAmount", 0.0),
-                orderStatus=order.get("orderStatus", "pending"),
-            )
-        )
+    orders_summary = await build_order_summaries(result["items"])
 
     return {
-        "total": total_orders,
-        "page": filters.page,
-        "pageSize": filters.pageSize,
-        "pages": ceil(total_orders / filters.pageSize) if total_orders > 0 else 1,
+        **result,
         "items": orders_summary
     }
 
@@ -91,10 +142,10 @@ async def list_orders(
     invoiceId: Optional[str] = None,
     page: int = 1,
     pageSize: int = 10,
-    sort: Optional[str] = "newest"
+    sort: Optional[str] = "newest",
+    after: Optional[str] = None,
+    totalMode: TotalMode = "exact",
 ):
-    skip = (page - 1) * pageSize
-
     query = {}
     if status:
         normalized_status = status.lower()
@@ -108,46 +159,20 @@ async def list_orders(
         else:
             query["invoiceId"] = invoiceId
 
-    total_orders = await orders_collection.count_documents(query)
-
-    orders_summary = []
-    cursor = (
-        orders_collection
-        .find(query)
-        .sort("createdAt", -1 if sort == "newest" else 1)
-        .skip(skip)
-        .limit(pageSize)
+    result = await paginate(
+        orders_collection,
+        query,
+        page=page,
+        page_size=pageSize,
+        sort_order=-1 if sort == "newest" else 1,
+        after=after,
+        total_mode=totalMode,
     )
 
-    async for order in cursor:
-        customer = None
-        if order.get("customerId") and ObjectId.is_valid(order["customerId"]):
-            customer = await customers_collection.find_one({"_id": ObjectId(order["customerId"])})
-        if not customer:
-            customer = {"name": order.get("customerName", "")}
-
-        invoice = await invoices_collection.find({"orderIds": order["_id"]})                                            .sort("createdAt", -1)                                            .to_list(length=1)
-        invoice = invoice[0] if invoice else None
-        payment_status = invoice.get("paymentStatus", "pending") if invoice else "pending"
-
-        orders_summary.append(
-            OrderSummaryOut(
-                id=str(order["_id"]),
-                orderCode=order.get("orderCode", ""),
-                customerName=customer.get("name", ""),
-                createdAt=order.get("createdAt"),
-                itemCount=len(order.get("items", [])),
-                paymentStatus=payment_status,
-                total=order.get("totalAmount", 0.0),
-                orderStatus=order.get("orderStatus", "pending"),
-            )
-        )
+    orders_summary = await build_order_summaries(result["items"])
 
     return {
-        "total": total_orders,
-        "page": page,
-        "pageSize": pageSize,
-        "pages": ceil(total_orders / pageSize) if total_orders > 0 else 1,
+        **result,
         "items": orders_summary
     }
 
@@ -235,6 +260,7 @@ async def place_order(payload: OrderWithInvoiceIn):
     result = await orders_collection.insert_one(order_doc)
     if not result.inserted_id:
         raise HTTPException(status_code=500, detail="Failed to insert order")
+    await dashboard_stats.increment({"totalOrders": 1})
 
     order_id = result.inserted_id
     created_invoice = None
@@ -144,6 +144,16 @@ class CreateInvoiceRequest(BaseModel):
     )
 
 
+class InvoicePdfBatchRequest(BaseModel):
+    """Request for downloading several invoice PDFs as one ZIP."""
+
+    invoiceIds: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+    )
+
+
 class UpdatePaymentRequest(BaseModel):
     """Request for updating invoice payment."""
 
@@ -185,10 +195,12 @@ class InvoiceListResponse(BaseModel):
 
     invoices: List[InvoiceOut]
 
-    total: int
+    total: Optional[int] = None
 
     page: int
 
     limit: int
 
-    pages: int
\ No newline at end of file
+    pages: Optional[int] = None
+
+    nextCursor: Optional[str] = None
\ No newline at end of file
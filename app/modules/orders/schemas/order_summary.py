@@ -3,6 +3,8 @@ from typing import List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.utils.pagination import CursorPageIn
+
 
 class OrderSummaryOut(BaseModel):
     """
@@ -28,16 +30,17 @@ class PaginatedOrdersOut(BaseModel):
     Paginated order summary response.
     """
 
-    total: int = Field(..., ge=0)
+    total: Optional[int] = Field(default=None, ge=0)
     page: int = Field(..., ge=1)
     pageSize: int = Field(..., ge=1)
-    pages: int = Field(..., ge=0)
+    pages: Optional[int] = Field(default=None, ge=0)
     items: List[OrderSummaryOut] = Field(
         default_factory=list,
     )
+    nextCursor: Optional[str] = None
 
 
-class GetOrdersFilterIn(BaseModel):
+class GetOrdersFilterIn(CursorPageIn):
     """
     Filters and pagination parameters for order listing.
     """
@@ -162,6 +162,10 @@ class PublicOrderIn(BaseModel):
         min_length=1,
     )
 
+    # Signed id from POST /quote. When set, the quoted prices
+    # are used and `items` must match the quoted basket.
+    quoteId: Optional[str] = None
+
     miscCharges: list[MiscCharge] = Field(
         default_factory=list
     )
@@ -181,6 +185,27 @@ class PublicOrderIn(BaseModel):
         return sanitize_input(values)
 
 
+class PublicQuoteIn(BaseModel):
+    """
+    Basket to price before checkout.
+
+    Pricing values are calculated by the backend.
+    """
+
+    customerId: Optional[str] = None
+    guestCartId: Optional[str] = None
+
+    items: list[PublicOrderItemIn] = Field(
+        ...,
+        min_length=1,
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def sanitize_payload(cls, values: Any) -> Any:
+        return sanitize_input(values)
+
+
 class PublicOrderWithPaymentIn(BaseModel):
     order: PublicOrderIn
 
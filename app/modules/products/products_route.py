@@ -1,5 +1,4 @@
 from math import ceil
-import re
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from datetime import datetime, timezone
 from bson import ObjectId
@@ -12,10 +11,20 @@ from app.modules.products.schemas.product import (
     ProductOut,
     ProductUpdate,
 )
+from app.modules.dashboard.services.dashboard_stats import dashboard_stats, product_status_delta
+from app.modules.products.service.product_cache import product_cache
+from app.modules.products.service.product_search import (
+    SEARCH_FIELDS,
+    SEARCH_KEYWORDS_FIELD,
+    build_search_filter,
+    build_search_score,
+    search_keywords,
+)
 from app.modules.products.service.product_service import calculate_selling_price
 from app.utils.auth_utils import authenticate
 from app.utils.generate_unique_id_util import generate_product_code
-from core.sanitize import stringify_object_ids
+from app.utils.fast_json import model_json_response
+from app.utils.pagination import paginate
 
 
 # router = APIRouter(prefix="/api/products", tags=["products"])
@@ -28,6 +37,7 @@ collection = db["products"]
 @router.post("/search", response_model=PaginatedProductsOut)
 async def list_products(filters: GetProductsFilterIn = Body(...)):
     query = {}
+    score = None
 
     # -----------------------------
     # Filters
@@ -42,60 +52,40 @@ async def list_products(filters: GetProductsFilterIn = Body(...)):
         search_text = filters.searchText.strip()
 
         if search_text:
-            # Escape user input so special regex characters
-            # don't change the query behavior.
-            search_regex = re.escape(search_text)
-
-            query["$or"] = [
-                {"name": {"$regex": search_regex, "$options": "i"}},
-                {"code": {"$regex": search_regex, "$options": "i"}},
-                {"tags": {"$regex": search_regex, "$options": "i"}},
-                {"categories": {"$regex": search_regex, "$options": "i"}},
-            ]
-
-    # -----------------------------
-    # Pagination
-    # -----------------------------
-    page = max(filters.page, 1)
-    page_size = max(filters.pageSize, 1)
-
-    skip = (page - 1) * page_size
+            # Word, partial word and product code prefixes,
+            # best matches first.
+            query.update(build_search_filter(search_text))
+            score = build_search_score(search_text)
 
     # newest = descending
     # oldest = ascending
     sort_order = -1 if filters.sort == "newest" else 1
 
-    # -----------------------------
-    # Count AFTER applying filters
-    # -----------------------------
-    total = await collection.count_documents(query)
-
     # -----------------------------
     # Query MongoDB
     # Filtering happens in MongoDB BEFORE pagination
     # -----------------------------
-    cursor = (
-        collection.find(query)
-        .sort("createdAt", sort_order)
-        .skip(skip)
-        .limit(page_size)
+    result = await paginate(
+        collection,
+        query,
+        page=filters.page,
+        page_size=filters.pageSize,
+        sort_order=sort_order,
+        after=filters.after,
+        total_mode=filters.totalMode,
+        score=score,
     )
 
-    products = []
-
-    async for doc in cursor:
-        products.append(stringify_object_ids(doc))
-
     # -----------------------------
     # Response
     # -----------------------------
-    return {
-        "total": total,
-        "page": page,
-        "pageSize": page_size,
-        "pages": ceil(total / page_size) if total > 0 else 1,
-        "items": products,
-    }
+    # Raw documents: ProductOut.id reads `_id` itself.
+    return model_json_response(PaginatedProductsOut, result)
+
+# ✅ Storefront product cache counters
+@router.get("/cache/stats")
+async def get_product_cache_stats():
+    return product_cache.stats()
 
 # ✅ Get product by id
 @router.get("/{id}", response_model=ProductOut)
@@ -116,10 +106,13 @@ async def create_product(payload: ProductIn, user=Depends(authenticate)):
     data["createdAt"] = datetime.now(timezone.utc)
     data["updatedAt"] = datetime.now(timezone.utc)
     data["createdBy"] = user.get("email")
+    data[SEARCH_KEYWORDS_FIELD] = search_keywords(data)
     result = await collection.insert_one(data)
     if not result.inserted_id:
         raise HTTPException(status_code=500, detail="Failed to insert order")
 
+    await dashboard_stats.increment(product_status_delta(None, data.get("status")))
+
     data["id"] = str(result.inserted_id)
     return ProductOut(**data)
 
@@ -130,13 +123,16 @@ async def update_product(id: str, payload: ProductIn, user=Depends(authenticate)
     data["price"]["sellingPrice"] = calculate_selling_price(data["price"])
     data["updatedAt"] = datetime.now(timezone.utc)
     data["updatedBy"] = user.get("email")
+    data[SEARCH_KEYWORDS_FIELD] = search_keywords(data)
     updated = await collection.find_one_and_update(
         {"_id": ObjectId(id)},
         {"$set": data},
         return_document=True
     )
+    product_cache.invalidate(ObjectId(id))
     if not updated:
         raise HTTPException(status_code=404, detail="Product not found")
+    await dashboard_stats.mark_stale()
     updated["id"] = str(updated["_id"])
     updated.pop("_id", None)
     return ProductOut(**updated)
@@ -173,15 +169,19 @@ async def patch_product(id: str, payload: ProductUpdate, user=Depends(authentica
         patch["price"] = merged_price
 
 
-    patch["updated_at"] = datetime.now(timezone.utc)
+    patch["updatedAt"] = datetime.now(timezone.utc)
     patch["updatedBy"] = user.get("email")
+    if any(field in patch for field in SEARCH_FIELDS):
+        patch[SEARCH_KEYWORDS_FIELD] = search_keywords({**existing, **patch})
     updated = await collection.find_one_and_update(
         {"_id": ObjectId(id)},
         {"$set": patch},
         return_document=True
     )
+    product_cache.invalidate(ObjectId(id))
     if not updated:
         raise HTTPException(status_code=404, detail="Product not found")
+    await dashboard_stats.increment(product_status_delta(existing.get("status"), updated.get("status")))
     updated["id"] = str(updated["_id"])
     updated.pop("_id", None)
     return ProductOut(**updated)
@@ -198,6 +198,9 @@ async def delete_product(id: str, user=Depends(authenticate)):
             }
         }
     )
+    product_cache.invalidate(ObjectId(id))
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    if result.modified_count:
+        await dashboard_stats.mark_stale()
     return {"message": "Product archived"}
\ No newline at end of file
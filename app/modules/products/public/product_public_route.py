@@ -1,7 +1,13 @@
-from math import ceil
 from bson import ObjectId
 from fastapi import APIRouter, HTTPException, Query
-from app.db.mongo import db
+from app.db.mongo import catalog_collection
+from app.utils.fast_json import model_json_response
+from app.utils.pagination import TotalMode, paginate
+from app.modules.products.service.product_cache import product_cache
+from app.modules.products.service.product_search import (
+    build_search_filter,
+    build_search_score,
+)
 
 from app.modules.products.public.product_public_schema import (
     PaginatedProductsOut,
@@ -10,10 +16,8 @@ from app.modules.products.public.product_public_schema import (
 
 router = APIRouter()
 
-collection = db["products"]
-from math import ceil
-
-from fastapi import Query
+# Read-only catalog queries; may be served by a secondary.
+collection = catalog_collection("products")
 
 
 @router.get(
@@ -25,32 +29,13 @@ async def search_products(
     categories: list[str] | str | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     pageSize: int = Query(default=20, ge=1, le=50),
+    after: str | None = None,
+    totalMode: TotalMode = "exact",
 ):
     query = {
         "status": "published"
     }
-
-    if search:
-        query["$or"] = [
-            {
-                "name": {
-                    "$regex": search,
-                    "$options": "i"
-                }
-            },
-            {
-                "tags": {
-                    "$regex": search,
-                    "$options": "i"
-                }
-            },
-            {
-                "categories": {
-                    "$regex": search,
-                    "$options": "i"
-                }
-            }
-        ]
+    score = None
 
     if categories:
         categories = [
@@ -62,21 +47,23 @@ async def search_products(
     if categories:
         query["categories"] = {"$in": categories}
 
-    total = await collection.count_documents(query)
-
-    cursor = (
-        collection
-        .find(query)
-        .sort("createdAt", -1)
-        .skip((page - 1) * pageSize)
-        .limit(pageSize)
+    if search and search.strip():
+        query.update(build_search_filter(search))
+        score = build_search_score(search)
+
+    result = await paginate(
+        collection,
+        query,
+        page=page,
+        page_size=pageSize,
+        after=after,
+        total_mode=totalMode,
+        score=score,
     )
 
     items = []
 
-    async for item in cursor:
-        price = item.get("price", {})
-
+    for item in result["items"]:
         items.append(
             {
                 "id": str(item["_id"]),
@@ -90,13 +77,15 @@ async def search_products(
             }
         )
 
-    return {
-        "total": total,
-        "page": page,
-        "pageSize": pageSize,
-        "pages": ceil(total / pageSize) if total else 1,
-        "items": items
-    }
+    # Validated and encoded in one native pass; FastAPI skips
+    # its own response_model validation for a Response.
+    return model_json_response(
+        PaginatedProductsOut,
+        {
+            **result,
+            "items": items
+        },
+    )
 
 @router.get(
     "/products/{id}",
@@ -112,22 +101,15 @@ async def get_public_product(id: str):
             detail="Invalid product id"
         )
 
-    product = await collection.find_one(
-        {
-            "_id": object_id,
-            "status": "published"
-        }
-    )
+    product = await product_cache.get(object_id)
 
-    if not product:
+    if not product or product.get("status") != "published":
         raise HTTPException(
             status_code=404,
             detail="Product not found"
         )
 
-    price = product.get("price", {})
-
-    return {
+    return model_json_response(PublicProductOut, {
         "id": str(product["_id"]),
         "name": product.get("name"),
         "description": product.get("description"),
@@ -145,4 +127,4 @@ async def get_public_product(id: str):
         ),
         "price": product.get("price"),
         "status": product.get("status")
-    }
\ No newline at end of file
+    })
\ No newline at end of file
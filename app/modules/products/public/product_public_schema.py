@@ -17,8 +17,9 @@ class PublicProductOut(BaseModel):
     status: str
 
 class PaginatedProductsOut(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
-    pages: int
-    items: List[PublicProductOut]
\ No newline at end of file
+    pages: Optional[int] = None
+    items: List[PublicProductOut]
+    nextCursor: Optional[str] = None
\ No newline at end of file
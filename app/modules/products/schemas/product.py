@@ -3,6 +3,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Literal
 from datetime import datetime
 
+from app.utils.fast_json import MongoId
+from app.utils.pagination import CursorPageIn
+
 # -------- Enums / Literals --------
 ProductStatus = Literal["published", "draft", "scheduled", "inactive"]
 DiscountType = Literal["none", "percentage", "fixed"]
@@ -113,7 +116,7 @@ class ProductUpdate(BaseModel):
     scheduling: Optional[Scheduling] = None
 
 class ProductOut(ProductIn):
-    id: str
+    id: MongoId
     createdAt: Optional[datetime]
     updatedAt: Optional[datetime]
     createdBy: Optional[str] = None
@@ -125,13 +128,14 @@ class ProductOut(ProductIn):
     #     return ProductOut(id=id, taxes=[],createdAt=now, updatedAt=now, **data.model_dump())
 
 class PaginatedProductsOut(BaseModel):
-    total: int
+    total: Optional[int] = None
     page: int
     pageSize: int
-    pages: int
+    pages: Optional[int] = None
     items: List[ProductOut]
+    nextCursor: Optional[str] = None
 
-class GetProductsFilterIn(BaseModel):
+class GetProductsFilterIn(CursorPageIn):
     searchText: Optional[str] = Query(default=None, description="Search in name or code or tags"),
     status: Optional[str] = Query(default=None, description="Filter by status"),
     page: int = Field(1, ge=1, description="Page number (1-based)")
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any, Iterable
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.db.mongo import db
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+products_collection = db["products"]
+
+# Returned by mongod when change streams are used outside a replica set.
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+
+# Written by stock reservations on every checkout. Cached products
+# keep their stock figures until the entry expires.
+STOCK_FIELDS = ("inventory", "stockUpdatedAt")
+
+
+def _is_stock_update(change: dict[str, Any]) -> bool:
+    description = change.get("updateDescription")
+
+    if not description:
+        return False
+
+    fields = [
+        *description.get("updatedFields", {}),
+        *description.get("removedFields", []),
+        *(
+            truncated["field"]
+            for truncated in description.get("truncatedArrays", [])
+        ),
+    ]
+
+    return bool(fields) and all(
+        field.split(".", 1)[0] in STOCK_FIELDS
+        for field in fields
+    )
+
+
+class ProductCache:
+    """
+    Size-bounded LRU/TTL cache of product documents keyed by ObjectId.
+
+    Cached documents are shared between requests; callers must
+    treat them as read-only and build new dicts for responses.
+
+    Entries are invalidated by a change stream on `products`.
+    Stock-only updates (checkout reservations) are ignored, so
+    cached stock figures can lag by up to `ttl_seconds`.
+    On a standalone mongod (no change streams), the cache polls
+    for documents whose `updatedAt` moved forward instead, and
+    drops cached ids that no longer exist, since deletes leave
+    no `updatedAt` behind.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        ttl_seconds: float = 300,
+        poll_interval_seconds: float = 5,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+
+        self._entries: OrderedDict[
+            ObjectId,
+            tuple[float, dict[str, Any]],
+        ] = OrderedDict()
+
+        self._task: asyncio.Task | None = None
+        self._mode: str | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ========================================================
+    # Reads
+    # ========================================================
+
+    def _lookup(self, product_id: ObjectId) -> dict[str, Any] | None:
+        entry = self._entries.get(product_id)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, product = entry
+
+        if expires_at <= monotonic():
+            del self._entries[product_id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(product_id)
+        self.hits += 1
+
+        return product
+
+    def _store(self, product: dict[str, Any]) -> None:
+        self._entries[product["_id"]] = (
+            monotonic() + self.ttl_seconds,
+            product,
+        )
+        self._entries.move_to_end(product["_id"])
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, product_id: ObjectId) -> dict[str, Any] | None:
+        """
+        Return a product by id, loading it on a miss.
+        """
+
+        products = await self.get_many([product_id])
+
+        return products.get(product_id)
+
+    async def get_many(
+        self,
+        product_ids: Iterable[ObjectId],
+    ) -> dict[ObjectId, dict[str, Any]]:
+        """
+        Return products by id. All misses are loaded with one
+        `$in` query. Missing products are absent from the map.
+        """
+
+        found: dict[ObjectId, dict[str, Any]] = {}
+        missing: list[ObjectId] = []
+
+        for product_id in dict.fromkeys(product_ids):
+            product = self._lookup(product_id)
+
+            if product is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = product
+
+        if missing:
+            async for product in products_collection.find(
+                {"_id": {"$in": missing}}
+            ):
+                self._store(product)
+                found[product["_id"]] = product
+
+        return found
+
+    # ========================================================
+    # Invalidation
+    # ========================================================
+
+    def invalidate(self, product_id: ObjectId) -> None:
+        if self._entries.pop(product_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "invalidationMode": self._mode,
+        }
+
+    # ========================================================
+    # Background watcher
+    # ========================================================
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                await self._watch_change_stream()
+
+            except OperationFailure as exc:
+                if exc.code != CHANGE_STREAM_NOT_SUPPORTED:
+                    logger.warning(f"Product cache change stream failed: {exc}")
+                    self.clear()
+                    await asyncio.sleep(self.poll_interval_seconds)
+                    continue
+
+                logger.info(
+                    "Change streams unavailable, product cache "
+                    "falls back to polling updatedAt"
+                )
+                await self._poll_updates()
+                return
+
+            except PyMongoError as exc:
+                # Events may have been missed while disconnected.
+                logger.warning(f"Product cache change stream failed: {exc}")
+                self.clear()
+                await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _watch_change_stream(self) -> None:
+        async with products_collection.watch(
+            [
+                {
+                    "$match": {
+                        "operationType": {
+                            "$in": ["insert", "update", "replace", "delete"],
+                        }
+                    }
+                },
+                {"$project": {"documentKey": 1, "updateDescription": 1}},
+            ]
+        ) as stream:
+            self._mode = "change_stream"
+
+            async for change in stream:
+                if _is_stock_update(change):
+                    continue
+
+                self.invalidate(change["documentKey"]["_id"])
+
+    async def _poll_updates(self) -> None:
+        self._mode = "polling"
+        last_seen = datetime.now(timezone.utc)
+
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+
+            try:
+                async for product in products_collection.find(
+                    {"updatedAt": {"$gt": last_seen}},
+                    {"_id": 1, "updatedAt": 1},
+                ):
+                    self.invalidate(product["_id"])
+
+                    updated_at = product["updatedAt"]
+
+                    if updated_at.tzinfo is None:
+                        updated_at = updated_at.replace(tzinfo=timezone.utc)
+
+                    last_seen = max(last_seen, updated_at)
+
+                await self._evict_deleted()
+
+            except PyMongoError as exc:
+                logger.warning(f"Product cache polling failed: {exc}")
+
+    async def _evict_deleted(self) -> None:
+        cached_ids = list(self._entries)
+
+        if not cached_ids:
+            return
+
+        existing = {
+            product["_id"]
+            async for product in products_collection.find(
+                {"_id": {"$in": cached_ids}},
+                {"_id": 1},
+            )
+        }
+
+        for product_id in cached_ids:
+            if product_id not in existing:
+                self.invalidate(product_id)
+
+
+product_cache = ProductCache(
+    max_size=settings.PRODUCT_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRODUCT_CACHE_TTL_SECONDS,
+    poll_interval_seconds=settings.PRODUCT_CACHE_POLL_SECONDS,
+)
@@ -0,0 +1,216 @@
+import re
+from typing import Any, Iterable, Optional
+
+from bson.regex import Regex
+from pymongo import UpdateOne
+
+from app.db.indexes import (
+    IndexSpec,
+    register_indexes,
+    register_query_probe,
+    retire_indexes,
+)
+from app.db.mongo import db
+
+products_collection = db["products"]
+
+# Normalized search tokens: the lower-cased words of every
+# searchable field, kept up to date on each product write.
+SEARCH_KEYWORDS_FIELD = "searchKeywords"
+
+SEARCH_FIELDS = ("name", "code", "tags", "categories")
+
+# Search terms beyond this are ignored.
+MAX_SEARCH_TERMS = 8
+
+# Relevance: one point per matched keyword, plus this for each
+# search term that is a whole word of the name or code.
+EXACT_WORD_BONUS = 2
+
+BACKFILL_BATCH_SIZE = 500
+
+_WORD = re.compile(r"\w+")
+
+
+register_indexes(
+    "products",
+    IndexSpec("products_search_keywords", [(SEARCH_KEYWORDS_FIELD, 1)]),
+    IndexSpec("products_status_created", [("status", 1), ("createdAt", -1), ("_id", -1)]),
+    IndexSpec("products_created", [("createdAt", -1), ("_id", -1)]),
+)
+
+# Replaced by products_search_keywords.
+retire_indexes("products", "products_text_search", "products_code")
+
+register_query_probe(
+    "products",
+    {"status": "published"},
+    sort=[("createdAt", -1), ("_id", -1)],
+    description="published products, newest first",
+)
+
+register_query_probe(
+    "products",
+    {SEARCH_KEYWORDS_FIELD: Regex("^shir")},
+    description="product search, word prefix",
+)
+
+
+def _words(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        return _WORD.findall(value.lower())
+
+    if isinstance(value, (list, tuple)):
+        return [
+            word
+            for item in value
+            if isinstance(item, str)
+            for word in _WORD.findall(item.lower())
+        ]
+
+    return ()
+
+
+def search_keywords(product: dict[str, Any]) -> list[str]:
+    """
+    Search tokens for a product document.
+
+    Codes are split like any other text (PRD-20250812-49301 ->
+    prd, 20250812, 49301), so full codes, code fragments and
+    partial words are all matched as token prefixes.
+    """
+
+    return sorted(
+        {
+            word
+            for field in SEARCH_FIELDS
+            for word in _words(product.get(field))
+        }
+    )
+
+
+def _search_terms(search: str) -> list[str]:
+    """Distinct lower-cased words of a search, longest first."""
+    terms = sorted(set(_WORD.findall(search.lower())), key=lambda term: (-len(term), term))
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def build_search_filter(search: str) -> dict[str, Any]:
+    """
+    Build the MongoDB filter for a product search term.
+
+    Every word of the term must be the start of a search token,
+    so "red shir" finds "Red Shirt" and "PRD-2025" finds every
+    product code from 2025. Each word becomes a case-sensitive
+    `^` prefix on the lower-cased `searchKeywords` array, which
+    the products_search_keywords index answers with a range scan.
+    """
+
+    prefixes = [Regex(f"^{re.escape(term)}") for term in _search_terms(search)]
+
+    if not prefixes:
+        # Nothing searchable (punctuation only): match nothing.
+        return {SEARCH_KEYWORDS_FIELD: {"$in": []}}
+
+    if len(prefixes) == 1:
+        return {SEARCH_KEYWORDS_FIELD: prefixes[0]}
+
+    # The longest (most selective) prefix comes first and drives
+    # the index scan.
+    return {SEARCH_KEYWORDS_FIELD: {"$all": prefixes}}
+
+
+def build_search_score(search: str) -> Optional[dict[str, Any]]:
+    """
+    Build the relevance expression for a product search, for
+    `paginate(score=...)`.
+
+    A product scores one point per search keyword that starts with
+    a search word, so "frame" ranks "Frame, Frames" above "Frame",
+    plus `EXACT_WORD_BONUS` for every search word that is a whole
+    word of its name or code, so "oak" ranks "Oak Shelf" above
+    "Oakwood Shelf". None when the search has no words.
+    """
+
+    terms = _search_terms(search)
+
+    if not terms:
+        return None
+
+    matched_keywords = {
+        "$size": {
+            "$filter": {
+                "input": {"$ifNull": [f"${SEARCH_KEYWORDS_FIELD}", []]},
+                "as": "keyword",
+                "cond": {
+                    "$or": [
+                        {"$eq": [{"$indexOfCP": ["$$keyword", term]}, 0]}
+                        for term in terms
+                    ]
+                },
+            }
+        }
+    }
+
+    name_and_code = {
+        "$concat": [
+            {"$ifNull": ["$name", ""]},
+            " ",
+            {"$ifNull": ["$code", ""]},
+        ]
+    }
+
+    exact_words = [
+        {
+            "$cond": [
+                {
+                    "$regexMatch": {
+                        "input": name_and_code,
+                        "regex": rf"\b{re.escape(term)}\b",
+                        "options": "i",
+                    }
+                },
+                EXACT_WORD_BONUS,
+                0,
+            ]
+        }
+        for term in terms
+    ]
+
+    return {"$add": [matched_keywords, *exact_words]}
+
+
+async def backfill_search_keywords(collection: Any = products_collection) -> int:
+    """
+    Add `searchKeywords` to products written before it existed.
+
+    Run at boot; a no-op once every product has the field.
+    """
+
+    updated = 0
+    batch = []
+
+    async for product in collection.find(
+        {SEARCH_KEYWORDS_FIELD: {"$exists": False}},
+        {field: 1 for field in SEARCH_FIELDS},
+    ):
+        batch.append(
+            UpdateOne(
+                {"_id": product["_id"]},
+                {"$set": {SEARCH_KEYWORDS_FIELD: search_keywords(product)}},
+            )
+        )
+
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    if updated:
+        print(f"✅ Search keywords added to {updated} products.")
+
+    return updated
@@ -3,14 +3,18 @@ from typing import Optional
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 
 from app.services.auth.token_service import (
     get_current_customer,
     logout_customer,
     refresh_access_token,
+    security,
 )
+from app.services.auth.customer_cache import customer_cache
 
+from app.db.indexes import IndexSpec, register_indexes
 from app.db.mongo import db
 
 router = APIRouter()
@@ -18,6 +22,14 @@ router = APIRouter()
 address_collection = db["customer_addresses"]
 customers_collection = db["customers"]
 
+register_indexes(
+    "customer_addresses",
+    IndexSpec(
+        "customer_addresses_customer",
+        [("customerId", 1), ("isDefault", -1), ("updatedAt", -1)],
+    ),
+)
+
 
 class CustomerProfileResponse(BaseModel):
     id: str
@@ -240,7 +252,7 @@ async def refresh_token(
     """
 
     try:
-        result = refresh_access_token(
+        result = await refresh_access_token(
             refresh_token=payload.refresh_token,
         )
     except Exception as exc:
@@ -249,10 +261,10 @@ async def refresh_token(
             detail="Invalid or expired refresh token.",
         ) from exc
 
-    if not result.get("success"):
+    if not result or not result.get("success"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=result.get(
+            detail=(result or {}).get(
                 "message",
                 "Invalid or expired refresh token.",
             ),
@@ -430,6 +442,8 @@ async def create_address(
 
     address["_id"] = result.inserted_id
 
+    customer_cache.invalidate(customer_id)
+
     return {
         "success": True,
         "message": "Address added successfully.",
@@ -542,6 +556,8 @@ async def update_address(
         }
     )
 
+    customer_cache.invalidate(customer_id)
+
     return {
         "success": True,
         "message": "Address updated successfully.",
@@ -625,6 +641,8 @@ async def delete_address(
                 },
             )
 
+    customer_cache.invalidate(customer_id)
+
     return {
         "success": True,
         "message": "Address deleted successfully.",
@@ -709,6 +727,8 @@ async def set_default_address(
         }
     )
 
+    customer_cache.invalidate(customer_id)
+
     return {
         "success": True,
         "message": "Default address updated successfully.",
@@ -736,25 +756,15 @@ async def get_customer_profile(
     Get the currently authenticated customer's profile.
     """
 
-    customer_id = current_customer.get("_id")
-
-    if not customer_id:
+    if not current_customer.get("_id"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid customer authentication.",
         )
 
-    customer = await customers_collection.find_one(
-        {"_id": customer_id}
-    )
-
-    if not customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Customer profile not found.",
-        )
-
-    return serialize_customer_profile(customer)
+    # get_current_customer already loaded the document through the
+    # customer cache, which profile updates invalidate.
+    return serialize_customer_profile(current_customer)
 
 
 # ============================================================
@@ -833,6 +843,8 @@ async def update_customer_profile(
         },
     )
 
+    customer_cache.invalidate(customer_id)
+
     # ========================================================
     # GET UPDATED CUSTOMER
     # ========================================================
@@ -862,6 +874,7 @@ async def update_customer_profile(
 @router.post("/logout")
 async def logout(
     customer=Depends(get_current_customer),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
     """
     Logout currently authenticated customer.
@@ -874,7 +887,7 @@ async def logout(
         )
 
     await logout_customer(
-        customer_id=str(customer["_id"]),
+        token=credentials.credentials,
     )
 
     return {
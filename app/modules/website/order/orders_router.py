@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
 
-from app.modules.orders.schemas.orders import PublicOrderIn, VerifyWebsitePaymentIn
+from app.modules.orders.schemas.orders import PublicOrderIn, PublicQuoteIn, VerifyWebsitePaymentIn
 from app.modules.website.order.schemas.orders_schema import WebsiteOrdersResponse
-from app.modules.website.order.services.checkout_service import CheckoutService
+from app.modules.website.order.services.checkout_service import CheckoutService, CheckoutServiceError
 from app.modules.website.order.services.order_service import WebsiteOrderService
 from app.services.auth.token_service import get_current_customer
 from app.utils.auth_utils import authenticate
+from app.utils.pagination import TotalMode
+from app.utils.server_timing import ServerTiming
 
 from app.db.mongo import db
 from core.sanitize import stringify_object_ids
@@ -27,6 +29,8 @@ checkout_service = CheckoutService()
 async def get_my_orders(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
+    after: str | None = None,
+    totalMode: TotalMode = "exact",
     current_user=Depends(get_current_customer)
 ):
     customer_id = current_user["_id"]
@@ -35,6 +39,8 @@ async def get_my_orders(
         customer_id=customer_id,
         page=page,
         limit=limit,
+        after=after,
+        total_mode=totalMode,
     )
 
     return stringify_object_ids({
@@ -45,16 +51,37 @@ async def get_my_orders(
             "limit": result["limit"],
             "total": result["total"],
             "pages": result["pages"],
+            "nextCursor": result["nextCursor"],
         },
     })
 
 
 
+@router.post(
+    "/quote",
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_public_quote(payload: PublicQuoteIn):
+    """
+    Price a basket for checkout.
+
+    Send the returned `quoteId` with the checkout to reuse
+    these prices. Quotes expire after QUOTE_TTL_SECONDS.
+    """
+    try:
+        return await checkout_service.create_quote(payload)
+    except CheckoutServiceError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+
 @router.post(
     "/checkout",
     status_code=status.HTTP_201_CREATED,
 )
-async def create_public_checkout(payload: PublicOrderIn):
+async def create_public_checkout(payload: PublicOrderIn, response: Response):
     """
     Create a public website checkout.
 
@@ -64,14 +91,19 @@ async def create_public_checkout(payload: PublicOrderIn):
     For COD, the order is placed immediately with pending
     payment status.
     """
+    timing = ServerTiming()
+
     try:
-        return await checkout_service.create_checkout(payload)
-    except checkout_service.CheckoutServiceError as exc:
+        result = await checkout_service.create_checkout(payload, timing)
+    except CheckoutServiceError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(exc),
         ) from exc
 
+    timing.apply(response)
+    return result
+
 
 @router.post("/verify-payment")
 async def verify_public_payment(
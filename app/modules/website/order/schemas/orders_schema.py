@@ -56,8 +56,9 @@ class WebsiteOrderResponse(BaseModel):
 class WebsiteOrderPagination(BaseModel):
     page: int
     limit: int
-    total: int
-    pages: int
+    total: Optional[int] = None
+    pages: Optional[int] = None
+    nextCursor: Optional[str] = None
 
 
 class WebsiteOrdersResponse(BaseModel):
@@ -1,9 +1,15 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from bson import ObjectId
 
-from app.db.mongo import db
+from app.db.mongo import client, db, supports_transactions
+from app.modules.dashboard.services.dashboard_stats import dashboard_stats
+from app.modules.products.service.product_cache import product_cache
+from app.modules.website.order.services.inventory_service import (
+    InventoryServiceError,
+    inventory_service,
+)
 from app.modules.website.order.services.invoice_service import (
     InvoiceServiceError,
     invoice_service,
@@ -12,9 +18,14 @@ from app.modules.website.order.services.payment_service import (
     PaymentServiceError,
     payment_service,
 )
+from app.modules.website.order.services.quote_service import (
+    QuoteServiceError,
+    quote_service,
+)
 from app.utils.generate_unique_id_util import generate_order_code
 from app.utils.mongo_serializer import serialize_mongo
-from app.utils.pricing import get_product_pricing
+from app.utils.pricing import get_product_pricing, pricing_version
+from app.utils.server_timing import ServerTiming
 from config import settings
 
 
@@ -28,46 +39,129 @@ class CheckoutServiceError(Exception):
 
 
 class CheckoutService:
+    async def create_quote(
+        self,
+        payload: Any,
+    ) -> dict[str, Any]:
+        """
+        Price a basket once and store it as a quote.
+
+        Checkout with the returned `quoteId` reuses these prices
+        until the quote expires or a product's pricing changes.
+        """
+        customer_id = self._validate_customer_id(
+            payload.customerId
+        )
+
+        products = await self._load_products(
+            payload.items
+        )
+
+        (
+            processed_items,
+            subtotal,
+            product_discount,
+            total_tax,
+            excluded_tax_total,
+        ) = await self._process_items(
+            payload.items,
+            products=products,
+        )
+
+        quote = await quote_service.create(
+            customer_id=customer_id,
+            guest_cart_id=payload.guestCartId,
+            items=processed_items,
+            totals={
+                "subtotal": subtotal,
+                "productDiscount": product_discount,
+                "totalTax": total_tax,
+                "excludedTaxTotal": excluded_tax_total,
+            },
+            product_versions={
+                str(product_id): pricing_version(product)
+                for product_id, product in products.items()
+            },
+        )
+
+        return {
+            "success": True,
+            "quoteId": quote["quoteId"],
+            "expiresAt": quote["expiresAt"],
+            "items": processed_items,
+            "summary": {
+                "subtotal": subtotal,
+                "discount": product_discount,
+                "totalTax": total_tax,
+                "taxToAdd": excluded_tax_total,
+                "total": round(
+                    subtotal + excluded_tax_total,
+                    2,
+                ),
+            },
+        }
+
     async def create_checkout(
         self,
         payload: Any,
+        timing: ServerTiming | None = None,
     ) -> dict[str, Any]:
         """
         Create an order and initialize checkout payment.
 
         Online:
-        1. Validate products and stock.
-        2. Calculate pricing server-side.
-        3. Create order.
-        4. Create invoice.
+        1. Validate products.
+        2. Calculate pricing server-side, or reuse a quote.
+        3. Reserve stock until the payment window expires.
+        4. Write order and invoice together.
         5. Create Razorpay order.
         6. Link Razorpay order to invoice.
         7. Return checkout information.
 
         COD:
-        1. Validate products and stock.
-        2. Calculate pricing server-side.
-        3. Create order.
-        4. Create invoice.
-        5. Mark order as placed.
+        1. Validate products.
+        2. Calculate pricing server-side, or reuse a quote.
+        3. Reserve stock.
+        4. Write the placed order and its invoice together.
+        5. Commit the stock.
         6. Keep payment pending.
+
+        The response is built from the documents in memory.
+        Per-stage durations are recorded on `timing`.
         """
         order = payload
         now = datetime.now(timezone.utc)
+        timing = timing or ServerTiming()
 
         customer_id = self._validate_customer_id(
             order.customerId
         )
 
-        (
-            processed_items,
-            subtotal,
-            product_discount,
-            total_tax,
-            excluded_tax_total,
-        ) = await self._process_items(
-            order.items
-        )
+        quote = None
+
+        with timing.measure("pricing"):
+            if order.quoteId:
+                quote = await self._load_quote(
+                    order=order,
+                    customer_id=customer_id,
+                )
+                totals = quote["totals"]
+
+                processed_items = quote["items"]
+                subtotal = totals["subtotal"]
+                product_discount = totals["productDiscount"]
+                total_tax = totals["totalTax"]
+                excluded_tax_total = totals["excludedTaxTotal"]
+            else:
+                (
+                    processed_items,
+                    subtotal,
+                    product_discount,
+                    total_tax,
+                    excluded_tax_total,
+                ) = await self._process_items(
+                    order.items
+                )
 
         # IMPORTANT:
         # Do not trust promotional discount values from
@@ -106,6 +200,19 @@ class CheckoutService:
 
         order_code = generate_order_code()
 
+        with timing.measure("reserve"):
+            reservation_id = await self._reserve_stock(
+                processed_items=processed_items,
+                order_code=order_code,
+                payment_method=order.paymentMethod,
+                now=now,
+            )
+
+        # Ids are assigned up front so both documents can be
+        # written together and returned without re-reading them.
+        order_id = ObjectId()
+        invoice_id = ObjectId()
+
         order_doc = self._build_order_document(
             order=order,
             customer_id=customer_id,
@@ -121,74 +228,70 @@ class CheckoutService:
             total_amount=total_amount,
             now=now,
         )
+        order_doc["_id"] = order_id
+        order_doc["invoiceId"] = str(invoice_id)
+        order_doc["stockReservationId"] = reservation_id
 
-        order_id = await self._create_order(
-            order_doc
-        )
-
-        invoice_id: ObjectId | None = None
+        if quote:
+            order_doc["quoteId"] = quote["_id"]
 
         try:
-            invoice = await invoice_service.create_invoice(
+            invoice_doc = self._build_invoice_document(
+                order=order,
                 order_id=order_id,
-                customer_name=order.customerName,
+                invoice_id=invoice_id,
                 total_amount=total_amount,
-                payment_method=order.paymentMethod,
-                payment_provider=(
-                    "razorpay"
-                    if order.paymentMethod == "online"
-                    else "cod"
-                ),
                 now=now,
             )
 
-            invoice_id = invoice.get("_id")
-
-            if not invoice_id:
-                raise InvoiceServiceError(
-                    "Invoice ID was not returned."
+            with timing.measure("write"):
+                await self._write_order_and_invoice(
+                    order_doc=order_doc,
+                    invoice_doc=invoice_doc,
                 )
-
-            await invoice_service.update_bill_to(
-                invoice_id=invoice_id,
-                bill_to=self._build_bill_to(order),
+        except Exception as exc:
+            # Nothing was written; only the stock needs returning.
+            await inventory_service.release(
+                reservation_id
             )
 
-            await orders_collection.update_one(
-                {"_id": order_id},
-                {
-                    "$set": {
-                        "invoiceId": str(invoice_id),
-                        "updatedAt": now,
-                    }
-                },
-            )
+            if isinstance(exc, (CheckoutServiceError, InvoiceServiceError)):
+                raise
 
+            raise CheckoutServiceError(
+                "Failed to create order."
+            ) from exc
+
+        await dashboard_stats.increment(
+            {"totalOrders": 1}
+        )
+
+        try:
             if order.paymentMethod == "online":
-                payment = (
-                    await self._initialize_online_payment(
-                        order_id=order_id,
-                        order_code=order_code,
-                        invoice_id=invoice_id,
-                        total_amount=total_amount,
+                with timing.measure("payment"):
+                    payment, invoice_doc = (
+                        await self._initialize_online_payment(
+                            order_id=order_id,
+                            order_code=order_code,
+                            invoice_id=invoice_id,
+                            total_amount=total_amount,
+                        )
                     )
-                )
 
-                return await self._build_response(
-                    order_id=order_id,
-                    invoice_id=invoice_id,
+                return self._build_response(
+                    order=order_doc,
+                    invoice=invoice_doc,
                     payment=payment,
                 )
 
-            await self._place_cod_order(
-                order_id=order_id,
-                invoice_id=invoice_id,
-                now=now,
-            )
+            with timing.measure("commit"):
+                await inventory_service.commit(
+                    reservation_id
+                )
 
-            return await self._build_response(
-                order_id=order_id,
-                invoice_id=invoice_id,
+            return self._build_response(
+                order=order_doc,
+                invoice=invoice_doc,
                 payment=None,
             )
 
@@ -200,6 +303,7 @@ class CheckoutService:
             await self._rollback_checkout(
                 order_id=order_id,
                 invoice_id=invoice_id,
+                reservation_id=reservation_id,
             )
             raise
 
@@ -207,6 +311,7 @@ class CheckoutService:
             await self._rollback_checkout(
                 order_id=order_id,
                 invoice_id=invoice_id,
+                reservation_id=reservation_id,
             )
 
             raise CheckoutServiceError(
@@ -216,6 +321,7 @@ class CheckoutService:
     async def _process_items(
         self,
         items: list[Any],
+        products: dict[ObjectId, dict[str, Any]] | None = None,
     ) -> tuple[
         list[dict[str, Any]],
         float,
@@ -226,6 +332,9 @@ class CheckoutService:
         """
         Validate products and calculate pricing
         completely from backend product data.
+
+        `products` may be passed when the caller already
+        loaded them.
         """
         processed_items: list[dict[str, Any]] = []
 
@@ -247,21 +356,22 @@ class CheckoutService:
                     f"Invalid product ID: {product_id}"
                 )
 
-            quantity = int(item.quantity)
-
-            if quantity <= 0:
+            if int(item.quantity) <= 0:
                 raise CheckoutServiceError(
                     "Quantity must be greater than zero."
                 )
 
-            product_object_id = ObjectId(
-                product_id
+        if products is None:
+            products = await self._load_products(
+                items
             )
 
-            product = (
-                await products_collection.find_one(
-                    {"_id": product_object_id}
-                )
+        for item in items:
+            product_id = item.productId
+            quantity = int(item.quantity)
+
+            product = products.get(
+                ObjectId(product_id)
             )
 
             if not product:
@@ -269,11 +379,6 @@ class CheckoutService:
                     f"Product not found: {product_id}"
                 )
 
-            self._validate_stock(
-                product=product,
-                quantity=quantity,
-            )
-
             pricing = (
                 self._calculate_product_pricing(
                     product=product,
@@ -329,6 +434,100 @@ class CheckoutService:
             round(excluded_tax_total, 2),
         )
 
+    @staticmethod
+    async def _load_products(
+        items: list[Any],
+    ) -> dict[ObjectId, dict[str, Any]]:
+        """Load every product of the basket."""
+        # One `$in` query for every product not already cached.
+        return await product_cache.get_many(
+            [
+                ObjectId(item.productId)
+                for item in items
+                if ObjectId.is_valid(item.productId)
+            ]
+        )
+
+    @staticmethod
+    def _basket(
+        items: list[Any],
+    ) -> dict[str, int]:
+        """Quantity per product ID."""
+        basket: dict[str, int] = {}
+
+        for item in items:
+            basket[item.productId] = (
+                basket.get(item.productId, 0)
+                + int(item.quantity)
+            )
+
+        return basket
+
+    async def _load_quote(
+        self,
+        *,
+        order: Any,
+        customer_id: ObjectId | None,
+    ) -> dict[str, Any]:
+        """
+        Load a quote for checkout without re-pricing it.
+
+        The quote must belong to the same customer and cover the
+        same basket. Product pricing versions are re-checked in
+        one batch; stock is re-checked by the reservation.
+        """
+        try:
+            quote = await quote_service.get(
+                order.quoteId
+            )
+        except QuoteServiceError as exc:
+            raise CheckoutServiceError(
+                str(exc)
+            ) from exc
+
+        if quote.get("customerId") != customer_id:
+            raise CheckoutServiceError(
+                "Invalid quote."
+            )
+
+        quoted_basket: dict[str, int] = {}
+
+        for item in quote["items"]:
+            quoted_basket[item["productId"]] = (
+                quoted_basket.get(item["productId"], 0)
+                + int(item["quantity"])
+            )
+
+        if self._basket(order.items) != quoted_basket:
+            raise CheckoutServiceError(
+                "Cart has changed since the quote was issued. "
+                "Please review your cart."
+            )
+
+        versions = quote.get("productVersions") or {}
+
+        products = await product_cache.get_many(
+            [ObjectId(product_id) for product_id in versions]
+        )
+
+        for product_id, version in versions.items():
+            product = products.get(
+                ObjectId(product_id)
+            )
+
+            if not product:
+                raise CheckoutServiceError(
+                    f"Product not found: {product_id}"
+                )
+
+            if pricing_version(product) != version:
+                raise CheckoutServiceError(
+                    f"Price of {product.get('name', 'a product')} "
+                    "has changed. Please review your cart."
+                )
+
+        return quote
+
     @staticmethod
     def _validate_customer_id(
         customer_id: str | None,
@@ -345,47 +544,40 @@ class CheckoutService:
         return ObjectId(customer_id)
 
     @staticmethod
-    def _validate_stock(
+    async def _reserve_stock(
         *,
-        product: dict[str, Any],
-        quantity: int,
-    ) -> None:
-        """Validate available product inventory."""
-        inventory = product.get("inventory") or {}
+        processed_items: list[dict[str, Any]],
+        order_code: str,
+        payment_method: str,
+        now: datetime,
+    ) -> ObjectId:
+        """
+        Reserve stock for the whole basket.
 
-        try:
-            shelf_quantity = int(
-                inventory.get(
-                    "quantityInShelf"
-                )
-                or 0
-            )
+        Online orders hold stock only until the payment window
+        expires; COD orders are committed once placed.
+        """
+        expires_at = None
 
-            warehouse_quantity = int(
-                inventory.get(
-                    "quantityInWarehouse"
-                )
-                or 0
+        if payment_method == "online":
+            expires_at = now + timedelta(
+                minutes=settings.STOCK_RESERVATION_TTL_MINUTES
             )
-        except (TypeError, ValueError) as exc:
-            raise CheckoutServiceError(
-                "Invalid inventory data."
-            ) from exc
-
-        available_stock = (
-            shelf_quantity + warehouse_quantity
-        )
 
-        if available_stock < quantity:
-            product_name = product.get(
-                "name",
-                "product",
+        try:
+            return await inventory_service.reserve(
+                items=processed_items,
+                order_code=order_code,
+                expires_at=expires_at,
+                product_names={
+                    ObjectId(item["productId"]): item.get("name") or "product"
+                    for item in processed_items
+                },
             )
-
+        except InventoryServiceError as exc:
             raise CheckoutServiceError(
-                f"Insufficient stock for "
-                f"{product_name}."
-            )
+                str(exc)
+            ) from exc
 
     @staticmethod
     def _calculate_product_pricing(
@@ -734,28 +926,86 @@ class CheckoutService:
             "cancelledAmount": 0.0,
         }
 
+    def _build_invoice_document(
+        self,
+        *,
+        order: Any,
+        order_id: ObjectId,
+        invoice_id: ObjectId,
+        total_amount: float,
+        now: datetime,
+    ) -> dict[str, Any]:
+        """Build the invoice MongoDB document for an order."""
+        is_online = (
+            order.paymentMethod == "online"
+        )
+
+        invoice_doc = invoice_service.build_invoice_document(
+            order_id=order_id,
+            customer_name=order.customerName,
+            total_amount=total_amount,
+            payment_method=(
+                "online"
+                if is_online
+                else "cod"
+            ),
+            payment_provider=(
+                "razorpay"
+                if is_online
+                else "cod"
+            ),
+            bill_to=self._build_bill_to(order),
+            now=now,
+        )
+        invoice_doc["_id"] = invoice_id
+
+        if not is_online:
+            invoice_doc["paymentMethod"] = "cod"
+
+        return invoice_doc
+
     @staticmethod
-    async def _create_order(
+    async def _write_order_and_invoice(
+        *,
         order_doc: dict[str, Any],
-    ) -> ObjectId:
-        """Create an order document."""
-        try:
-            result = (
+        invoice_doc: dict[str, Any],
+    ) -> None:
+        """
+        Insert the order and its invoice as one unit.
+
+        Uses a multi-document transaction where the deployment
+        supports it. On a standalone mongod the order is removed
+        again if the invoice insert fails.
+        """
+        if await supports_transactions():
+            async def write(session) -> None:
                 await orders_collection.insert_one(
-                    order_doc
+                    order_doc,
+                    session=session,
+                )
+                await invoices_collection.insert_one(
+                    invoice_doc,
+                    session=session,
                 )
-            )
-        except Exception as exc:
-            raise CheckoutServiceError(
-                "Failed to create order."
-            ) from exc
 
-        if not result.inserted_id:
-            raise CheckoutServiceError(
-                "Failed to create order."
-            )
+            async with await client.start_session() as session:
+                await session.with_transaction(write)
+
+            return
+
+        await orders_collection.insert_one(
+            order_doc
+        )
 
-        return result.inserted_id
+        try:
+            await invoices_collection.insert_one(
+                invoice_doc
+            )
+        except Exception:
+            await orders_collection.delete_one(
+                {"_id": order_doc["_id"]}
+            )
+            raise
 
     @staticmethod
     def _build_bill_to(
@@ -794,11 +1044,15 @@ class CheckoutService:
         order_code: str,
         invoice_id: ObjectId,
         total_amount: float,
-    ) -> dict[str, Any]:
-        """Create Razorpay order and link it to invoice."""
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """
+        Create Razorpay order and link it to invoice.
+
+        Returns the Razorpay order and the updated invoice.
+        """
         try:
             razorpay_order = (
-                payment_service.create_razorpay_order(
+                await payment_service.create_razorpay_order(
                     amount=total_amount,
                     order_id=order_id,
                     order_code=order_code,
@@ -829,89 +1083,24 @@ class CheckoutService:
                 "Razorpay order ID was not returned."
             )
 
-        await invoice_service.set_razorpay_order_id(
+        invoice = await invoice_service.set_razorpay_order_id(
             invoice_id=invoice_id,
             razorpay_order_id=(
                 razorpay_order_id
             ),
         )
 
-        return razorpay_order
-
-    async def _place_cod_order(
-        self,
-        *,
-        order_id: ObjectId,
-        invoice_id: ObjectId,
-        now: datetime,
-    ) -> None:
-        """Finalize a COD order."""
-        order_result = (
-            await orders_collection.update_one(
-                {"_id": order_id},
-                {
-                    "$set": {
-                        "orderStatus": "placed",
-                        "paymentStatus": "pending",
-                        "updatedAt": now,
-                    }
-                },
-            )
-        )
-
-        if order_result.matched_count == 0:
-            raise CheckoutServiceError(
-                "Order could not be finalized."
-            )
-
-        invoice_result = (
-            await invoices_collection.update_one(
-                {"_id": invoice_id},
-                {
-                    "$set": {
-                        "paymentStatus": "pending",
-                        "paymentMode": "cod",
-                        "paymentProvider": "cod",
-                        "paymentMethod": "cod",
-                        "updatedAt": now,
-                    }
-                },
-            )
-        )
-
-        if invoice_result.matched_count == 0:
-            raise CheckoutServiceError(
-                "Invoice could not be finalized."
-            )
-
+        return razorpay_order, invoice
 
-    async def _build_response(
-        self,
+    @staticmethod
+    def _build_response(
         *,
-        order_id: ObjectId,
-        invoice_id: ObjectId,
+        order: dict[str, Any],
+        invoice: dict[str, Any],
         payment: dict[str, Any] | None,
     ) -> dict[str, Any]:
         """Build JSON-safe checkout response."""
 
-        order = await orders_collection.find_one(
-            {"_id": order_id}
-        )
-
-        if not order:
-            raise CheckoutServiceError(
-                "Order could not be retrieved."
-            )
-
-        invoice = await invoice_service.get_invoice(
-            invoice_id
-        )
-
-        if not invoice:
-            raise CheckoutServiceError(
-                "Invoice could not be retrieved."
-            )
-
         # --------------------------------------------------------
         # Convert MongoDB documents to JSON-safe dictionaries
         # --------------------------------------------------------
@@ -968,14 +1157,23 @@ class CheckoutService:
         *,
         order_id: ObjectId,
         invoice_id: ObjectId | None,
+        reservation_id: ObjectId,
     ) -> None:
         """
         Roll back locally-created checkout records.
 
         Razorpay orders cannot be deleted through this local
-        rollback. The local order/invoice are removed so that
-        an incomplete checkout does not remain as a valid order.
+        rollback. The local order/invoice are removed and the
+        reserved stock is returned, so that an incomplete
+        checkout does not remain as a valid order.
         """
+        try:
+            await inventory_service.release(
+                reservation_id
+            )
+        except Exception:
+            pass
+
         if invoice_id:
             try:
                 await invoice_service.delete_invoice(
@@ -985,11 +1183,15 @@ class CheckoutService:
                 pass
 
         try:
-            await orders_collection.delete_one(
+            result = await orders_collection.delete_one(
                 {"_id": order_id}
             )
         except Exception:
             pass
+        else:
+            await dashboard_stats.increment(
+                {"totalOrders": -result.deleted_count}
+            )
 
 
 checkout_service = CheckoutService()
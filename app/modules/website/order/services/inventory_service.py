@@ -0,0 +1,570 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
+from config import settings
+
+
+products_collection = db["products"]
+stock_reservations_collection = db["stock_reservations"]
+
+register_indexes(
+    "stock_reservations",
+    IndexSpec("stock_reservations_due", [("status", 1), ("expiresAt", 1)]),
+    IndexSpec("stock_reservations_order", [("orderCode", 1)]),
+)
+
+register_indexes(
+    "products",
+    IndexSpec("products_inventory_holds", [("inventory.holds.id", 1)], sparse=True),
+)
+
+
+class InventoryServiceError(Exception):
+    """Raised when stock cannot be reserved."""
+
+
+# ============================================================
+# PIPELINE EXPRESSIONS
+# ============================================================
+
+_SHELF = {"$ifNull": ["$inventory.quantityInShelf", 0]}
+_WAREHOUSE = {"$ifNull": ["$inventory.quantityInWarehouse", 0]}
+_AVAILABLE = {"$add": [_SHELF, _WAREHOUSE]}
+
+
+def _reserve_operation(
+    *,
+    product_id: ObjectId,
+    quantity: int,
+    reservation_id: ObjectId,
+    now: datetime,
+) -> UpdateOne:
+    """
+    Decrement stock for one product if enough is available.
+
+    Stock is taken from the shelf first, then the warehouse. The
+    split is recorded as a hold tagged with the reservation id, so a
+    release can restore exactly what this reservation took.
+    """
+
+    from_shelf = {"$min": [_SHELF, quantity]}
+    from_warehouse = {"$subtract": [quantity, from_shelf]}
+
+    return UpdateOne(
+        {
+            "_id": product_id,
+            "$expr": {"$gte": [_AVAILABLE, quantity]},
+        },
+        [
+            {
+                "$set": {
+                    "inventory.quantityInShelf": {"$subtract": [_SHELF, from_shelf]},
+                    "inventory.quantityInWarehouse": {"$subtract": [_WAREHOUSE, from_warehouse]},
+                    "inventory.quantity": {"$subtract": [_AVAILABLE, quantity]},
+                    "inventory.holds": {
+                        "$concatArrays": [
+                            {"$ifNull": ["$inventory.holds", []]},
+                            [
+                                {
+                                    "id": reservation_id,
+                                    "quantity": quantity,
+                                    "fromShelf": from_shelf,
+                                    "fromWarehouse": from_warehouse,
+                                }
+                            ],
+                        ]
+                    },
+                    "stockUpdatedAt": now,
+                }
+            }
+        ],
+    )
+
+
+def _release_operation(
+    *,
+    product_id: ObjectId,
+    reservation_id: ObjectId,
+    now: datetime,
+) -> UpdateOne:
+    """
+    Return held stock to the product.
+
+    Matches only while the hold exists, so releasing twice, or
+    releasing a product the reservation never reached, is a no-op.
+    """
+
+    hold = {
+        "$arrayElemAt": [
+            {
+                "$filter": {
+                    "input": "$inventory.holds",
+                    "cond": {"$eq": ["$$this.id", reservation_id]},
+                }
+            },
+            0,
+        ]
+    }
+
+    return UpdateOne(
+        {
+            "_id": product_id,
+            "inventory.holds.id": reservation_id,
+        },
+        [
+            {"$set": {"_hold": hold}},
+            {
+                "$set": {
+                    "inventory.quantityInShelf": {"$add": [_SHELF, "$_hold.fromShelf"]},
+                    "inventory.quantityInWarehouse": {"$add": [_WAREHOUSE, "$_hold.fromWarehouse"]},
+                    "inventory.quantity": {"$add": [_AVAILABLE, "$_hold.quantity"]},
+                    "inventory.holds": {
+                        "$filter": {
+                            "input": "$inventory.holds",
+                            "cond": {"$ne": ["$$this.id", reservation_id]},
+                        }
+                    },
+                    "stockUpdatedAt": now,
+                }
+            },
+            {"$unset": "_hold"},
+        ],
+    )
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+
+class InventoryService:
+    """
+    Atomic stock reservations for checkout.
+
+    A whole basket is reserved with one unordered `bulk_write` of
+    guarded decrements. If any line lacks stock, every line that did
+    succeed is released again and the checkout fails, so baskets are
+    all-or-nothing and concurrent checkouts cannot oversell.
+
+    Stock writes set `stockUpdatedAt`, never the product's
+    `updatedAt`, so a sale does not count as a product edit and
+    does not evict the product from the product cache.
+
+    Each reservation is tracked in `stock_reservations`:
+    - `held`: stock is decremented, awaiting payment
+    - `committed`: the order is paid or placed, holds are dropped
+    - `released`: stock was returned (rollback or expiry)
+    - `releasing` / `committing`: a release or commit in progress
+
+    Unpaid online reservations expire after
+    `STOCK_RESERVATION_TTL_MINUTES` and are released by a sweeper,
+    which also finishes releases and commits left half-done.
+    """
+
+    def __init__(self, sweep_interval_seconds: int):
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._sweep_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        """Return the current UTC datetime."""
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _merge_lines(
+        items: list[dict[str, Any]],
+    ) -> dict[ObjectId, int]:
+        """Sum quantities of repeated products."""
+        quantities: dict[ObjectId, int] = {}
+
+        for item in items:
+            product_id = ObjectId(item["productId"])
+            quantities[product_id] = (
+                quantities.get(product_id, 0)
+                + int(item["quantity"])
+            )
+
+        return quantities
+
+    # --------------------------------------------------------
+    # RESERVE
+    # --------------------------------------------------------
+
+    async def reserve(
+        self,
+        *,
+        items: list[dict[str, Any]],
+        order_code: str,
+        expires_at: datetime | None = None,
+        product_names: dict[ObjectId, str] | None = None,
+    ) -> ObjectId:
+        """
+        Reserve stock for every line or for none.
+
+        `items` are dicts with `productId` and `quantity`. Returns the
+        reservation id.
+        """
+        quantities = self._merge_lines(items)
+
+        if not quantities:
+            raise InventoryServiceError(
+                "At least one product is required."
+            )
+
+        now = self._utc_now()
+        reservation_id = ObjectId()
+
+        await stock_reservations_collection.insert_one(
+            {
+                "_id": reservation_id,
+                "orderCode": order_code,
+                "items": [
+                    {
+                        "productId": product_id,
+                        "quantity": quantity,
+                    }
+                    for product_id, quantity in quantities.items()
+                ],
+                "status": "held",
+                "expiresAt": expires_at,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+        )
+
+        operations = [
+            _reserve_operation(
+                product_id=product_id,
+                quantity=quantity,
+                reservation_id=reservation_id,
+                now=now,
+            )
+            for product_id, quantity in quantities.items()
+        ]
+
+        try:
+            result = await products_collection.bulk_write(
+                operations,
+                ordered=False,
+            )
+            reserved_count = result.modified_count
+
+        except BulkWriteError as exc:
+            await self.release(reservation_id)
+            raise InventoryServiceError(
+                "Failed to reserve stock."
+            ) from exc
+
+        if reserved_count == len(operations):
+            return reservation_id
+
+        # ----------------------------------------------------
+        # PARTIAL: find the short lines, then undo the rest
+        # ----------------------------------------------------
+
+        held = {
+            product["_id"]
+            async for product in products_collection.find(
+                {
+                    "_id": {"$in": list(quantities)},
+                    "inventory.holds.id": reservation_id,
+                },
+                {"_id": 1},
+            )
+        }
+
+        await self.release(reservation_id)
+
+        names = product_names or {}
+        short = [
+            names.get(product_id, "product")
+            for product_id in quantities
+            if product_id not in held
+        ]
+
+        raise InventoryServiceError(
+            f"Insufficient stock for {', '.join(short)}."
+        )
+
+    # --------------------------------------------------------
+    # RELEASE / COMMIT
+    # --------------------------------------------------------
+
+    async def release(
+        self,
+        reservation_id: ObjectId,
+    ) -> bool:
+        """
+        Return a held reservation's stock. Returns False when the
+        reservation was already committed or released.
+        """
+        now = self._utc_now()
+
+        reservation = await stock_reservations_collection.find_one_and_update(
+            {
+                "_id": reservation_id,
+                "status": "held",
+            },
+            {
+                "$set": {
+                    "status": "releasing",
+                    "updatedAt": now,
+                }
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+        if not reservation:
+            # A crashed release is retried by the sweeper.
+            reservation = await stock_reservations_collection.find_one(
+                {
+                    "_id": reservation_id,
+                    "status": "releasing",
+                }
+            )
+
+        if not reservation:
+            return False
+
+        await products_collection.bulk_write(
+            [
+                _release_operation(
+                    product_id=item["productId"],
+                    reservation_id=reservation_id,
+                    now=now,
+                )
+                for item in reservation["items"]
+            ],
+            ordered=False,
+        )
+
+        await stock_reservations_collection.update_one(
+            {"_id": reservation_id},
+            {
+                "$set": {
+                    "status": "released",
+                    "updatedAt": now,
+                }
+            },
+        )
+
+        return True
+
+    async def commit(
+        self,
+        reservation_id: ObjectId,
+    ) -> None:
+        """
+        Make a reservation permanent once the order is placed.
+
+        If an online reservation already expired, the stock is
+        reserved again. When that fails the order is paid but short,
+        which is logged for manual follow-up rather than failing a
+        captured payment.
+
+        A reservation the sweeper is releasing right now is
+        released to the end here, then committed by reserving
+        again. Every commit that does nothing is logged.
+        """
+        for _ in range(2):
+            now = self._utc_now()
+
+            reservation = await stock_reservations_collection.find_one_and_update(
+                {
+                    "_id": reservation_id,
+                    "status": {"$in": ["held", "released"]},
+                },
+                [
+                    {
+                        "$set": {
+                            # Lets a resumed commit take the same path.
+                            "committingFrom": "$status",
+                            "status": "committing",
+                            "updatedAt": now,
+                        }
+                    }
+                ],
+                return_document=ReturnDocument.AFTER,
+            )
+
+            if reservation:
+                await self._finish_commit(reservation)
+                return
+
+            current = await stock_reservations_collection.find_one(
+                {"_id": reservation_id},
+                {"status": 1},
+            )
+            status = current.get("status") if current else None
+
+            if status != "releasing":
+                print(
+                    f"ℹ️ Stock reservation {reservation_id} not committed: "
+                    f"status is {status or 'missing'}."
+                )
+                return
+
+            await self.release(reservation_id)
+
+        print(
+            f"⚠️ Stock reservation {reservation_id} could not be committed "
+            "after finishing its release; needs manual follow-up."
+        )
+
+    async def _finish_commit(
+        self,
+        reservation: dict[str, Any],
+    ) -> None:
+        """Complete a reservation in `committing`."""
+        reservation_id = reservation["_id"]
+        now = self._utc_now()
+
+        if reservation.get("committingFrom") == "released":
+            try:
+                replacement_id = await self.reserve(
+                    items=reservation["items"],
+                    order_code=reservation["orderCode"],
+                )
+            except InventoryServiceError as exc:
+                print(
+                    f"⚠️ Order {reservation['orderCode']} was paid after its "
+                    f"stock reservation expired: {exc}"
+                )
+                await stock_reservations_collection.update_one(
+                    {"_id": reservation_id},
+                    {"$set": {"status": "released", "updatedAt": now}},
+                )
+                return
+
+            await stock_reservations_collection.update_one(
+                {"_id": reservation_id},
+                {"$set": {"status": "released", "replacedBy": replacement_id, "updatedAt": now}},
+            )
+            await self.commit(replacement_id)
+            return
+
+        await products_collection.update_many(
+            {
+                "_id": {
+                    "$in": [item["productId"] for item in reservation["items"]]
+                },
+            },
+            {
+                "$pull": {
+                    "inventory.holds": {"id": reservation_id},
+                }
+            },
+        )
+
+        await stock_reservations_collection.update_one(
+            {"_id": reservation_id},
+            {
+                "$set": {
+                    "status": "committed",
+                    "expiresAt": None,
+                    "updatedAt": now,
+                }
+            },
+        )
+
+    # --------------------------------------------------------
+    # EXPIRY
+    # --------------------------------------------------------
+
+    async def release_expired(self) -> int:
+        now = self._utc_now()
+        released = 0
+
+        async for reservation in stock_reservations_collection.find(
+            {
+                "$or": [
+                    {
+                        "status": "held",
+                        "expiresAt": {"$ne": None, "$lt": now},
+                    },
+                    {
+                        "status": "releasing",
+                        "updatedAt": {"$lt": now - timedelta(minutes=5)},
+                    },
+                ]
+            },
+            {"_id": 1},
+        ):
+            if await self.release(reservation["_id"]):
+                released += 1
+
+        return released
+
+    async def resume_commits(self) -> int:
+        """
+        Finish commits interrupted between `committing` and
+        `committed`, e.g. by a crash.
+        """
+        now = self._utc_now()
+        resumed = 0
+
+        async for reservation in stock_reservations_collection.find(
+            {
+                "status": "committing",
+                "updatedAt": {"$lt": now - timedelta(minutes=5)},
+            }
+        ):
+            claimed = await stock_reservations_collection.find_one_and_update(
+                {
+                    "_id": reservation["_id"],
+                    "status": "committing",
+                    "updatedAt": reservation["updatedAt"],
+                },
+                {"$set": {"updatedAt": now}},
+                return_document=ReturnDocument.AFTER,
+            )
+
+            if not claimed:
+                continue
+
+            await self._finish_commit(claimed)
+            resumed += 1
+
+        return resumed
+
+    def start(self) -> None:
+        if self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self._sweep_task is None:
+            return
+
+        self._sweep_task.cancel()
+        await asyncio.gather(self._sweep_task, return_exceptions=True)
+        self._sweep_task = None
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                released = await self.release_expired()
+                if released:
+                    print(f"♻️ Released {released} expired stock reservations.")
+
+                resumed = await self.resume_commits()
+                if resumed:
+                    print(f"♻️ Resumed {resumed} interrupted stock commits.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ Stock reservation sweep failed: {exc}")
+
+            await asyncio.sleep(self.sweep_interval_seconds)
+
+
+inventory_service = InventoryService(
+    sweep_interval_seconds=settings.STOCK_RESERVATION_SWEEP_SECONDS,
+)
+
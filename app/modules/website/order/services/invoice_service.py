@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.db.mongo import db
 
@@ -30,7 +31,7 @@ class InvoiceService:
                 f"Invalid {field_name}."
             )
 
-    async def create_invoice(
+    def build_invoice_document(
         self,
         *,
         order_id: ObjectId,
@@ -38,12 +39,12 @@ class InvoiceService:
         total_amount: float,
         payment_method: str = "online",
         payment_provider: str = "razorpay",
+        bill_to: dict[str, Any] | None = None,
         now: datetime | None = None,
     ) -> dict[str, Any]:
         """
-        Create a pending invoice for an order.
-
-        Payment verification is handled separately by PaymentService.
+        Build a pending invoice document without writing it, so
+        callers can insert it alongside other documents.
         """
         self._validate_object_id(
             order_id,
@@ -67,11 +68,11 @@ class InvoiceService:
 
         created_at = now or self._utc_now()
 
-        invoice_doc = {
+        return {
             "orderIds": [order_id],
             "billDate": None,
             "billFrom": None,
-            "billTo": {
+            "billTo": bill_to or {
                 "name": customer_name,
                 "address": None,
                 "detail": None,
@@ -96,6 +97,30 @@ class InvoiceService:
             "updatedAt": created_at,
         }
 
+    async def create_invoice(
+        self,
+        *,
+        order_id: ObjectId,
+        customer_name: str,
+        total_amount: float,
+        payment_method: str = "online",
+        payment_provider: str = "razorpay",
+        now: datetime | None = None,
+    ) -> dict[str, Any]:
+        """
+        Create a pending invoice for an order.
+
+        Payment verification is handled separately by PaymentService.
+        """
+        invoice_doc = self.build_invoice_document(
+            order_id=order_id,
+            customer_name=customer_name,
+            total_amount=total_amount,
+            payment_method=payment_method,
+            payment_provider=payment_provider,
+            now=now,
+        )
+
         try:
             result = await invoices_collection.insert_one(
                 invoice_doc
@@ -110,16 +135,8 @@ class InvoiceService:
                 "Failed to create invoice."
             )
 
-        invoice = await invoices_collection.find_one(
-            {"_id": result.inserted_id}
-        )
-
-        if not invoice:
-            raise InvoiceServiceError(
-                "Invoice was created but could not be retrieved."
-            )
-
-        return invoice
+        # insert_one sets `_id` on the document itself.
+        return invoice_doc
 
     async def set_razorpay_order_id(
         self,
@@ -142,7 +159,7 @@ class InvoiceService:
 
         now = self._utc_now()
 
-        result = await invoices_collection.update_one(
+        invoice = await invoices_collection.find_one_and_update(
             {"_id": invoice_id},
             {
                 "$set": {
@@ -150,20 +167,12 @@ class InvoiceService:
                     "updatedAt": now,
                 }
             },
-        )
-
-        if result.matched_count == 0:
-            raise InvoiceServiceError(
-                "Invoice not found."
-            )
-
-        invoice = await invoices_collection.find_one(
-            {"_id": invoice_id}
+            return_document=ReturnDocument.AFTER,
         )
 
         if not invoice:
             raise InvoiceServiceError(
-                "Invoice not found after update."
+                "Invoice not found."
             )
 
         return invoice
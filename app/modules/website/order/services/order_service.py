@@ -1,7 +1,7 @@
-import math
-
 from bson import ObjectId
 
+from app.utils.pagination import TotalMode, paginate
+
 
 class WebsiteOrderService:
     def __init__(self, orders_collection):
@@ -12,29 +12,29 @@ class WebsiteOrderService:
         customer_id,
         page: int = 1,
         limit: int = 10,
+        after: str | None = None,
+        total_mode: TotalMode = "exact",
     ):
-        skip = (page - 1) * limit
-
         query = {
             "customerId": customer_id,
         }
 
-        total = await self.orders_collection.count_documents(query)
-
-        cursor = (
-            self.orders_collection
-            .find(query)
-            .sort("createdAt", -1)
-            .skip(skip)
-            .limit(limit)
+        result = await paginate(
+            self.orders_collection,
+            query,
+            page=page,
+            page_size=limit,
+            after=after,
+            total_mode=total_mode,
         )
 
-        orders = await cursor.to_list(length=limit)
+        total = result["total"]
 
         return {
-            "orders": orders,
+            "orders": result["items"],
             "total": total,
             "page": page,
             "limit": limit,
-            "pages": math.ceil(total / limit) if total else 0,
+            "pages": 0 if total == 0 else result["pages"],
+            "nextCursor": result["nextCursor"],
         }
\ No newline at end of file
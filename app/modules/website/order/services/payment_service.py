@@ -2,15 +2,20 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-import razorpay
 from bson import ObjectId
 
 from app.db.mongo import db
+from app.modules.website.order.services.inventory_service import (
+    inventory_service,
+)
 from app.modules.website.order.services.invoice_service import (
     InvoiceServiceError,
     invoice_service,
 )
-from config import settings
+from app.modules.website.order.services.razorpay_gateway import (
+    RazorpayGatewayTimeout,
+    razorpay_gateway,
+)
 
 
 orders_collection = db["orders"]
@@ -22,12 +27,7 @@ class PaymentServiceError(Exception):
 
 class PaymentService:
     def __init__(self) -> None:
-        self.client = razorpay.Client(
-            auth=(
-                settings.RAZORPAY_KEY_ID,
-                settings.RAZORPAY_KEY_SECRET,
-            )
-        )
+        self.gateway = razorpay_gateway
 
     # ============================================================
     # ID VALIDATION
@@ -96,7 +96,7 @@ class PaymentService:
     # CREATE RAZORPAY ORDER
     # ============================================================
 
-    def create_razorpay_order(
+    async def create_razorpay_order(
         self,
         *,
         amount: float,
@@ -148,7 +148,7 @@ class PaymentService:
             )
 
         try:
-            razorpay_order = self.client.order.create(
+            razorpay_order = await self.gateway.create_order(
                 {
                     "amount": razorpay_amount,
                     "currency": "INR",
@@ -165,6 +165,10 @@ class PaymentService:
                     },
                 }
             )
+        except RazorpayGatewayTimeout as exc:
+            raise PaymentServiceError(
+                "Razorpay did not respond in time. Please try again."
+            ) from exc
         except Exception as exc:
             raise PaymentServiceError(
                 "Failed to create Razorpay order."
@@ -355,7 +359,7 @@ class PaymentService:
         # FETCH PAYMENT
         # --------------------------------------------------------
 
-        payment = self._fetch_payment(
+        payment = await self._fetch_payment(
             razorpay_payment_id
         )
 
@@ -424,6 +428,11 @@ class PaymentService:
             updated_at=now,
         )
 
+        if order.get("stockReservationId"):
+            await inventory_service.commit(
+                order["stockReservationId"]
+            )
+
         await self._clear_cart(
             order=order,
         )
@@ -664,7 +673,7 @@ class PaymentService:
         """Verify the Razorpay payment signature."""
 
         try:
-            self.client.utility.verify_payment_signature(
+            self.gateway.verify_payment_signature(
                 {
                     "razorpay_order_id": (
                         razorpay_order_id
@@ -686,7 +695,7 @@ class PaymentService:
     # FETCH PAYMENT
     # ============================================================
 
-    def _fetch_payment(
+    async def _fetch_payment(
         self,
         razorpay_payment_id: str,
     ) -> dict[str, Any]:
@@ -700,9 +709,13 @@ class PaymentService:
         )
 
         try:
-            payment = self.client.payment.fetch(
+            payment = await self.gateway.fetch_payment(
                 razorpay_payment_id
             )
+        except RazorpayGatewayTimeout as exc:
+            raise PaymentServiceError(
+                "Razorpay did not respond in time. Please try again."
+            ) from exc
         except Exception as exc:
             raise PaymentServiceError(
                 "Unable to fetch payment details."
@@ -1037,7 +1050,15 @@ class PaymentService:
                         "$set": {
                             "items": [],
                             "updatedAt": now,
-                        }
+                        },
+                        # The stored summary described the old
+                        # lines; the next read rebuilds it.
+                        "$unset": {
+                            "summary": "",
+                        },
+                        "$inc": {
+                            "version": 1,
+                        },
                     },
                 )
 
@@ -0,0 +1,119 @@
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from bson import ObjectId
+
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
+from config import settings
+
+
+quotes_collection = db["quotes"]
+
+register_indexes(
+    "quotes",
+    # Quotes disappear once they can no longer be used.
+    IndexSpec("quotes_expiry", [("expiresAt", 1)], expire_after_seconds=0),
+)
+
+
+class QuoteServiceError(Exception):
+    """Raised when a quote is invalid or expired."""
+
+
+class QuoteService:
+    """
+    Immutable priced baskets for checkout.
+
+    A quote stores the priced order lines, their totals and the
+    pricing version of every product, and expires after
+    `ttl_seconds`. Clients get a signed quote id, so ids cannot
+    be guessed or forged and a bad id is rejected without a
+    lookup. Checkout with a valid quote reuses its pricing and
+    only re-checks product versions and stock.
+    """
+
+    def __init__(self, *, secret_key: str, ttl_seconds: int):
+        self._secret_key = secret_key.encode("utf-8")
+        self.ttl_seconds = ttl_seconds
+
+    def _signature(self, quote_id: ObjectId) -> str:
+        return hmac.new(
+            self._secret_key,
+            f"quote:{quote_id}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()[:32]
+
+    def sign(self, quote_id: ObjectId) -> str:
+        return f"{quote_id}.{self._signature(quote_id)}"
+
+    def _verify(self, token: str) -> ObjectId:
+        quote_id, _, signature = (token or "").partition(".")
+
+        if not ObjectId.is_valid(quote_id):
+            raise QuoteServiceError("Invalid quote.")
+
+        quote_id = ObjectId(quote_id)
+
+        if not hmac.compare_digest(signature, self._signature(quote_id)):
+            raise QuoteServiceError("Invalid quote.")
+
+        return quote_id
+
+    async def create(
+        self,
+        *,
+        customer_id: ObjectId | None,
+        guest_cart_id: str | None,
+        items: list[dict[str, Any]],
+        totals: dict[str, float],
+        product_versions: dict[str, str],
+    ) -> dict[str, Any]:
+        """Store a quote and return it with its signed id."""
+        now = datetime.now(timezone.utc)
+
+        quote = {
+            "_id": ObjectId(),
+            "customerId": customer_id,
+            "guestCartId": guest_cart_id,
+            "items": items,
+            "totals": totals,
+            "productVersions": product_versions,
+            "createdAt": now,
+            "expiresAt": now + timedelta(seconds=self.ttl_seconds),
+        }
+
+        await quotes_collection.insert_one(quote)
+
+        quote["quoteId"] = self.sign(quote["_id"])
+
+        return quote
+
+    async def get(self, token: str) -> dict[str, Any]:
+        """
+        Load a quote by its signed id.
+
+        The TTL monitor deletes expired quotes only periodically,
+        so expiry is checked here as well.
+        """
+        quote = await quotes_collection.find_one(
+            {
+                "_id": self._verify(token),
+                "expiresAt": {"$gt": datetime.now(timezone.utc)},
+            }
+        )
+
+        if not quote:
+            raise QuoteServiceError(
+                "Quote has expired. Please review your cart."
+            )
+
+        return quote
+
+
+quote_service = QuoteService(
+    secret_key=settings.SECRET_KEY,
+    ttl_seconds=settings.QUOTE_TTL_SECONDS,
+)
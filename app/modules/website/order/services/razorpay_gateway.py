@@ -0,0 +1,145 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable
+
+import razorpay
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.utils.latency_histogram import LatencyHistogram
+from config import settings
+
+
+class RazorpayGatewayTimeout(Exception):
+    """Raised when a Razorpay call exceeds its deadline."""
+
+
+class RazorpayGateway:
+    """
+    Async adapter around the blocking Razorpay SDK.
+
+    SDK calls run on a dedicated, bounded thread pool so they never
+    block the event loop and cannot starve the default executor. The
+    client shares one keep-alive `requests.Session` whose connection
+    pool matches the thread count. Every call carries an HTTP timeout
+    and an overall deadline, and its latency is recorded per
+    operation.
+
+    `RAZORPAY_BASE_URL` points the client at a fake Razorpay server
+    for local testing.
+    """
+
+    def __init__(
+        self,
+        *,
+        key_id: str,
+        key_secret: str,
+        max_workers: int,
+        timeout_seconds: float,
+        base_url: str = "",
+    ):
+        self.timeout_seconds = timeout_seconds
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_workers,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        options = {"base_url": base_url} if base_url else {}
+
+        self.client = razorpay.Client(
+            session=session,
+            auth=(key_id, key_secret),
+            **options,
+        )
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="razorpay",
+        )
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    async def _call(
+        self,
+        operation: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        histogram = self._histograms.setdefault(
+            operation,
+            LatencyHistogram(),
+        )
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+        outcome = "ok"
+
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._executor,
+                    lambda: func(*args, **kwargs),
+                ),
+                # Leave the HTTP timeout room to fire first, so the
+                # worker thread is released as well.
+                timeout=self.timeout_seconds + 1,
+            )
+
+        except (asyncio.TimeoutError, requests.Timeout) as exc:
+            outcome = "timeout"
+            raise RazorpayGatewayTimeout(
+                f"Razorpay {operation} timed out."
+            ) from exc
+
+        except Exception:
+            outcome = "error"
+            raise
+
+        finally:
+            histogram.observe(
+                (perf_counter() - start) * 1000,
+                outcome,
+            )
+
+    async def create_order(self, data: dict[str, Any]) -> dict[str, Any]:
+        return await self._call(
+            "order.create",
+            self.client.order.create,
+            data,
+            timeout=self.timeout_seconds,
+        )
+
+    async def fetch_payment(self, payment_id: str) -> dict[str, Any]:
+        return await self._call(
+            "payment.fetch",
+            self.client.payment.fetch,
+            payment_id,
+            timeout=self.timeout_seconds,
+        )
+
+    def verify_payment_signature(self, params: dict[str, str]) -> None:
+        # Local HMAC check, no network round trip.
+        self.client.utility.verify_payment_signature(params)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            operation: histogram.snapshot()
+            for operation, histogram in self._histograms.items()
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.client.session.close()
+
+
+razorpay_gateway = RazorpayGateway(
+    key_id=settings.RAZORPAY_KEY_ID,
+    key_secret=settings.RAZORPAY_KEY_SECRET,
+    max_workers=settings.RAZORPAY_MAX_WORKERS,
+    timeout_seconds=settings.RAZORPAY_TIMEOUT_SECONDS,
+    base_url=settings.RAZORPAY_BASE_URL,
+)
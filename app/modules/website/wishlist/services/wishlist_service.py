@@ -3,13 +3,26 @@ from typing import Any
 
 from bson import ObjectId
 
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.line_merge import LineMerge
 from app.db.mongo import db
+from app.modules.products.service.product_cache import product_cache
 from core.sanitize import stringify_object_ids
 
 
 wishlist_collection = db["wishlists"]
 products_collection = db["products"]
 
+register_indexes(
+    "wishlists",
+    IndexSpec("wishlists_customer", [("customerId", 1)]),
+    IndexSpec("wishlists_guest", [("guestCartId", 1)]),
+)
+
+
+# Guest items are added once; items already saved are kept.
+wishlist_merge = LineMerge(wishlist_collection)
+
 
 class WishlistServiceError(Exception):
     pass
@@ -38,6 +51,36 @@ class WishlistService:
             "Either customerId or guestCartId is required."
         )
 
+    @staticmethod
+    def _project_product(product: dict[str, Any]) -> dict[str, Any]:
+        """
+        Keep only the product fields shown on the wishlist.
+        """
+        projected = {
+            key: product[key]
+            for key in (
+                "_id",
+                "name",
+                "description",
+                "media",
+                "price",
+                "rating",
+                "reviews",
+            )
+            if key in product
+        }
+
+        inventory = product.get("inventory")
+
+        if isinstance(inventory, dict):
+            projected["inventory"] = {
+                key: inventory[key]
+                for key in ("quantity", "allowBackorders")
+                if key in inventory
+            }
+
+        return projected
+
     async def get_wishlist(
         self,
         customer_id: str | None = None,
@@ -64,6 +107,12 @@ class WishlistService:
 
             wishlist["_id"] = result.inserted_id
 
+        return await self._populate(wishlist)
+
+    async def _populate(self, wishlist: dict) -> dict:
+        """
+        Attach the current product to every wishlist item.
+        """
         items = wishlist.get("items", [])
 
         product_ids: list[ObjectId] = []
@@ -79,31 +128,11 @@ class WishlistService:
             except Exception:
                 continue
 
-        products: list[dict[str, Any]] = []
-
-        if product_ids:
-            products = await products_collection.find(
-                {
-                    "_id": {
-                        "$in": product_ids,
-                    }
-                },
-                {
-                    "_id": 1,
-                    "name": 1,
-                    "description": 1,
-                    "media": 1,
-                    "price": 1,
-                    "inventory.quantity": 1,
-                    "inventory.allowBackorders": 1,
-                    "rating": 1,
-                    "reviews": 1,
-                },
-            ).to_list(length=None)
+        products = await product_cache.get_many(product_ids)
 
         product_map = {
-            str(product["_id"]): product
-            for product in products
+            str(product_id): self._project_product(product)
+            for product_id, product in products.items()
         }
 
         populated_items = []
@@ -142,11 +171,7 @@ class WishlistService:
                 "Invalid product ID."
             ) from exc
 
-        product = await products_collection.find_one(
-            {
-                "_id": product_object_id,
-            }
-        )
+        product = await product_cache.get(product_object_id)
 
         if not product:
             raise WishlistServiceError(
@@ -275,67 +300,13 @@ class WishlistService:
                 "Customer ID is required."
             )
 
-        guest_wishlist = await wishlist_collection.find_one(
-            {
-                "guestCartId": guest_cart_id,
-            }
-        )
-
-        if not guest_wishlist:
-            customer_wishlist = await self.get_wishlist(
-                customer_id=customer_id,
-            )
-
-            return {
-                "success": True,
-                "message": "No guest wishlist to merge.",
-                "wishlist": customer_wishlist,
-            }
-
-        customer_wishlist = await wishlist_collection.find_one(
-            {
-                "customerId": customer_id,
-            }
-        )
-
         now = self._now()
 
-        if not customer_wishlist:
-            customer_wishlist = {
-                "customerId": customer_id,
-                "items": [],
-                "createdAt": now,
-                "updatedAt": now,
-            }
-
-            result = await wishlist_collection.insert_one(
-                customer_wishlist
-            )
-
-            customer_wishlist["_id"] = result.inserted_id
-
-        existing_product_ids = {
-            item.get("productId")
-            for item in customer_wishlist.get("items", [])
-        }
-
-        guest_items = guest_wishlist.get("items", [])
-
-        items_to_add = []
-
-        for item in guest_items:
-            product_id = item.get("productId")
-
-            if not product_id:
-                continue
-
-            if product_id in existing_product_ids:
-                continue
-
-            items_to_add.append(
+        async def prepare(guest_items: list[dict]) -> list[dict]:
+            return [
                 {
                     "_id": ObjectId(),
-                    "productId": product_id,
+                    "productId": item["productId"],
                     "customerId": customer_id,
                     "createdAt": item.get(
                         "createdAt",
@@ -343,41 +314,35 @@ class WishlistService:
                     ),
                     "updatedAt": now,
                 }
-            )
+                for item in guest_items
+                if item.get("productId")
+            ]
 
-            existing_product_ids.add(product_id)
+        merged_wishlist = await wishlist_merge.merge(
+            source_filter={
+                "guestCartId": guest_cart_id,
+            },
+            target_filter={
+                "customerId": customer_id,
+            },
+            prepare=prepare,
+        )
 
-        if items_to_add:
-            await wishlist_collection.update_one(
-                {
-                    "_id": customer_wishlist["_id"],
-                },
-                {
-                    "$push": {
-                        "items": {
-                            "$each": items_to_add,
-                        },
-                    },
-                    "$set": {
-                        "updatedAt": now,
-                    },
-                },
+        if not merged_wishlist:
+            customer_wishlist = await self.get_wishlist(
+                customer_id=customer_id,
             )
 
-        await wishlist_collection.delete_one(
-            {
-                "_id": guest_wishlist["_id"],
+            return {
+                "success": True,
+                "message": "No guest wishlist to merge.",
+                "wishlist": customer_wishlist,
             }
-        )
-
-        merged_wishlist = await self.get_wishlist(
-            customer_id=customer_id,
-        )
 
         return {
             "success": True,
             "message": "Guest wishlist merged successfully.",
-            "wishlist": merged_wishlist,
+            "wishlist": await self._populate(merged_wishlist),
         }
 
 
@@ -0,0 +1,83 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from bson import ObjectId
+
+from app.db.mongo import db
+from config import settings
+
+
+customers_collection = db["customers"]
+
+
+class CustomerCache:
+    """
+    Short-lived cache of customer documents for authenticated
+    requests.
+
+    Writes to a customer invalidate its entry in this process. The
+    TTL bounds how long another worker can serve a stale document.
+    Callers get a deep copy and may mutate it freely.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[ObjectId, tuple[float, dict]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, customer_id: ObjectId) -> Optional[dict]:
+        entry = self._entries.get(customer_id)
+
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(customer_id)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+        self.misses += 1
+
+        customer = await customers_collection.find_one(
+            {"_id": customer_id}
+        )
+
+        if customer is None:
+            self._entries.pop(customer_id, None)
+            return None
+
+        self._entries[customer_id] = (
+            time.monotonic() + self.ttl_seconds,
+            customer,
+        )
+        self._entries.move_to_end(customer_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return copy.deepcopy(customer)
+
+    def invalidate(self, customer_id: ObjectId | str) -> None:
+        if isinstance(customer_id, str):
+            if not ObjectId.is_valid(customer_id):
+                return
+            customer_id = ObjectId(customer_id)
+
+        self._entries.pop(customer_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "maxSize": self.max_size,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+customer_cache = CustomerCache(
+    max_size=settings.CUSTOMER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CUSTOMER_CACHE_TTL_SECONDS,
+)
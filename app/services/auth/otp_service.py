@@ -3,7 +3,12 @@ import random
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from app.db.indexes import IndexSpec, register_indexes
 from app.db.mongo import db
+from app.modules.dashboard.services.dashboard_stats import (
+    customer_active_delta,
+    dashboard_stats,
+)
 from app.services.auth.token_service import (
     create_auth_tokens,
 )
@@ -34,6 +39,20 @@ customers_collection = db[
     "customers"
 ]
 
+# Expired OTPs are removed by MongoDB through the TTL index.
+# verify_otp still checks expiresAt, because the TTL monitor
+# only runs about once a minute.
+register_indexes(
+    "website_otps",
+    IndexSpec("website_otps_mobile", [("mobile", 1)]),
+    IndexSpec("website_otps_expiry", [("expiresAt", 1)], expire_after_seconds=0),
+)
+
+register_indexes(
+    "customers",
+    IndexSpec("customers_mobile", [("mobile", 1)], sparse=True),
+)
+
 
 # ============================================================
 # HELPERS
@@ -555,6 +574,13 @@ async def verify_login_otp(
             insert_result.inserted_id
         )
 
+        await dashboard_stats.increment(
+            customer_active_delta(
+                False,
+                customer_document["isActive"],
+            )
+        )
+
         customer = customer_document
 
     # --------------------------------------------------------
@@ -752,28 +778,3 @@ async def get_otp_status(
             "verified_at"
         ),
     }
-
-
-# ============================================================
-# CLEANUP EXPIRED OTPs
-# ============================================================
-
-
-async def delete_expired_otps() -> int:
-    """
-    Delete expired OTP records.
-
-    Can be called from a scheduled background job.
-    """
-
-    now = _now()
-
-    result = await website_otps_collection.delete_many(
-        {
-            "expiresAt": {
-                "$lt": now,
-            }
-        }
-    )
-
-    return result.deleted_count
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from passlib.context import CryptContext
+
+from app.utils.auth_utils import pwd_context
+from app.utils.latency_histogram import LatencyHistogram
+from config import settings
+
+
+class PasswordService:
+    """
+    Runs a passlib `CryptContext` on a dedicated executor.
+
+    bcrypt is deliberately slow, so hashing and verification run on
+    a bounded thread pool instead of the event loop. The `bcrypt`
+    backend releases the GIL while hashing, so workers run in
+    parallel.
+
+    `verify_and_update` also returns a replacement hash when the
+    stored one uses outdated parameters (e.g. fewer bcrypt rounds
+    than `BCRYPT_ROUNDS`), so callers can upgrade it on login.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int):
+        self.context = context
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password",
+        )
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        histogram = self._histograms.setdefault(operation, LatencyHistogram())
+        loop = asyncio.get_running_loop()
+        start = perf_counter()
+
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            histogram.observe((perf_counter() - start) * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: str, hashed: Optional[str]) -> bool:
+        valid, _ = await self.verify_and_update(password, hashed)
+        return valid
+
+    async def verify_and_update(
+        self,
+        password: str,
+        hashed: Optional[str],
+    ) -> tuple[bool, Optional[str]]:
+        """Return (valid, new_hash); new_hash is None unless a rehash is due."""
+        if not hashed or not self.context.identify(hashed):
+            return False, None
+
+        return await self._run(
+            "verify",
+            self.context.verify_and_update,
+            password,
+            hashed,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            **{
+                operation: histogram.snapshot()
+                for operation, histogram in self._histograms.items()
+            },
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_service = PasswordService(
+    context=pwd_context,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+)
+
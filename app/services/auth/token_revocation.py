@@ -0,0 +1,226 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
+from app.utils.bloom_filter import BloomFilter
+from config import settings
+
+
+revoked_tokens_collection = db["revoked_tokens"]
+
+register_indexes(
+    "revoked_tokens",
+    # Entries disappear once the token they revoke has expired.
+    IndexSpec("revoked_tokens_expiry", [("expiresAt", 1)], expire_after_seconds=0),
+    IndexSpec("revoked_tokens_revoked_at", [("revokedAt", 1)]),
+)
+
+# Delta polls re-read this much history, so a revocation written
+# with a slightly older timestamp by another worker is not missed.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TokenRevocationStore:
+    """
+    Revoked token ids with an in-process Bloom filter in front.
+
+    Revocations are stored in `revoked_tokens` until the revoked
+    token would have expired anyway. Each worker keeps a Bloom
+    filter of revoked ids, loaded at startup and kept current by
+    polling for new revocations every `sync_interval_seconds`.
+
+    A filter miss proves the token is not revoked without touching
+    the database; only hits (real or false positive) are confirmed
+    with a lookup. Revocations made by another worker take effect
+    here after at most one poll interval. Until the first load
+    succeeds every check goes to the database.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        error_rate: float,
+        sync_interval_seconds: int,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval_seconds = sync_interval_seconds
+
+        self._filter = BloomFilter(capacity, error_rate)
+        self._ready = False
+        self._synced_at: Optional[datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+        self.filter_hits = 0
+        self.filter_misses = 0
+        self.confirmed = 0
+
+    # --------------------------------------------------------
+    # SYNC
+    # --------------------------------------------------------
+
+    async def rebuild(self) -> None:
+        """
+        Reload the filter from every unexpired revocation.
+
+        The filter holds at least `capacity` ids, and twice the live
+        revocations when there are more, so a busy period does not
+        leave it full and rebuilt on every poll.
+        """
+        started_at = _now()
+
+        token_ids = [
+            document["_id"]
+            async for document in revoked_tokens_collection.find(
+                {"expiresAt": {"$gt": started_at}},
+                {"_id": 1},
+            )
+        ]
+
+        if len(token_ids) > self.capacity:
+            print(
+                f"⚠️ {len(token_ids)} live token revocations exceed the "
+                f"filter capacity of {self.capacity}; sizing for {2 * len(token_ids)}."
+            )
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(token_ids)), self.error_rate)
+
+        for token_id in token_ids:
+            bloom.add(token_id)
+
+        self._filter = bloom
+        self._synced_at = started_at
+        self._ready = True
+
+    async def sync(self) -> int:
+        """Add revocations made since the last sync. Returns the count."""
+        if not self._ready or self._filter.count > self._filter.capacity:
+            # Bloom filters cannot forget expired ids; start over
+            # once the filter is full.
+            await self.rebuild()
+            return 0
+
+        started_at = _now()
+        added = 0
+
+        async for document in revoked_tokens_collection.find(
+            {"revokedAt": {"$gte": self._synced_at - SYNC_OVERLAP}},
+            {"_id": 1},
+        ):
+            if self._filter.add(document["_id"]):
+                added += 1
+
+        self._synced_at = started_at
+        return added
+
+    def start(self) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._sync_task is None:
+            return
+
+        self._sync_task.cancel()
+        await asyncio.gather(self._sync_task, return_exceptions=True)
+        self._sync_task = None
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ Revoked token sync failed: {exc}")
+
+            await asyncio.sleep(self.sync_interval_seconds)
+
+    # --------------------------------------------------------
+    # REVOKE / CHECK
+    # --------------------------------------------------------
+
+    async def revoke(self, token_id: str, expires_at: datetime) -> bool:
+        """
+        Revoke a token or session id until `expires_at`. Returns
+        False when it was already revoked, which lets refresh-token
+        rotation detect a token being used twice.
+        """
+        now = _now()
+
+        if expires_at <= now:
+            return False
+
+        result = await revoked_tokens_collection.update_one(
+            {"_id": token_id},
+            {
+                "$set": {"expiresAt": expires_at},
+                "$setOnInsert": {"revokedAt": now},
+            },
+            upsert=True,
+        )
+
+        self._filter.add(token_id)
+
+        return result.upserted_id is not None
+
+    async def is_revoked(self, token_ids: Iterable[Optional[str]]) -> bool:
+        token_ids = [token_id for token_id in token_ids if token_id]
+
+        if not token_ids:
+            return False
+
+        if self._ready:
+            candidates = [
+                token_id
+                for token_id in token_ids
+                if self._filter.might_contain(token_id)
+            ]
+
+            if not candidates:
+                self.filter_misses += 1
+                return False
+
+            self.filter_hits += 1
+        else:
+            candidates = token_ids
+
+        # The TTL monitor runs about once a minute, so expired
+        # entries are filtered out here as well.
+        document = await revoked_tokens_collection.find_one(
+            {
+                "_id": {"$in": candidates},
+                "expiresAt": {"$gt": _now()},
+            },
+            {"_id": 1},
+        )
+
+        if document:
+            self.confirmed += 1
+
+        return document is not None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self._ready,
+            "filterEntries": self._filter.count,
+            "capacity": self.capacity,
+            "filterHits": self.filter_hits,
+            "filterMisses": self.filter_misses,
+            "confirmed": self.confirmed,
+            "syncedAt": self._synced_at,
+        }
+
+
+token_revocation = TokenRevocationStore(
+    capacity=settings.REVOKED_TOKENS_FILTER_CAPACITY,
+    error_rate=settings.REVOKED_TOKENS_FILTER_ERROR_RATE,
+    sync_interval_seconds=settings.REVOKED_TOKENS_SYNC_SECONDS,
+)
@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from uuid import uuid4
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 
+from app.services.auth.customer_cache import customer_cache
+from app.services.auth.token_revocation import token_revocation
+from app.utils.token_cache import TokenClaimsCache
 from config import settings
 
 
@@ -26,6 +30,10 @@ security = HTTPBearer(
     auto_error=False,
 )
 
+token_claims_cache = TokenClaimsCache(
+    settings.TOKEN_CACHE_MAX_SIZE,
+)
+
 
 # ============================================================
 # HELPERS
@@ -36,6 +44,26 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _expires_at(
+    payload: dict,
+) -> datetime:
+    return datetime.fromtimestamp(
+        payload["exp"],
+        timezone.utc,
+    )
+
+
+def _revocation_ids(
+    payload: dict,
+) -> list[Optional[str]]:
+    # A token is revoked on its own (`jti`) or with its whole
+    # login session (`sid`, shared by access and refresh tokens).
+    return [
+        payload.get("jti"),
+        payload.get("sid"),
+    ]
+
+
 def _create_token(
     payload: dict,
     expires_delta: timedelta,
@@ -46,6 +74,7 @@ def _create_token(
 
     token_payload.update(
         {
+            "jti": uuid4().hex,
             "iat": now,
             "exp": now + expires_delta,
         }
@@ -66,6 +95,7 @@ def _create_token(
 def create_access_token(
     customer_id: str,
     mobile: Optional[str] = None,
+    session_id: Optional[str] = None,
 ) -> str:
     payload = {
         "sub": str(customer_id),
@@ -75,6 +105,9 @@ def create_access_token(
     if mobile:
         payload["mobile"] = mobile
 
+    if session_id:
+        payload["sid"] = session_id
+
     return _create_token(
         payload=payload,
         expires_delta=timedelta(
@@ -90,12 +123,16 @@ def create_access_token(
 
 def create_refresh_token(
     customer_id: str,
+    session_id: Optional[str] = None,
 ) -> str:
     payload = {
         "sub": str(customer_id),
         "type": "refresh",
     }
 
+    if session_id:
+        payload["sid"] = session_id
+
     return _create_token(
         payload=payload,
         expires_delta=timedelta(
@@ -113,13 +150,17 @@ def create_auth_tokens(
     customer_id: str,
     mobile: Optional[str] = None,
 ) -> dict:
+    session_id = uuid4().hex
+
     access_token = create_access_token(
         customer_id=customer_id,
         mobile=mobile,
+        session_id=session_id,
     )
 
     refresh_token = create_refresh_token(
         customer_id=customer_id,
+        session_id=session_id,
     )
 
     return {
@@ -139,10 +180,13 @@ def decode_token(
     token: str,
 ) -> Optional[dict]:
     try:
-        return jwt.decode(
+        return token_claims_cache.decode(
             token,
-            settings.SECRET_KEY,
-            algorithms=[ALGORITHM],
+            lambda value: jwt.decode(
+                value,
+                settings.SECRET_KEY,
+                algorithms=[ALGORITHM],
+            ),
         )
 
     except JWTError:
@@ -219,9 +263,16 @@ def get_customer_id_from_token(
 # ============================================================
 
 
-def refresh_access_token(
+async def refresh_access_token(
     refresh_token: str,
 ) -> Optional[dict]:
+    """
+    Exchange a refresh token for a new access/refresh pair.
+
+    The old refresh token is revoked (rotation). Revoking is atomic,
+    so a refresh token presented twice fails the second time.
+    """
+
     payload = verify_refresh_token(refresh_token)
 
     if not payload:
@@ -232,8 +283,26 @@ def refresh_access_token(
     if not customer_id:
         return None
 
+    if await token_revocation.is_revoked(_revocation_ids(payload)):
+        return None
+
+    if payload.get("jti"):
+        rotated = await token_revocation.revoke(
+            payload["jti"],
+            _expires_at(payload),
+        )
+
+        if not rotated:
+            return None
+
+        refresh_token = create_refresh_token(
+            customer_id=str(customer_id),
+            session_id=payload.get("sid"),
+        )
+
     access_token = create_access_token(
         customer_id=str(customer_id),
+        session_id=payload.get("sid"),
     )
 
     return {
@@ -281,7 +350,15 @@ async def get_current_customer_id(
 
     token = credentials.credentials
 
-    customer_id = get_customer_id_from_token(token)
+    payload = verify_access_token(token)
+
+    # Only Bloom filter hits reach the database here.
+    if payload and await token_revocation.is_revoked(
+        _revocation_ids(payload)
+    ):
+        payload = None
+
+    customer_id = payload.get("sub") if payload else None
 
     if not customer_id:
         raise HTTPException(
@@ -308,7 +385,6 @@ async def get_current_customer(
     """
 
     from bson import ObjectId
-    from app.db.mongo import db
 
     try:
         object_id = ObjectId(customer_id)
@@ -322,10 +398,8 @@ async def get_current_customer(
             },
         )
 
-    customer = await db["customers"].find_one(
-        {
-            "_id": object_id,
-        }
+    customer = await customer_cache.get(
+        object_id
     )
 
     if not customer:
@@ -349,10 +423,11 @@ async def logout_customer(
     token: str,
 ) -> bool:
     """
-    JWT access tokens are stateless.
+    Revoke the login session of an access token.
 
-    Client-side token removal is sufficient unless you later
-    implement a token blacklist/session store.
+    Revoking the session id invalidates the access token and every
+    refresh token of that login. Tokens issued before session ids
+    existed only have their own id revoked.
     """
 
     payload = verify_access_token(token)
@@ -360,4 +435,19 @@ async def logout_customer(
     if not payload:
         return False
 
+    if payload.get("sid"):
+        # Rotated refresh tokens of this session expire no later
+        # than a full refresh lifetime from now.
+        await token_revocation.revoke(
+            payload["sid"],
+            _now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    elif payload.get("jti"):
+        await token_revocation.revoke(
+            payload["jti"],
+            _expires_at(payload),
+        )
+    else:
+        return False
+
     return True
\ No newline at end of file
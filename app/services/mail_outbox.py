@@ -0,0 +1,489 @@
+import asyncio
+import smtplib
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Any, List, Optional, Union
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
+from app.services.mail_service import (
+    SMTPConfig,
+    build_message,
+    get_smtp_config,
+    open_smtp_connection,
+)
+from config import settings
+
+
+# ============================================================
+# COLLECTIONS
+# ============================================================
+
+mail_outbox_collection = db["mail_outbox"]
+
+register_indexes(
+    "mail_outbox",
+    IndexSpec("mail_outbox_due", [("status", 1), ("nextAttemptAt", 1)]),
+    # Delivered mail is kept for a week for troubleshooting.
+    IndexSpec("mail_outbox_sent_expiry", [("sentAt", 1)], expire_after_seconds=7 * 24 * 3600),
+)
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# A message claimed by a worker that crashed becomes pending
+# again once its lease runs out.
+SEND_LEASE_SECONDS = 120
+
+RETRY_BASE_SECONDS = 5
+
+RETRY_MAX_SECONDS = 15 * 60
+
+# Connections idle for longer than this are checked with NOOP
+# before reuse; busier connections are used directly and a
+# dropped one is reopened on the send error.
+IDLE_CHECK_SECONDS = 30
+
+# Worker backoff after an unexpected error (MongoDB down, ...).
+WORKER_BACKOFF_BASE_SECONDS = 1
+
+WORKER_BACKOFF_MAX_SECONDS = 60
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(RETRY_BASE_SECONDS * (2 ** (attempts - 1)), RETRY_MAX_SECONDS)
+
+
+# Errors about one message; anything else is about the connection.
+_MESSAGE_REJECTIONS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """
+    Whether retrying this message cannot help: the server rejected
+    the recipients, the sender or the message itself with a 5xx.
+
+    Connection, TLS and login errors are never permanent, even with
+    a 5xx code, because they say nothing about the message.
+    """
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return bool(exc.recipients) and all(
+            code >= 500 for code, _ in exc.recipients.values()
+        )
+
+    if isinstance(exc, _MESSAGE_REJECTIONS):
+        return exc.smtp_code >= 500
+
+    return False
+
+
+# ============================================================
+# SMTP CONNECTION
+# ============================================================
+
+
+class _PooledSMTPConnection:
+    """
+    A persistent, authenticated SMTP connection owned by one worker.
+
+    All methods block and run on a thread through `asyncio.to_thread`.
+    """
+
+    def __init__(self, config: SMTPConfig, outbox: "MailOutbox"):
+        self.config = config
+        self.outbox = outbox
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            if monotonic() - self._last_used < IDLE_CHECK_SECONDS:
+                return self._smtp
+
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+
+        self._smtp = open_smtp_connection(self.config)
+        self.outbox.metrics["connectionsOpened"] += 1
+        return self._smtp
+
+    def _send(self, email) -> None:
+        try:
+            self._connect().send_message(email)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect().send_message(email)
+
+    def send_batch(
+        self,
+        messages: List[dict],
+    ) -> List[Optional[tuple[str, bool]]]:
+        """
+        Send messages over the pooled connection.
+
+        Returns one entry per message: None when sent, otherwise
+        `(error text, permanent)`. A dropped connection is reopened
+        once. When the connection cannot be opened (refused, TLS or
+        login failure) this and the remaining messages fail
+        transiently and are retried later.
+        """
+
+        results: List[Optional[tuple[str, bool]]] = []
+
+        try:
+            self._connect()
+        except (smtplib.SMTPException, OSError) as exc:
+            self.close()
+            return [(str(exc), False)] * len(messages)
+
+        for index, message in enumerate(messages):
+            email = build_message(
+                message["subject"],
+                message["recipients"],
+                message["body"],
+            )
+
+            try:
+                self._send(email)
+
+            except _MESSAGE_REJECTIONS as exc:
+                # The server answered, so the connection is live.
+                self._last_used = monotonic()
+                results.append((str(exc), _is_permanent(exc)))
+                continue
+
+            except (smtplib.SMTPException, OSError) as exc:
+                self.close()
+                return results + [(str(exc), False)] * (len(messages) - index)
+
+            self._last_used = monotonic()
+            results.append(None)
+
+        return results
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+
+        self._smtp = None
+
+
+# ============================================================
+# OUTBOX
+# ============================================================
+
+
+class MailOutbox:
+    """
+    Durable asynchronous mail delivery.
+
+    `enqueue` stores the message in the `mail_outbox` collection and
+    wakes a worker, so request handlers never wait on SMTP. Each
+    worker owns one persistent SMTP connection and sends up to
+    `batch_size` messages per round trip to the thread pool.
+    Transient failures (including connect, TLS and login errors)
+    are retried with exponential backoff until `max_attempts`, then
+    marked failed; per-message 5xx rejections are marked failed at
+    once.
+
+    A sweeper re-queues due messages from MongoDB, which picks up
+    retries, messages left over from a previous run and messages
+    enqueued by other processes.
+    """
+
+    def __init__(
+        self,
+        connections: int,
+        batch_size: int,
+        max_attempts: int,
+        sweep_interval_seconds: int,
+    ):
+        self.connections = connections
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: set[ObjectId] = set()
+        self._tasks: list[asyncio.Task] = []
+        self._connections: list[_PooledSMTPConnection] = []
+
+        self.metrics = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "rejected": 0,
+            "retried": 0,
+            "batches": 0,
+            "connectionsOpened": 0,
+            "workerErrors": 0,
+        }
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+
+    async def enqueue(
+        self,
+        subject: str,
+        recipients: Union[str, List[str]],
+        body: str,
+    ) -> ObjectId:
+        if isinstance(recipients, str):
+            recipients = [recipients]
+
+        now = _now()
+
+        result = await mail_outbox_collection.insert_one(
+            {
+                "subject": subject,
+                "recipients": recipients,
+                "body": body,
+                "status": "pending",
+                "attempts": 0,
+                "nextAttemptAt": now,
+                "lastError": None,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+        )
+
+        self.metrics["enqueued"] += 1
+        self._put(result.inserted_id)
+
+        return result.inserted_id
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+
+        self._queue = asyncio.Queue()
+        config = get_smtp_config()
+
+        for _ in range(self.connections):
+            connection = _PooledSMTPConnection(config, self)
+            self._connections.append(connection)
+            self._tasks.append(asyncio.create_task(self._worker(connection)))
+
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for connection in self._connections:
+            await asyncio.to_thread(connection.close)
+
+        self._connections = []
+        self._queue = None
+        self._queued.clear()
+
+    async def stats(self) -> dict[str, Any]:
+        counts = {
+            row["_id"]: row["count"]
+            async for row in mail_outbox_collection.aggregate(
+                [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            )
+        }
+
+        return {
+            **self.metrics,
+            "queued": len(self._queued),
+            "workers": len(self._connections),
+            "outbox": counts,
+        }
+
+    # --------------------------------------------------------
+    # Internals
+    # --------------------------------------------------------
+
+    def _put(self, message_id: ObjectId) -> None:
+        if self._queue is None or message_id in self._queued:
+            return
+
+        self._queued.add(message_id)
+        self._queue.put_nowait(message_id)
+
+    async def _claim(self, message_id: ObjectId) -> Optional[dict]:
+        now = _now()
+
+        return await mail_outbox_collection.find_one_and_update(
+            {
+                "_id": message_id,
+                "status": "pending",
+                "nextAttemptAt": {"$lte": now},
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "leaseUntil": now + timedelta(seconds=SEND_LEASE_SECONDS),
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _next_batch(self) -> list[dict]:
+        message_ids = [await self._queue.get()]
+
+        while len(message_ids) < self.batch_size and not self._queue.empty():
+            message_ids.append(self._queue.get_nowait())
+
+        self._queued.difference_update(message_ids)
+
+        claimed = await asyncio.gather(
+            *(self._claim(message_id) for message_id in message_ids)
+        )
+
+        return [message for message in claimed if message]
+
+    async def _worker(self, connection: _PooledSMTPConnection) -> None:
+        failures = 0
+
+        while True:
+            try:
+                batch = await self._next_batch()
+
+                if batch:
+                    try:
+                        errors = await asyncio.to_thread(connection.send_batch, batch)
+                    except Exception as exc:
+                        errors = [(str(exc), False)] * len(batch)
+
+                    self.metrics["batches"] += 1
+                    await self._record_results(batch, errors)
+
+                failures = 0
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Unclaimed messages stay pending and claimed ones
+                # are re-queued when their lease runs out, so the
+                # sweeper picks everything up again.
+                failures += 1
+                self.metrics["workerErrors"] += 1
+                delay = min(
+                    WORKER_BACKOFF_BASE_SECONDS * (2 ** (failures - 1)),
+                    WORKER_BACKOFF_MAX_SECONDS,
+                )
+                print(f"⚠️ Mail outbox worker failed, retrying in {delay}s: {exc}")
+                await asyncio.sleep(delay)
+
+    async def _record_results(
+        self,
+        batch: list[dict],
+        errors: list[Optional[tuple[str, bool]]],
+    ) -> None:
+        now = _now()
+
+        sent_ids = [
+            message["_id"]
+            for message, error in zip(batch, errors)
+            if error is None
+        ]
+
+        if sent_ids:
+            await mail_outbox_collection.update_many(
+                {"_id": {"$in": sent_ids}},
+                {
+                    "$set": {
+                        "status": "sent",
+                        "sentAt": now,
+                        "lastError": None,
+                        "updatedAt": now,
+                    },
+                    "$unset": {"leaseUntil": ""},
+                },
+            )
+            self.metrics["sent"] += len(sent_ids)
+
+        for message, result in zip(batch, errors):
+            if result is None:
+                continue
+
+            error, permanent = result
+
+            if permanent or message["attempts"] >= self.max_attempts:
+                update = {
+                    "status": "failed",
+                    "lastError": error,
+                    "updatedAt": now,
+                }
+                self.metrics["failed"] += 1
+
+                if permanent:
+                    self.metrics["rejected"] += 1
+                    print(f"❌ Mail {message['_id']} rejected by the SMTP server: {error}")
+                else:
+                    print(f"❌ Mail {message['_id']} failed after {message['attempts']} attempts: {error}")
+            else:
+                update = {
+                    "status": "pending",
+                    "lastError": error,
+                    "nextAttemptAt": now + timedelta(seconds=_retry_delay(message["attempts"])),
+                    "updatedAt": now,
+                }
+                self.metrics["retried"] += 1
+
+            await mail_outbox_collection.update_one(
+                {"_id": message["_id"]},
+                {"$set": update, "$unset": {"leaseUntil": ""}},
+            )
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                now = _now()
+
+                await mail_outbox_collection.update_many(
+                    {"status": "sending", "leaseUntil": {"$lt": now}},
+                    {"$set": {"status": "pending", "updatedAt": now}},
+                )
+
+                async for message in mail_outbox_collection.find(
+                    {"status": "pending", "nextAttemptAt": {"$lte": now}},
+                    {"_id": 1},
+                ).sort("nextAttemptAt", 1).limit(self.batch_size * self.connections * 10):
+                    self._put(message["_id"])
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ Mail outbox sweep failed: {exc}")
+
+            await asyncio.sleep(self.sweep_interval_seconds)
+
+
+mail_outbox = MailOutbox(
+    connections=settings.MAIL_OUTBOX_CONNECTIONS,
+    batch_size=settings.MAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.MAIL_OUTBOX_MAX_ATTEMPTS,
+    sweep_interval_seconds=settings.MAIL_OUTBOX_SWEEP_SECONDS,
+)
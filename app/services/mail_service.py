@@ -1,19 +1,58 @@
+from dataclasses import dataclass
 from email.message import EmailMessage
 import os
 import smtplib
 from typing import List, Union
 
 
-def send_email(subject: str, recipients: Union[str, List[str]], body: str):
+@dataclass(frozen=True)
+class SMTPConfig:
+    mode: str
+    host: str
+    port: int
+    user: str = ""
+    password: str = ""
+    use_tls: bool = False
+    timeout: float = 30.0
+
+
+def get_smtp_config() -> SMTPConfig:
     """
-    Send a plain text email.
+    Resolve SMTP settings.
     - Uses local SMTP (localhost:1025) if MAIL_MODE=local
     - Uses real SMTP (with login) if MAIL_MODE=real
 
     Env vars (for MAIL_MODE=real):
       MAIL_HOST, MAIL_PORT, MAIL_USER, MAIL_PASS, MAIL_USE_TLS (true/false)
+
+    MAIL_TIMEOUT (seconds) bounds every socket operation in both modes.
     """
 
+    mail_mode = os.getenv("MAIL_MODE", "local")  # "local" or "real"
+    timeout = float(os.getenv("MAIL_TIMEOUT", 30))
+
+    if mail_mode == "local":
+        # Works with MailHog, Mailpit, aiosmtpd debug server
+        return SMTPConfig(
+            mode="local",
+            host=os.getenv("MAIL_HOST", "localhost"),
+            port=int(os.getenv("MAIL_PORT", 1025)),
+            timeout=timeout,
+        )
+
+    # real SMTP (Gmail, Mailtrap, etc.)
+    return SMTPConfig(
+        mode="real",
+        host=os.getenv("MAIL_HOST", "sandbox.smtp.mailtrap.io"),
+        port=int(os.getenv("MAIL_PORT", 587)),
+        user=os.getenv("MAIL_USER", "xxxxxx"),
+        password=os.getenv("MAIL_PASS", "xxxxxx"),
+        use_tls=os.getenv("MAIL_USE_TLS", "true").lower() == "true",
+        timeout=timeout,
+    )
+
+
+def build_message(subject: str, recipients: Union[str, List[str]], body: str) -> EmailMessage:
     if isinstance(recipients, str):
         recipients = [recipients]
 
@@ -22,29 +61,41 @@ def send_email(subject: str, recipients: Union[str, List[str]], body: str):
     msg["To"] = ", ".join(recipients)
     msg["Subject"] = subject
     msg.set_content(body)
+    return msg
 
-    mail_mode = os.getenv("MAIL_MODE", "local")  # "local" or "real"
 
-    if mail_mode == "local":
-        # Works with MailHog, Mailpit, aiosmtpd debug server
-        smtp_host = os.getenv("MAIL_HOST", "localhost")
-        smtp_port = int(os.getenv("MAIL_PORT", 1025))
-        with smtplib.SMTP(smtp_host, smtp_port) as smtp:
-            smtp.send_message(msg)
-        print(f"✅ [LOCAL] Email sent to {', '.join(recipients)}")
-
-    else:  # real SMTP (Gmail, Mailtrap, etc.)
-        smtp_host = os.getenv("MAIL_HOST", "sandbox.smtp.mailtrap.io")
-        smtp_port = int(os.getenv("MAIL_PORT", 587))
-        smtp_user = os.getenv("MAIL_USER", "xxxxxx")
-        smtp_pass = os.getenv("MAIL_PASS", "xxxxxx")
-        use_tls = os.getenv("MAIL_USE_TLS", "true").lower() == "true"
-
-        with smtplib.SMTP(smtp_host, smtp_port) as smtp:
-            if use_tls:
-                smtp.starttls()
-            if smtp_user and smtp_pass:
-                smtp.login(smtp_user, smtp_pass)
-            smtp.send_message(msg)
-
-        print(f"✅ [REAL] Email sent to {', '.join(recipients)} via {smtp_host}")
+def open_smtp_connection(config: SMTPConfig) -> smtplib.SMTP:
+    """
+    Open an SMTP connection, upgrading to TLS and logging in when
+    configured. The caller owns the connection and must close it.
+    """
+
+    smtp = smtplib.SMTP(config.host, config.port, timeout=config.timeout)
+
+    try:
+        if config.use_tls:
+            smtp.starttls()
+        if config.user and config.password:
+            smtp.login(config.user, config.password)
+    except Exception:
+        smtp.close()
+        raise
+
+    return smtp
+
+
+def send_email(subject: str, recipients: Union[str, List[str]], body: str):
+    """
+    Send a plain text email synchronously over a fresh connection.
+
+    Blocks for the full SMTP handshake. Async code should enqueue
+    through `app.services.mail_outbox.mail_outbox` instead.
+    """
+
+    msg = build_message(subject, recipients, body)
+    config = get_smtp_config()
+
+    with open_smtp_connection(config) as smtp:
+        smtp.send_message(msg)
+
+    print(f"✅ [{config.mode.upper()}] Email sent to {msg['To']} via {config.host}")
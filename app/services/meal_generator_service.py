@@ -1,20 +1,40 @@
+import asyncio
+import hashlib
 import json
-from typing import List
-from openai import OpenAI, RateLimitError
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, List, Optional
+from openai import APITimeoutError, AsyncOpenAI, RateLimitError
 from dotenv import load_dotenv
 import os
 import logging
 
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
 from app.modules.meal_planner.schemas.meal_planner import MealOut, MealRequestIn
-
-from app.modules.meal_planner.schemas.meal_planner import MealOut
 from app.utils.json_util import to_json
+from config import settings
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OPENAI_BASE_URL points the client at any OpenAI-compatible
+# server, e.g. a local fake for testing.
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=settings.OPENAI_BASE_URL or None,
+    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+)
 logger = logging.getLogger(__name__)
 
+meal_plan_cache_collection = db["meal_plan_cache"]
+
+register_indexes(
+    "meal_plan_cache",
+    IndexSpec("meal_plan_cache_expiry", [("expiresAt", 1)], expire_after_seconds=0),
+)
+
 SYSTEM_PROMPT = """
 You are an Indian nutrition meal planner.
 
@@ -120,18 +140,191 @@ FALLBACK_RESPONSE = [
 ]
 
 
-def generate_meal_plan(user_input: MealRequestIn) -> List[MealOut]:
+# =========================================================
+# Request normalization
+# =========================================================
 
-    try:
 
-        user_prompt = f"""
+def normalize_meal_request(user_input: MealRequestIn | dict) -> dict[str, Any]:
+    """
+    Canonical form of a meal request, used as the cache key.
+
+    Requests differing only in region casing or whitespace, or in an
+    omitted `planOption`, produce the same plan.
+    """
+
+    data = (
+        user_input.model_dump()
+        if hasattr(user_input, "model_dump")
+        else dict(user_input)
+    )
+
+    if isinstance(data.get("region"), str):
+        data["region"] = " ".join(data["region"].split()).lower()
+
+    data["planOption"] = data.get("planOption") or "today"
+
+    return data
+
+
+def meal_request_key(normalized: dict[str, Any]) -> str:
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# =========================================================
+# Cache
+# =========================================================
+
+
+class MealPlanCache:
+    """
+    Two-tier cache of generated meal plans.
+
+    A per-process LRU answers repeat requests without I/O; the
+    `meal_plan_cache` collection shares plans across workers and
+    restarts. Both tiers expire after `ttl_seconds`.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+
+        self.hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: str) -> Optional[list[dict]]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, meals = entry
+
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return meals
+
+    def _store(self, key: str, meals: list[dict], ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, meals)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[list[dict]]:
+        meals = self._lookup(key)
+
+        if meals is not None:
+            self.hits += 1
+            return meals
+
+        try:
+            document = await meal_plan_cache_collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"Meal plan cache read failed: {str(e)}")
+            document = None
+
+        if document:
+            expires_at = document["expiresAt"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+            if remaining > 0:
+                self.mongo_hits += 1
+                self._store(key, document["meals"], remaining)
+                return document["meals"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, request: dict[str, Any], meals: list[dict]) -> None:
+        self._store(key, meals, self.ttl_seconds)
+
+        now = datetime.now(timezone.utc)
+
+        try:
+            await meal_plan_cache_collection.replace_one(
+                {"_id": key},
+                {
+                    "request": request,
+                    "meals": meals,
+                    "createdAt": now,
+                    "expiresAt": now + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Meal plan cache write failed: {str(e)}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "mongoHits": self.mongo_hits,
+            "misses": self.misses,
+        }
+
+
+meal_plan_cache = MealPlanCache(
+    max_size=settings.MEAL_PLAN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.MEAL_PLAN_CACHE_TTL_SECONDS,
+)
+
+# Bounds concurrent OpenAI calls per process; extra requests wait
+# here instead of piling onto the API and its rate limits.
+_openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+
+# Identical requests already being generated, keyed like the cache.
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+# =========================================================
+# Generation
+# =========================================================
+
+
+def build_user_prompt(user_input: MealRequestIn | dict) -> str:
+    return f"""
         Generate meal plan:
 
         {to_json(user_input)}
         """
 
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini",
+
+def parse_meal_plan(content: str | None) -> List[MealOut]:
+    if not content:
+        raise ValueError("Empty response from OpenAI")
+
+    parsed = json.loads(content)
+
+    # Handle wrapped response
+    if isinstance(parsed, dict):
+
+        if "meals" in parsed:
+            parsed = parsed["meals"]
+
+        elif "data" in parsed:
+            parsed = parsed["data"]
+
+        elif "mealPlan" in parsed:
+            parsed = parsed["mealPlan"]
+
+    return [MealOut(**meal) for meal in parsed]
+
+
+async def _request_meal_plan(user_input: MealRequestIn | dict) -> List[MealOut]:
+    async with _openai_semaphore:
+        response = await client.chat.completions.create(
+            model=settings.OPENAI_MEAL_MODEL,
             temperature=0.7,
             response_format={"type": "json_object"},
             messages=[
@@ -141,46 +334,303 @@ def generate_meal_plan(user_input: MealRequestIn) -> List[MealOut]:
                 },
                 {
                     "role": "user",
-                    "content": user_prompt
+                    "content": build_user_prompt(user_input)
                 }
             ]
         )
 
-        content = response.choices[0].message.content
-
-        if not content:
-            raise ValueError("Empty response from OpenAI")
+    return parse_meal_plan(response.choices[0].message.content)
 
-        parsed = json.loads(content)
 
-        # Handle wrapped response
-        if isinstance(parsed, dict):
+def fallback_meal_plan() -> List[MealOut]:
+    return [MealOut(**meal) for meal in FALLBACK_RESPONSE]
 
-            if "meals" in parsed:
-                parsed = parsed["meals"]
 
-            elif "data" in parsed:
-                parsed = parsed["data"]
-
-            elif "mealPlan" in parsed:
-                parsed = parsed["mealPlan"]
+async def _generate_and_cache(
+    key: str,
+    normalized: dict[str, Any],
+    user_input: MealRequestIn | dict,
+) -> List[MealOut]:
+    try:
 
-        return [MealOut(**meal) for meal in parsed]
+        meals = await _request_meal_plan(user_input)
 
     except RateLimitError as e:
 
         logger.error(f"OpenAI quota/rate limit error: {str(e)}")
 
-        return [MealOut(**meal) for meal in FALLBACK_RESPONSE]
+        return fallback_meal_plan()
+
+    except APITimeoutError as e:
+
+        logger.error(f"OpenAI request timed out: {str(e)}")
+
+        return fallback_meal_plan()
 
     except json.JSONDecodeError as e:
 
         logger.error(f"Invalid JSON response: {str(e)}")
 
-        return [MealOut(**meal) for meal in FALLBACK_RESPONSE]
+        return fallback_meal_plan()
 
     except Exception as e:
 
         logger.error(f"Meal generation failed: {str(e)}")
 
-        return [MealOut(**meal) for meal in FALLBACK_RESPONSE]
\ No newline at end of file
+        return fallback_meal_plan()
+
+    # Fallbacks are returned above and never cached, so the next
+    # request retries OpenAI.
+    await meal_plan_cache.set(
+        key,
+        normalized,
+        [meal.model_dump() for meal in meals],
+    )
+
+    return meals
+
+
+async def generate_meal_plan(user_input: MealRequestIn | dict) -> List[MealOut]:
+    """
+    Generate a meal plan without blocking the event loop.
+
+    Served from the cache when possible. Concurrent identical
+    requests share a single OpenAI call.
+    """
+
+    normalized = normalize_meal_request(user_input)
+    key = meal_request_key(normalized)
+
+    cached = await meal_plan_cache.get(key)
+
+    if cached is not None:
+        return [MealOut(**meal) for meal in cached]
+
+    in_flight = _in_flight.get(key)
+
+    if in_flight is None:
+        in_flight = asyncio.ensure_future(
+            _generate_and_cache(key, normalized, user_input)
+        )
+        _in_flight[key] = in_flight
+        in_flight.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    # shield: a client disconnect cancels only this waiter, not the
+    # shared generation other requests are waiting on.
+    meals = await asyncio.shield(in_flight)
+
+    return [meal.model_copy(deep=True) for meal in meals]
+
+
+# =========================================================
+# Streaming
+# =========================================================
+
+
+# Keys a wrapped plan may use, in `parse_meal_plan` order.
+MEAL_PLAN_KEYS = ("meals", "data", "mealPlan")
+
+
+class MealStreamParser:
+    """
+    Incremental parser for a streamed meal plan.
+
+    Feed raw completion text as it arrives; every meal object that
+    has been fully received is returned once. Meals are the object
+    children of a bare top-level array, or of the array under one of
+    `MEAL_PLAN_KEYS` in a top-level wrapper such as {"meals": [...]},
+    as `parse_meal_plan` reads them. Arrays under any other key are
+    skipped.
+    """
+
+    def __init__(self):
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._key_chars: Optional[list[str]] = None
+        self._key: Optional[str] = None
+        self._meals_depth: Optional[int] = None
+        self._meals_closed = False
+        self._meal_start: Optional[int] = None
+        self._meal_chars: list[str] = []
+
+    def _is_meals_array(self) -> bool:
+        if not self._stack:
+            return True
+
+        return self._stack == ["{"] and self._key in MEAL_PLAN_KEYS
+
+    def feed(self, text: str) -> list[dict]:
+        meals = []
+
+        for char in text:
+            if self._meal_start is not None:
+                self._meal_chars.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._key = "".join(self._key_chars)
+                        self._key_chars = None
+                    continue
+
+                if self._key_chars is not None:
+                    self._key_chars.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                # Strings directly inside the top-level object are
+                # its keys (and scalar values); remember the last one.
+                if self._stack == ["{"]:
+                    self._key_chars = []
+
+            elif char == "[":
+                if self._meals_depth is None and self._is_meals_array():
+                    self._meals_depth = len(self._stack) + 1
+                self._stack.append(char)
+
+            elif char == "{":
+                self._stack.append(char)
+                if (
+                    self._meal_start is None
+                    and self._meals_depth is not None
+                    and not self._meals_closed
+                    and len(self._stack) == self._meals_depth + 1
+                ):
+                    self._meal_start = len(self._stack)
+                    self._meal_chars = [char]
+
+            elif char in "]}":
+                if self._stack:
+                    self._stack.pop()
+
+                if char == "]" and len(self._stack) == (self._meals_depth or 0) - 1:
+                    self._meals_closed = True
+
+                if (
+                    char == "}"
+                    and self._meal_start is not None
+                    and len(self._stack) == self._meal_start - 1
+                ):
+                    meals.append(json.loads("".join(self._meal_chars)))
+                    self._meal_start = None
+                    self._meal_chars = []
+
+        return meals
+
+
+# Streams whose client went away keep generating (and then cache
+# the plan); the tasks are held here until they finish.
+_stream_tasks: set[asyncio.Task] = set()
+
+
+async def _produce_meal_stream(
+    user_input: MealRequestIn | dict,
+    normalized: dict[str, Any],
+    key: str,
+    queue: asyncio.Queue,
+) -> None:
+    """
+    Read the completion stream and queue each meal as it is parsed,
+    then None once generation is over.
+
+    Only this task holds the OpenAI semaphore, so the slot is freed
+    when the model finishes rather than when the client finishes
+    reading the response.
+    """
+
+    parser = MealStreamParser()
+    meals: list[MealOut] = []
+
+    try:
+
+        async with _openai_semaphore:
+            stream = await client.chat.completions.create(
+                model=settings.OPENAI_MEAL_MODEL,
+                temperature=0.7,
+                response_format={"type": "json_object"},
+                stream=True,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": build_user_prompt(user_input)
+                    }
+                ]
+            )
+
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+
+                delta = chunk.choices[0].delta.content
+
+                if not delta:
+                    continue
+
+                for meal_data in parser.feed(delta):
+                    meal = MealOut(**meal_data)
+                    meals.append(meal)
+                    queue.put_nowait(meal)
+
+        if meals:
+            await meal_plan_cache.set(
+                key,
+                normalized,
+                [meal.model_dump() for meal in meals],
+            )
+        else:
+            logger.error("Meal stream finished without any meals")
+
+    except Exception as e:
+
+        logger.error(f"Meal stream failed: {str(e)}")
+
+    finally:
+        queue.put_nowait(None)
+
+
+async def stream_meal_plan(user_input: MealRequestIn | dict) -> AsyncIterator[MealOut]:
+    """
+    Yield meals one by one as the model produces them.
+
+    Cached plans are replayed immediately. A fresh plan is cached
+    once the stream completes; if the stream fails before any meal
+    was produced, the fallback plan is yielded instead.
+    """
+
+    normalized = normalize_meal_request(user_input)
+    key = meal_request_key(normalized)
+
+    cached = await meal_plan_cache.get(key)
+
+    if cached is not None:
+        for meal in cached:
+            yield MealOut(**meal)
+        return
+
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(
+        _produce_meal_stream(user_input, normalized, key, queue)
+    )
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+
+    produced = False
+
+    while (meal := await queue.get()) is not None:
+        produced = True
+        yield meal
+
+    if not produced:
+        for meal in fallback_meal_plan():
+            yield meal
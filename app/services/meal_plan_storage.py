@@ -0,0 +1,422 @@
+import asyncio
+import copy
+from abc import ABC, abstractmethod
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.db.indexes import IndexSpec, register_indexes
+from app.db.mongo import db
+
+
+DEFAULT_PLAN_ID = "default"
+
+WEEK_DAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+meal_plan_meals_collection = db["meal_plan_meals"]
+
+register_indexes(
+    "meal_plan_meals",
+    IndexSpec("meal_plan_meals_meal", [("planId", 1), ("mealId", 1)], unique=True),
+    IndexSpec("meal_plan_meals_week", [("planId", 1), ("dayIndex", 1), ("position", 1)]),
+)
+
+
+def _day_index(day: str) -> Optional[int]:
+    for index, name in enumerate(WEEK_DAYS):
+        if name.lower() == day.lower():
+            return index
+    return None
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+
+class MealPlanStore(ABC):
+    """
+    Storage backend for weekly meal plans.
+
+    A plan is a list of `{"day": ..., "meals": [...]}` entries.
+    `update_meal` and `delete_meal` return None/False when the meal
+    does not exist; `add_meal` returns None when the day does not.
+    """
+
+    @abstractmethod
+    async def get_weekly_meals(self, plan_id: str) -> list[dict]:
+        ...
+
+    @abstractmethod
+    async def add_meal(self, plan_id: str, day: str, meal: dict) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def update_meal(self, plan_id: str, meal_id: str, meal: dict) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def delete_meal(self, plan_id: str, day: str, meal_id: str) -> bool:
+        ...
+
+    async def has_day(self, plan_id: str, day: str) -> bool:
+        return any(
+            day_item["day"].lower() == day.lower()
+            for day_item in await self.get_weekly_meals(plan_id)
+        )
+
+
+class JsonFileMealPlanStore(MealPlanStore):
+    """
+    Single-plan store backed by a JSON file, for local use.
+
+    Writes go to a temporary file that replaces the original, so a
+    crash never leaves a truncated file. Not safe across processes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    def _read(self) -> list[dict]:
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def _write(self, weekly_meals: list[dict]) -> None:
+        temp_path = self.path.with_suffix(".tmp")
+
+        with open(temp_path, "w") as f:
+            json.dump(weekly_meals, f, indent=4)
+
+        os.replace(temp_path, self.path)
+
+    async def get_weekly_meals(self, plan_id: str) -> list[dict]:
+        return await asyncio.to_thread(self._read)
+
+    async def _modify(self, change) -> Any:
+        async with self._lock:
+            weekly_meals = await asyncio.to_thread(self._read)
+            result = change(weekly_meals)
+
+            if result:
+                await asyncio.to_thread(self._write, weekly_meals)
+
+            return result
+
+    async def add_meal(self, plan_id: str, day: str, meal: dict) -> Optional[dict]:
+        def change(weekly_meals):
+            for day_item in weekly_meals:
+                if day_item["day"].lower() == day.lower():
+                    day_item.setdefault("meals", []).append(meal)
+                    return meal
+            return None
+
+        return await self._modify(change)
+
+    async def update_meal(self, plan_id: str, meal_id: str, meal: dict) -> Optional[dict]:
+        def change(weekly_meals):
+            for day_item in weekly_meals:
+                meals = day_item.get("meals", [])
+                for index, existing in enumerate(meals):
+                    if str(existing.get("id")) == str(meal_id):
+                        meals[index] = meal
+                        return meal
+            return None
+
+        return await self._modify(change)
+
+    async def delete_meal(self, plan_id: str, day: str, meal_id: str) -> bool:
+        def change(weekly_meals):
+            for day_item in weekly_meals:
+                if day_item["day"].lower() == day.lower():
+                    meals = day_item.get("meals", [])
+                    filtered = [
+                        meal
+                        for meal in meals
+                        if str(meal.get("id")) != str(meal_id)
+                    ]
+                    day_item["meals"] = filtered
+                    return len(filtered) != len(meals)
+            return False
+
+        return await self._modify(change)
+
+
+class MongoMealPlanStore(MealPlanStore):
+    """
+    Multi-plan store with one document per meal.
+
+    Every edit touches a single document, so edits are atomic and
+    safe across workers, and their cost does not grow with the plan.
+    """
+
+    _INTERNAL_FIELDS = {
+        "_id",
+        "planId",
+        "mealId",
+        "day",
+        "dayIndex",
+        "position",
+        "createdAt",
+        "updatedAt",
+    }
+
+    @classmethod
+    def _to_meal(cls, document: dict) -> dict:
+        meal = {
+            key: value
+            for key, value in document.items()
+            if key not in cls._INTERNAL_FIELDS
+        }
+        meal["id"] = document["mealId"]
+        return meal
+
+    @staticmethod
+    def _meal_fields(meal: dict) -> dict:
+        return {
+            key: value
+            for key, value in meal.items()
+            if key != "id"
+        }
+
+    async def get_weekly_meals(self, plan_id: str) -> list[dict]:
+        weekly_meals = [
+            {"day": day, "meals": []}
+            for day in WEEK_DAYS
+        ]
+
+        async for document in meal_plan_meals_collection.find(
+            {"planId": plan_id},
+        ).sort([("dayIndex", 1), ("position", 1)]):
+            weekly_meals[document["dayIndex"]]["meals"].append(
+                self._to_meal(document)
+            )
+
+        return weekly_meals
+
+    async def has_day(self, plan_id: str, day: str) -> bool:
+        return _day_index(day) is not None
+
+    async def add_meal(self, plan_id: str, day: str, meal: dict) -> Optional[dict]:
+        day_index = _day_index(day)
+
+        if day_index is None:
+            return None
+
+        now = datetime.now(timezone.utc)
+
+        await meal_plan_meals_collection.insert_one(
+            {
+                **self._meal_fields(meal),
+                "planId": plan_id,
+                "mealId": meal["id"],
+                "day": WEEK_DAYS[day_index],
+                "dayIndex": day_index,
+                # Nanosecond clock keeps new meals after existing
+                # ones without reading the day first.
+                "position": time.time_ns(),
+                "createdAt": now,
+                "updatedAt": now,
+            }
+        )
+
+        return meal
+
+    async def update_meal(self, plan_id: str, meal_id: str, meal: dict) -> Optional[dict]:
+        document = await meal_plan_meals_collection.find_one(
+            {"planId": plan_id, "mealId": meal_id},
+            {"_id": 1, "day": 1, "dayIndex": 1, "position": 1, "createdAt": 1},
+        )
+
+        if not document:
+            return None
+
+        # Replace the meal content but keep its slot in the week.
+        updated = await meal_plan_meals_collection.find_one_and_replace(
+            {"_id": document["_id"]},
+            {
+                **self._meal_fields(meal),
+                "planId": plan_id,
+                "mealId": meal_id,
+                "day": document["day"],
+                "dayIndex": document["dayIndex"],
+                "position": document["position"],
+                "createdAt": document.get("createdAt"),
+                "updatedAt": datetime.now(timezone.utc),
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+
+        return self._to_meal(updated) if updated else None
+
+    async def delete_meal(self, plan_id: str, day: str, meal_id: str) -> bool:
+        day_index = _day_index(day)
+
+        if day_index is None:
+            return False
+
+        result = await meal_plan_meals_collection.delete_one(
+            {
+                "planId": plan_id,
+                "dayIndex": day_index,
+                "mealId": meal_id,
+            }
+        )
+
+        return result.deleted_count > 0
+
+    async def import_weekly_meals(
+        self,
+        plan_id: str,
+        weekly_meals: list[dict],
+    ) -> int:
+        """
+        Import a JSON-file plan. Idempotent: meals are upserted by
+        id and keep their original order.
+        """
+        now = datetime.now(timezone.utc)
+        operations = []
+
+        for day_item in weekly_meals:
+            day_index = _day_index(day_item["day"])
+
+            if day_index is None:
+                continue
+
+            for position, meal in enumerate(day_item.get("meals", [])):
+                meal_id = str(meal["id"])
+
+                operations.append(
+                    UpdateOne(
+                        {"planId": plan_id, "mealId": meal_id},
+                        {
+                            "$set": {
+                                **self._meal_fields(meal),
+                                "day": WEEK_DAYS[day_index],
+                                "dayIndex": day_index,
+                                "position": position,
+                                "updatedAt": now,
+                            },
+                            "$setOnInsert": {"createdAt": now},
+                        },
+                        upsert=True,
+                    )
+                )
+
+        if not operations:
+            return 0
+
+        await meal_plan_meals_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+
+# ============================================================
+# READ CACHE
+# ============================================================
+
+
+class CachedMealPlanStore(MealPlanStore):
+    """
+    Read cache with write-through over another store.
+
+    Writes go to the backend first and are then applied to the
+    cached plan. Entries expire after `ttl_seconds`, which bounds
+    how long another worker's edits can stay invisible here.
+    """
+
+    def __init__(self, backend: MealPlanStore, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._plans: dict[str, tuple[float, list[dict]]] = {}
+
+    def _cached(self, plan_id: str) -> Optional[list[dict]]:
+        entry = self._plans.get(plan_id)
+
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+
+        return entry[1]
+
+    async def get_weekly_meals(self, plan_id: str) -> list[dict]:
+        weekly_meals = self._cached(plan_id)
+
+        if weekly_meals is None:
+            weekly_meals = await self.backend.get_weekly_meals(plan_id)
+            self._plans[plan_id] = (time.monotonic() + self.ttl_seconds, weekly_meals)
+
+        return copy.deepcopy(weekly_meals)
+
+    async def has_day(self, plan_id: str, day: str) -> bool:
+        return await self.backend.has_day(plan_id, day)
+
+    def _apply(self, plan_id: str, change) -> None:
+        weekly_meals = self._cached(plan_id)
+
+        if weekly_meals is not None and not change(weekly_meals):
+            # Cache disagrees with the backend; reload next time.
+            self._plans.pop(plan_id, None)
+
+    async def add_meal(self, plan_id: str, day: str, meal: dict) -> Optional[dict]:
+        added = await self.backend.add_meal(plan_id, day, meal)
+
+        if added is not None:
+            def change(weekly_meals):
+                for day_item in weekly_meals:
+                    if day_item["day"].lower() == day.lower():
+                        day_item.setdefault("meals", []).append(copy.deepcopy(added))
+                        return True
+                return False
+
+            self._apply(plan_id, change)
+
+        return added
+
+    async def update_meal(self, plan_id: str, meal_id: str, meal: dict) -> Optional[dict]:
+        updated = await self.backend.update_meal(plan_id, meal_id, meal)
+
+        if updated is not None:
+            def change(weekly_meals):
+                for day_item in weekly_meals:
+                    meals = day_item.get("meals", [])
+                    for index, existing in enumerate(meals):
+                        if str(existing.get("id")) == str(meal_id):
+                            meals[index] = copy.deepcopy(updated)
+                            return True
+                return False
+
+            self._apply(plan_id, change)
+
+        return updated
+
+    async def delete_meal(self, plan_id: str, day: str, meal_id: str) -> bool:
+        deleted = await self.backend.delete_meal(plan_id, day, meal_id)
+
+        if deleted:
+            def change(weekly_meals):
+                for day_item in weekly_meals:
+                    if day_item["day"].lower() == day.lower():
+                        meals = day_item.get("meals", [])
+                        day_item["meals"] = [
+                            meal
+                            for meal in meals
+                            if str(meal.get("id")) != str(meal_id)
+                        ]
+                        return len(day_item["meals"]) != len(meals)
+                return False
+
+            self._apply(plan_id, change)
+
+        return deleted
@@ -1,53 +1,65 @@
-import json
 import random
 import uuid
 from typing import List
 from pathlib import Path
 
 from app.services.meal_generator_service import generate_meal_plan
+from app.services.meal_plan_storage import (
+    DEFAULT_PLAN_ID,
+    CachedMealPlanStore,
+    JsonFileMealPlanStore,
+    MealPlanStore,
+    MongoMealPlanStore,
+)
 from config import Settings
 
 
-class MealPlannerService:
-    def __init__(self):
-        settings = Settings()
+def get_meal_planner_file(settings: Settings) -> Path:
+    # Ensure PROJECT_ROOT always has a valid value
+    PROJECT_ROOT = (
+        Path(settings.PROJECT_ROOT)
+        if settings.PROJECT_ROOT
+        else Path.cwd()
+    )
 
-        # Ensure PROJECT_ROOT always has a valid value
-        PROJECT_ROOT = (
-            Path(settings.PROJECT_ROOT)
-            if settings.PROJECT_ROOT
-            else Path.cwd()
-        )
+    CONFIG_DIR = PROJECT_ROOT / "config"
+
+    return CONFIG_DIR / "meal_planner_data.json"
 
-        CONFIG_DIR = PROJECT_ROOT / "config"
 
-        self.MEAL_PLANNER_FILE = (
-            CONFIG_DIR / "meal_planner_data.json"
+def build_meal_plan_store(settings: Settings) -> MealPlanStore:
+    """
+    Select the storage backend from MEAL_PLANNER_STORAGE:
+    "mongo" (default) or "json" for the local file.
+    """
+
+    if settings.MEAL_PLANNER_STORAGE == "json":
+        backend = JsonFileMealPlanStore(
+            get_meal_planner_file(settings)
         )
+    else:
+        backend = MongoMealPlanStore()
 
-        self.weekly_meals = self._load_weekly_meals_from_file()
+    return CachedMealPlanStore(
+        backend,
+        ttl_seconds=settings.MEAL_PLANNER_CACHE_TTL_SECONDS,
+    )
 
-    def _load_weekly_meals_from_file(self):
-        with open(self.MEAL_PLANNER_FILE, "r") as f:
-            data = json.load(f)
 
-        return data
+class MealPlannerService:
+    def __init__(self, plan_id: str = DEFAULT_PLAN_ID):
+        settings = Settings()
 
-    def _save_weekly_meals_to_file(self):
-        with open(self.MEAL_PLANNER_FILE, "w") as f:
-            json.dump(
-                self.weekly_meals,
-                f,
-                indent=4,
-            )
+        self.plan_id = plan_id
+        self.store = build_meal_plan_store(settings)
 
-    def get_weekly_meals(self) -> List[dict]:
+    async def get_weekly_meals(self) -> List[dict]:
         """
         Returns a list of meals for each day of the week.
         """
-        return self.weekly_meals
+        return await self.store.get_weekly_meals(self.plan_id)
 
-    def generate_meal(self):
+    async def generate_meal(self):
         """
         Returns a suggested meal.
         """
@@ -63,11 +75,11 @@ class MealPlannerService:
             "maidEasyCook": False,
             "planOption": "today",
         };
-        result = generate_meal_plan(defaultMealRequestPayload)
+        result = await generate_meal_plan(defaultMealRequestPayload)
         return random.choice(result) if result else None
     
 
-    def add_meal(
+    async def add_meal(
         self,
         day: str,
         meal_data,
@@ -85,21 +97,18 @@ class MealPlannerService:
         # Generate unique ID
         meal_dict["id"] = str(uuid.uuid4())
 
-        for day_item in self.weekly_meals:
-            if day_item["day"].lower() == day.lower():
-
-                if "meals" not in day_item:
-                    day_item["meals"] = []
-
-                day_item["meals"].append(meal_dict)
-
-                self._save_weekly_meals_to_file()
+        added = await self.store.add_meal(
+            self.plan_id,
+            day,
+            meal_dict,
+        )
 
-                return meal_dict
+        if added is None:
+            raise ValueError(f"Day '{day}' not found")
 
-        raise ValueError(f"Day '{day}' not found")
+        return added
 
-    def update_meal(
+    async def update_meal(
         self,
         meal_id: str,
         meal_data,
@@ -116,23 +125,18 @@ class MealPlannerService:
 
         updated_meal["id"] = meal_id
 
-        for day_item in self.weekly_meals:
-
-            meals = day_item.get("meals", [])
-
-            for index, meal in enumerate(meals):
-
-                if str(meal.get("id")) == str(meal_id):
-
-                    meals[index] = updated_meal
-
-                    self._save_weekly_meals_to_file()
+        updated = await self.store.update_meal(
+            self.plan_id,
+            meal_id,
+            updated_meal,
+        )
 
-                    return updated_meal
+        if updated is None:
+            raise ValueError(f"Meal with ID '{meal_id}' not found")
 
-        raise ValueError(f"Meal with ID '{meal_id}' not found")
+        return updated
 
-    def delete_meal(
+    async def delete_meal(
         self,
         day: str,
         meal_id: str,
@@ -141,30 +145,21 @@ class MealPlannerService:
         Delete meal by day and ID.
         """
 
-        for day_item in self.weekly_meals:
-
-            if day_item["day"].lower() == day.lower():
+        if not await self.store.has_day(self.plan_id, day):
+            raise ValueError(f"Day '{day}' not found")
 
-                meals = day_item.get("meals", [])
-
-                filtered_meals = [
-                    meal
-                    for meal in meals
-                    if str(meal.get("id")) != str(meal_id)
-                ]
-
-                if len(filtered_meals) == len(meals):
-                    raise ValueError(
-                        f"Meal with ID '{meal_id}' not found"
-                    )
-
-                day_item["meals"] = filtered_meals
-
-                self._save_weekly_meals_to_file()
+        deleted = await self.store.delete_meal(
+            self.plan_id,
+            day,
+            meal_id,
+        )
 
-                return {
-                    "success": True,
-                    "message": "Meal deleted successfully",
-                }
+        if not deleted:
+            raise ValueError(
+                f"Meal with ID '{meal_id}' not found"
+            )
 
-        raise ValueError(f"Day '{day}' not found")
\ No newline at end of file
+        return {
+            "success": True,
+            "message": "Meal deleted successfully",
+        }
@@ -9,6 +9,7 @@ from passlib.context import CryptContext
 from jose import jwt
 from fastapi import status
 
+from app.utils.token_cache import TokenClaimsCache
 from config import settings
 
 # JWT config
@@ -19,7 +20,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+token_claims_cache = TokenClaimsCache(settings.TOKEN_CACHE_MAX_SIZE)
 
 # ✅ OAuth2 scheme will automatically extract "Authorization: Bearer <token>"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  
@@ -49,7 +56,12 @@ def create_refresh_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def decode_token(token: str):
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Signature and expiry are checked once per token; repeat
+    # requests reuse the verified claims until the token's exp.
+    return token_claims_cache.decode(
+        token,
+        lambda value: jwt.decode(value, SECRET_KEY, algorithms=[ALGORITHM]),
+    )
 
 async def authenticate(token: str = Depends(oauth2_scheme)):
     try:
@@ -62,6 +74,7 @@ async def authenticate(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+# Blocking; request handlers use app.services.auth.password_service.
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -0,0 +1,61 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `might_contain` never returns a false negative; false positives
+    stay near `error_rate` while no more than `capacity` distinct
+    keys are added. Keys cannot be removed, so callers rebuild the
+    filter once `count` passes `capacity`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+
+        self.size = max(
+            8,
+            int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from one 128-bit digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, key: str) -> bool:
+        """Add a key. Returns False when it was probably present."""
+        added = False
+
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            mask = 1 << bit
+
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                added = True
+
+        if added:
+            self.count += 1
+
+        return added
+
+    def might_contain(self, key: str) -> bool:
+        return all(
+            self._bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(key)
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return self.might_contain(key)
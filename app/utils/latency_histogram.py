@@ -0,0 +1,49 @@
+from bisect import bisect_left
+from typing import Any
+
+
+# Upper bounds in milliseconds. Observations above the last bound
+# land in the overflow bucket.
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with outcome counters.
+
+    Cheap enough to update on every call; `snapshot()` returns
+    cumulative bucket counts in the Prometheus style.
+    """
+
+    def __init__(self, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._outcomes: dict[str, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float, outcome: str = "ok") -> None:
+        self._counts[bisect_left(self.buckets_ms, duration_ms)] += 1
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        buckets = {}
+        cumulative = 0
+
+        for bound, count in zip(self.buckets_ms, self._counts):
+            cumulative += count
+            buckets[f"le_{bound:g}"] = cumulative
+
+        buckets["le_inf"] = cumulative + self._counts[-1]
+
+        return {
+            "count": self.count,
+            "avgMs": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "maxMs": round(self.max_ms, 2),
+            "buckets": buckets,
+            "outcomes": dict(self._outcomes),
+        }
@@ -0,0 +1,222 @@
+import asyncio
+import base64
+from math import ceil
+from typing import Any, Literal, Optional
+
+from bson import json_util
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel, Field
+
+TotalMode = Literal["exact", "estimate", "none"]
+
+# "estimate" stops counting filtered results after this many.
+ESTIMATE_COUNT_LIMIT = 10_000
+
+# Holds a ranked listing's score while it is sorted.
+SCORE_FIELD = "_score"
+
+
+class CursorPageIn(BaseModel):
+    """
+    Opt-in keyset pagination parameters.
+
+    after:
+        Opaque `nextCursor` from the previous page. When set,
+        `page` is ignored and no documents are skipped.
+
+    totalMode:
+        exact    -> count_documents (default, same as before)
+        estimate -> collection metadata or a capped count
+        none     -> skip counting, `total` and `pages` are null
+    """
+
+    after: Optional[str] = Field(
+        default=None,
+        description="Cursor returned as nextCursor by the previous page",
+    )
+
+    totalMode: TotalMode = Field(
+        default="exact",
+        description="How the total is computed: exact | estimate | none",
+    )
+
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """
+    Encode the (sort value, _id) of the last document on a page.
+    """
+
+    raw = json_util.dumps([sort_value, doc_id])
+
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id = json_util.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode()
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+    return sort_value, doc_id
+
+
+def build_cursor_filter(
+    query: dict[str, Any],
+    cursor: str,
+    sort_field: str,
+    sort_order: int,
+) -> dict[str, Any]:
+    """
+    Restrict `query` to documents after the cursor position
+    for a (sort_field, _id) ordering.
+    """
+
+    sort_value, doc_id = decode_cursor(cursor)
+    op = "$lt" if sort_order < 0 else "$gt"
+
+    keyset = {
+        "$or": [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, "_id": {op: doc_id}},
+        ]
+    }
+
+    if not query:
+        return keyset
+
+    return {"$and": [query, keyset]}
+
+
+async def count_total(
+    collection: AsyncIOMotorCollection,
+    query: dict[str, Any],
+    total_mode: TotalMode,
+) -> int | None:
+    if total_mode == "none":
+        return None
+
+    if total_mode == "estimate":
+        if not query:
+            return await collection.estimated_document_count()
+
+        return await collection.count_documents(
+            query,
+            limit=ESTIMATE_COUNT_LIMIT,
+        )
+
+    return await collection.count_documents(query)
+
+
+async def paginate(
+    collection: AsyncIOMotorCollection,
+    query: dict[str, Any],
+    *,
+    page: int = 1,
+    page_size: int = 10,
+    sort_field: str = "createdAt",
+    sort_order: int = -1,
+    after: str | None = None,
+    total_mode: TotalMode = "exact",
+    projection: dict[str, Any] | None = None,
+    score: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Fetch one page of `collection` and its total.
+
+    Offset mode (default) skips `(page - 1) * page_size`.
+    Cursor mode (`after` set) continues from the previous
+    page's `nextCursor` without skipping.
+
+    Results are always ordered by (sort_field, _id) so cursors
+    are stable. Passing a `score` aggregation expression (e.g.
+    search relevance) ranks results by it first, highest first;
+    ranked listings have no cursors.
+
+    Returns:
+        {
+            "items": [...raw documents],
+            "total": int | None,
+            "page": int,
+            "pageSize": int,
+            "pages": int | None,
+            "nextCursor": str | None,
+        }
+    """
+
+    page = max(page, 1)
+    page_size = max(page_size, 1)
+
+    cursor_enabled = score is None
+
+    if after and not cursor_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for this query.",
+        )
+
+    find_query = (
+        build_cursor_filter(query, after, sort_field, sort_order)
+        if after
+        else query
+    )
+
+    if score is None:
+        cursor = (
+            collection
+            .find(find_query, projection)
+            .sort([(sort_field, sort_order), ("_id", sort_order)])
+            .limit(page_size + 1)
+        )
+
+        if not after:
+            cursor = cursor.skip((page - 1) * page_size)
+
+    else:
+        pipeline = [
+            {"$match": query},
+            {"$addFields": {SCORE_FIELD: score}},
+            {"$sort": {SCORE_FIELD: -1, sort_field: sort_order, "_id": sort_order}},
+            {"$skip": (page - 1) * page_size},
+            {"$limit": page_size + 1},
+            {"$unset": SCORE_FIELD},
+        ]
+
+        if projection:
+            pipeline.append({"$project": projection})
+
+        cursor = collection.aggregate(pipeline)
+
+    docs, total = await asyncio.gather(
+        cursor.to_list(length=page_size + 1),
+        count_total(collection, query, total_mode),
+    )
+
+    next_cursor = None
+
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+
+        if cursor_enabled:
+            last = docs[-1]
+            next_cursor = encode_cursor(last.get(sort_field), last["_id"])
+
+    pages = None
+
+    if total is not None:
+        pages = ceil(total / page_size) if total > 0 else 1
+
+    return {
+        "items": docs,
+        "total": total,
+        "page": page,
+        "pageSize": page_size,
+        "pages": pages,
+        "nextCursor": next_cursor,
+    }
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from typing import Any
 
 from app.modules.products.schemas.product import ProductIn
@@ -7,6 +9,22 @@ def _get_price(product: ProductIn) -> dict[str, Any]:
     return product.get("price") or {}
 
 
+def pricing_version(product: ProductIn) -> str:
+    """
+    Fingerprint of the product fields pricing reads.
+
+    Changes only when `price` changes, unlike `updatedAt`,
+    which every product edit bumps.
+    """
+    price = json.dumps(
+        _get_price(product),
+        sort_keys=True,
+        default=str,
+    )
+
+    return hashlib.sha256(price.encode("utf-8")).hexdigest()
+
+
 def get_product_mrp(product: ProductIn) -> float:
     """
     Return UNIT MRP.
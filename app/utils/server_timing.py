@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from fastapi import Response
+
+
+class ServerTiming:
+    """
+    Collect per-stage durations for a single request and
+    expose them through the `Server-Timing` response header.
+
+    Example header:
+        Server-Timing: products;dur=1.84, pricing;dur=0.21
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, name: str):
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = (perf_counter() - start) * 1000
+
+            self._metrics[name] = (
+                self._metrics.get(name, 0.0)
+                + elapsed
+            )
+
+    @property
+    def metrics(self) -> dict[str, float]:
+        return dict(self._metrics)
+
+    def header_value(self) -> str:
+        return ", ".join(
+            f"{name};dur={duration:.2f}"
+            for name, duration in self._metrics.items()
+        )
+
+    def apply(self, response: Response | None) -> None:
+        """
+        Append collected metrics to the response header.
+        """
+
+        if response is None or not self._metrics:
+            return
+
+        existing = response.headers.get("Server-Timing")
+        value = self.header_value()
+
+        response.headers["Server-Timing"] = (
+            f"{existing}, {value}"
+            if existing
+            else value
+        )
@@ -0,0 +1,19 @@
+import json
+from typing import Any
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx from buffering the stream.
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Format one server-sent event.
+
+    `data` is JSON-encoded onto a single line.
+    """
+
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
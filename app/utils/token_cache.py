@@ -0,0 +1,87 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class TokenClaimsCache:
+    """
+    Bounded cache of verified JWT claims.
+
+    Keyed by the SHA-256 digest of the token, so raw tokens are never
+    kept in memory. An entry lives until the token's own `exp`, which
+    means a cache hit can never accept a token that full verification
+    would reject as expired. Tokens that fail verification are not
+    cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, claims = entry
+
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+
+        if not isinstance(exp, (int, float)):
+            return
+
+        key = self._key(token)
+        self._entries[key] = (float(exp), dict(claims))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def decode(self, token: str, verify: Callable[[str], Any]) -> Any:
+        """
+        Return cached claims, or verify the token with `verify` and
+        cache the result. Exceptions from `verify` propagate.
+        """
+
+        claims = self.get(token)
+
+        if claims is not None:
+            self.hits += 1
+            return claims
+
+        self.misses += 1
+        claims = verify(token)
+
+        if claims:
+            self.put(token, claims)
+
+        return claims
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(self._key(token), None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,15 @@
+"""
+MongoDB-backed benchmarks.
+
+Benchmarks run the application code unchanged against a scratch
+database, so they never touch application data: importing this
+package points MONGO_DB_NAME at BENCHMARK_DB_NAME (default
+`benchmark`) before any application module builds its collections.
+Each benchmark drops what it creates::
+
+    python -m benchmarks.product_search
+"""
+
+import os
+
+os.environ["MONGO_DB_NAME"] = os.environ.get("BENCHMARK_DB_NAME", "benchmark")
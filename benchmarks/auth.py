@@ -0,0 +1,84 @@
+"""
+Auth overhead per customer request::
+
+    python -m benchmarks.auth [requests]
+
+Runs the `get_current_customer` dependency chain (bearer token ->
+claims -> revocation check -> customer document) in three states:
+
+- cold: the token is verified (HS256 signature and expiry) and the
+  customer is read from MongoDB on every request
+- cached claims: the verified claims are reused, the customer is
+  still read from MongoDB
+- cached claims + customer: both caches hit, no database command
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.db.query_metrics import track_queries
+from app.services.auth import customer_cache as customer_cache_module
+from app.services.auth import token_service
+
+
+async def run(requests: int = 2000) -> None:
+    customers = customer_cache_module.customers_collection
+    cache = customer_cache_module.customer_cache
+
+    # Loads the (empty) revocation filter, as at startup, so
+    # revocation checks stay in memory.
+    await token_service.token_revocation.rebuild()
+
+    result = await customers.insert_one({"name": "Benchmark", "email": "bench@example.com"})
+    customer_id = result.inserted_id
+
+    token = token_service.create_auth_tokens(customer_id=str(customer_id))["access_token"]
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def authenticate() -> dict:
+        return await token_service.get_current_customer(
+            await token_service.get_current_customer_id(credentials)
+        )
+
+    def forget_claims() -> None:
+        token_service.token_claims_cache.discard(token)
+
+    def forget_customer() -> None:
+        cache.invalidate(customer_id)
+
+    def keep() -> None:
+        pass
+
+    print(f"{requests} requests")
+
+    try:
+        for name, reset in (
+            ("cold", lambda: (forget_claims(), forget_customer())),
+            ("cached claims", forget_customer),
+            ("cached claims + customer", keep),
+        ):
+            # Warm both caches, then drop what this state must miss.
+            await authenticate()
+            elapsed = 0.0
+
+            with track_queries() as queries:
+                for _ in range(requests):
+                    reset()
+                    start = perf_counter()
+                    await authenticate()
+                    elapsed += perf_counter() - start
+
+            print(
+                f"{name:<25} {elapsed / requests * 1_000_000:9.1f} µs/request"
+                f"  {queries.count / requests:.1f} commands"
+            )
+    finally:
+        cache.invalidate(customer_id)
+        await customers.drop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:2])))
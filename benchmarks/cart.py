@@ -0,0 +1,103 @@
+"""
+Cart writes and reads through the cart routes::
+
+    python -m benchmarks.cart [lines] [rounds]
+
+Products come from a warm product cache, as on a hot cart. Reports
+the database commands per mutation, including any write-back its
+response triggers, and the time to build the response from stored
+snapshots against a full reprice.
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+
+from bson import ObjectId
+
+from app.db.mongo import db
+from app.db.query_metrics import track_queries
+from app.modules.cart.public import cart_public_route as carts
+from app.modules.cart.schemas.cart import AddCartItemIn, UpdateCartItemIn
+from app.modules.products.service.product_cache import product_cache
+
+
+async def _drain() -> None:
+    while carts._snapshot_tasks:
+        await asyncio.gather(*carts._snapshot_tasks)
+
+
+async def run(lines: int = 50, rounds: int = 200) -> None:
+    products = db["products"]
+    product_ids = [str(ObjectId()) for _ in range(lines)]
+
+    await products.insert_many(
+        [
+            {
+                "_id": ObjectId(product_id),
+                "name": f"Product {index}",
+                "status": "published",
+                "price": {
+                    "basePrice": 120,
+                    "sellingPrice": 99.5,
+                    "tax": {"included": index % 2 == 0, "rate": 18, "className": "GST"},
+                },
+            }
+            for index, product_id in enumerate(product_ids)
+        ]
+    )
+
+    try:
+        for product_id in product_ids:
+            await carts.add_cart_item(
+                AddCartItemIn(guestCartId="benchmark", productId=product_id),
+                None,
+            )
+
+        await _drain()
+
+        with track_queries() as queries:
+            start = perf_counter()
+            for index in range(rounds):
+                await carts.update_cart_item(
+                    UpdateCartItemIn(
+                        guestCartId="benchmark",
+                        productId=product_ids[index % lines],
+                        quantity=index % 3 + 1,
+                    ),
+                    None,
+                )
+            elapsed = perf_counter() - start
+            await _drain()
+
+        cart = await carts.find_cart(guest_cart_id="benchmark")
+
+        # No _id, so the reprice is not written back.
+        unpriced = {
+            **cart,
+            "_id": None,
+            "summary": None,
+            "items": [
+                {key: value for key, value in item.items() if key != "priced"}
+                for item in cart["items"]
+            ],
+        }
+
+        print(f"{lines} lines, {rounds} rounds")
+        print(f"{'update-item':<16} {elapsed / rounds * 1000:8.2f} ms  {queries.count / rounds:.1f} commands")
+
+        for name, document in (("read, stored", cart), ("read, reprice", unpriced)):
+            start = perf_counter()
+            for _ in range(rounds):
+                await carts.build_cart_response(document)
+            elapsed = perf_counter() - start
+            print(f"{name:<16} {elapsed / rounds * 1000:8.2f} ms")
+    finally:
+        await _drain()
+        product_cache.clear()
+        await carts.cart_collection.drop()
+        await products.drop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:3])))
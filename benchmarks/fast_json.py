@@ -0,0 +1,102 @@
+"""
+CPU time per product list response::
+
+    python -m benchmarks.fast_json [rounds]
+
+Encodes a synthetic 50-product page through FastAPI's default
+`response_model` path, `model_json_response` and `FastJSONResponse`.
+No database is needed.
+"""
+
+import json
+import sys
+from datetime import datetime
+from time import process_time
+from typing import Any
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.modules.products.schemas.product import PaginatedProductsOut
+from app.utils.fast_json import FastJSONResponse, model_json_response, orjson
+from core.sanitize import stringify_object_ids
+
+
+def _sample_page(size: int = 50) -> dict[str, Any]:
+    now = datetime.now()
+
+    return {
+        "total": 500,
+        "page": 1,
+        "pageSize": size,
+        "pages": 10,
+        "nextCursor": None,
+        "items": [
+            {
+                "_id": ObjectId(),
+                "name": f"Product {index}",
+                "code": f"P{index:05d}",
+                "description": "Hand-finished frame " * 8,
+                "status": "published",
+                "categories": ["frames", "wall-art"],
+                "tags": ["oak", "matte", "large"],
+                "media": [
+                    {
+                        "id": str(ObjectId()),
+                        "url": f"https://cdn.example.com/p/{index}/{media}.jpg",
+                        "altText": f"Product {index} view {media}",
+                        "fileName": f"{media}.jpg",
+                        "isPrimary": media == 0,
+                        "displayOrder": media,
+                    }
+                    for media in range(4)
+                ],
+                "price": {
+                    "basePrice": 1999.0,
+                    "sellingPrice": 1799.0,
+                    "discount": {"isActive": True, "type": "percentage", "value": 10},
+                    "tax": {"included": True, "className": "GST", "rate": 18},
+                    "deal": {"label": None, "valid_till": None},
+                },
+                "inventory": {"sku": f"SKU{index}", "quantityInShelf": 4, "quantityInWarehouse": 20},
+                "createdAt": now,
+                "updatedAt": now,
+            }
+            for index in range(size)
+        ],
+    }
+
+
+def run(rounds: int = 200) -> None:
+    page = _sample_page()
+    adapter = TypeAdapter(PaginatedProductsOut)
+
+    def default_path() -> bytes:
+        # The list endpoint before: stringify, validate, jsonable_encoder, json.
+        content = {**page, "items": [stringify_object_ids(doc) for doc in page["items"]]}
+        validated = adapter.validate_python(content)
+        return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+    def model_path() -> bytes:
+        return model_json_response(PaginatedProductsOut, page).body
+
+    def raw_path() -> bytes:
+        return FastJSONResponse(page).body
+
+    print(f"encoder: {'orjson' if orjson else 'json'}, 50 products, {rounds} rounds")
+
+    for name, func in (
+        ("response_model + json", default_path),
+        ("model_json_response", model_path),
+        ("FastJSONResponse (raw)", raw_path),
+    ):
+        start = process_time()
+        for _ in range(rounds):
+            size = len(func())
+        per_response = (process_time() - start) / rounds * 1000
+        print(f"{name:<24} {per_response:7.3f} ms CPU/response  {size} bytes")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:2]))
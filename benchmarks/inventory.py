@@ -0,0 +1,83 @@
+"""
+Concurrent checkouts racing for limited stock::
+
+    python -m benchmarks.inventory [buyers] [stock] [products]
+
+Every buyer reserves one unit of every product at once. Reports
+latency, throughput and whether any stock was oversold.
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+
+from bson import ObjectId
+
+from app.modules.website.order.services import inventory_service as inventory
+from app.utils.latency_histogram import LatencyHistogram
+
+
+async def run(buyers: int = 500, stock: int = 200, products: int = 3) -> None:
+    product_ids = [ObjectId() for _ in range(products)]
+
+    await inventory.products_collection.insert_many(
+        [
+            {
+                "_id": product_id,
+                "inventory": {
+                    "quantityInShelf": stock // 2,
+                    "quantityInWarehouse": stock - stock // 2,
+                    "quantity": stock,
+                },
+            }
+            for product_id in product_ids
+        ]
+    )
+
+    service = inventory.InventoryService(sweep_interval_seconds=60)
+    histogram = LatencyHistogram()
+
+    async def buy(index: int) -> None:
+        start = perf_counter()
+        outcome = "ok"
+
+        try:
+            await service.reserve(
+                items=[
+                    {"productId": product_id, "quantity": 1}
+                    for product_id in product_ids
+                ],
+                order_code=f"BENCH-{index}",
+            )
+        except inventory.InventoryServiceError:
+            outcome = "short"
+        finally:
+            histogram.observe((perf_counter() - start) * 1000, outcome)
+
+    try:
+        start = perf_counter()
+        await asyncio.gather(*(buy(index) for index in range(buyers)))
+        elapsed = perf_counter() - start
+
+        remaining = [
+            product["inventory"]["quantity"]
+            async for product in inventory.products_collection.find(
+                {"_id": {"$in": product_ids}}
+            )
+        ]
+
+        snapshot = histogram.snapshot()
+        reserved = snapshot["outcomes"].get("ok", 0)
+        oversold = reserved > stock or any(quantity < 0 for quantity in remaining)
+
+        print(f"{buyers} buyers, {products} products x {stock} units")
+        print(f"reserved {reserved}, short {snapshot['outcomes'].get('short', 0)}, remaining {remaining}")
+        print(f"{buyers / elapsed:8.1f} checkouts/s  avg {snapshot['avgMs']} ms  max {snapshot['maxMs']} ms")
+        print("❌ oversold" if oversold else "✅ no oversell")
+    finally:
+        await inventory.products_collection.drop()
+        await inventory.stock_reservations_collection.drop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,102 @@
+"""
+Event-loop lag while rendering invoice PDFs::
+
+    python -m benchmarks.invoice_pdf [renders]
+
+Renders the same invoices inline on the event loop and through
+`InvoicePDFRenderer`'s process pool, while a 10 ms ticker records
+how late each tick fires. No database is needed.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timezone
+from time import perf_counter
+
+from app.modules.invoice.pdf_renderer import InvoicePDFRenderer
+from app.modules.invoice.pdf_service import PDFService
+from app.modules.orders.schemas.invoice import InvoiceItem, InvoiceOut, PartyDetails
+from config import settings
+
+
+def _sample_invoice(index: int, lines: int = 40) -> InvoiceOut:
+    now = datetime.now(timezone.utc)
+
+    return InvoiceOut(
+        id=f"bench-{index}",
+        invoiceNumber=f"INV-BENCH-{index}",
+        billDate=now,
+        billFrom=PartyDetails(name="Artisan Studios", address="1 Main Street"),
+        billTo=PartyDetails(name=f"Customer {index}", address="2 High Street"),
+        items=[
+            InvoiceItem(
+                name=f"Product {line}",
+                quantity=2,
+                unitPrice=499.0,
+                mrp=599.0,
+                lineTotal=998.0,
+            )
+            for line in range(lines)
+        ],
+        subtotal=998.0 * lines,
+        totalAmount=998.0 * lines,
+        updatedAt=now,
+    )
+
+
+async def _measure_lag(work, interval: float = 0.01) -> tuple[float, list[float]]:
+    """Run `work()` while a ticker records how late each tick fires."""
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = perf_counter()
+            await asyncio.sleep(interval)
+            lags.append((perf_counter() - start - interval) * 1000)
+
+    task = asyncio.create_task(ticker())
+    start = perf_counter()
+
+    try:
+        await work()
+    finally:
+        elapsed = perf_counter() - start
+        done.set()
+        await task
+
+    return elapsed, lags
+
+
+async def run(renders: int = 24) -> None:
+    workers = settings.PDF_RENDER_WORKERS
+    invoices = [_sample_invoice(index) for index in range(renders)]
+
+    async def inline() -> None:
+        for invoice in invoices:
+            PDFService.generate_invoice_pdf(invoice)
+            await asyncio.sleep(0)
+
+    renderer = InvoicePDFRenderer(max_workers=workers, cache_max_bytes=0)
+
+    async def pooled() -> None:
+        await asyncio.gather(*(renderer.render(invoice) for invoice in invoices))
+
+    # Start the workers outside the measurement.
+    await renderer.render(_sample_invoice(-1, lines=1))
+
+    print(f"{renders} invoices, {workers} workers, 10 ms ticker")
+
+    try:
+        for name, work in (("inline", inline), ("process pool", pooled)):
+            elapsed, lags = await _measure_lag(work)
+            lags.sort()
+            p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+            worst = lags[-1] if lags else 0.0
+            print(f"{name:<13} {elapsed * 1000:8.1f} ms total  lag p99 {p99:7.1f} ms  max {worst:7.1f} ms")
+    finally:
+        renderer.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,95 @@
+"""
+LineMerge against a read-modify-write merge::
+
+    python -m benchmarks.line_merge [size] [rounds]
+
+Half of the source lines overlap the target.
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import Any
+
+from app.db.line_merge import LineMerge
+from app.db.mongo import db, supports_transactions
+
+
+async def _read_modify_write(
+    merge: LineMerge,
+    source_filter: dict[str, Any],
+    target_filter: dict[str, Any],
+) -> None:
+    """The find / reconcile-in-Python / update / delete merge."""
+    source = await merge.collection.find_one(source_filter)
+    target = await merge.collection.find_one(target_filter)
+
+    lines = {line[merge.key_field]: line for line in target["items"]}
+
+    for line in source["items"]:
+        existing = lines.get(line[merge.key_field])
+        if existing is None:
+            lines[line[merge.key_field]] = line
+        else:
+            existing["quantity"] = merge._cap(existing["quantity"] + line["quantity"])
+
+    await merge.collection.update_one(
+        {"_id": target["_id"]},
+        {"$set": {"items": list(lines.values())}, "$inc": {"version": 1}},
+    )
+    await merge.collection.delete_one({"_id": source["_id"]})
+    await merge.collection.find_one({"_id": target["_id"]})
+
+
+async def run(collection, size: int = 500, rounds: int = 20) -> None:
+    merge = LineMerge(
+        collection,
+        quantity_field="quantity",
+        max_quantity=999,
+        keep_fields=("customizedDetails",),
+        version_field="version",
+    )
+
+    def lines(offset: int) -> list[dict[str, Any]]:
+        return [
+            {
+                "productId": f"p{index}",
+                "productType": "physical",
+                "quantity": 1,
+                "customizedDetails": None,
+            }
+            for index in range(offset, offset + size)
+        ]
+
+    source_filter = {"guestCartId": "guest", "customerId": None}
+    target_filter = {"customerId": "customer", "guestCartId": None}
+
+    async def seed() -> None:
+        await collection.delete_many({})
+        await collection.insert_many(
+            [
+                {**source_filter, "items": lines(size // 2)},
+                {**target_filter, "items": lines(0), "version": 0},
+            ]
+        )
+
+    print(f"{size} lines per cart, {rounds} rounds, transactions: {await supports_transactions()}")
+
+    try:
+        for name, merge_once in (
+            ("read-modify-write", lambda: _read_modify_write(merge, source_filter, target_filter)),
+            ("LineMerge", lambda: merge.merge(source_filter=source_filter, target_filter=target_filter)),
+        ):
+            elapsed = 0.0
+            for _ in range(rounds):
+                await seed()
+                start = perf_counter()
+                await merge_once()
+                elapsed += perf_counter() - start
+            print(f"{name:<18} {elapsed / rounds * 1000:8.2f} ms/merge")
+    finally:
+        await collection.drop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(db["line_merge_benchmark"], *(int(arg) for arg in sys.argv[1:3])))
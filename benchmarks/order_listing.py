@@ -0,0 +1,95 @@
+"""
+Database round trips per admin order page::
+
+    python -m benchmarks.order_listing [rounds]
+
+Compares the per-row customer and invoice lookups the listings used
+to make with `build_order_summaries`, at several page sizes.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+
+from bson import ObjectId
+
+from app.db.query_metrics import track_queries
+from app.modules.orders import orders_route
+
+PAGE_SIZES = (10, 50, 100)
+
+
+async def _per_row_summaries(orders: list[dict]) -> None:
+    """The loader before batching: two lookups per order."""
+    for order in orders:
+        await orders_route.customers_collection.find_one(
+            {"_id": ObjectId(order["customerId"])}
+        )
+        await orders_route.invoices_collection.find(
+            {"orderIds": order["_id"]}
+        ).sort("createdAt", -1).to_list(length=1)
+
+
+async def _seed(orders: int) -> None:
+    now = datetime.now(timezone.utc)
+    customer_ids = [ObjectId() for _ in range(max(orders // 4, 1))]
+
+    await orders_route.customers_collection.insert_many(
+        [{"_id": customer_id, "name": f"Customer {index}"} for index, customer_id in enumerate(customer_ids)]
+    )
+
+    documents = [
+        {
+            "_id": ObjectId(),
+            "orderCode": f"ORD-{index}",
+            "customerId": str(customer_ids[index % len(customer_ids)]),
+            "items": [],
+            "totalAmount": 100.0,
+            "createdAt": now - timedelta(minutes=index),
+        }
+        for index in range(orders)
+    ]
+    await orders_route.orders_collection.insert_many(documents)
+    await orders_route.invoices_collection.insert_many(
+        [
+            {"orderIds": [order["_id"]], "paymentStatus": "paid", "createdAt": now}
+            for order in documents
+        ]
+    )
+
+
+async def run(rounds: int = 20) -> None:
+    await _seed(max(PAGE_SIZES))
+
+    try:
+        for page_size in PAGE_SIZES:
+            orders = await orders_route.orders_collection.find().sort(
+                "createdAt", -1
+            ).to_list(length=page_size)
+
+            for name, load in (
+                ("per row", _per_row_summaries),
+                ("batched", orders_route.build_order_summaries),
+            ):
+                with track_queries() as queries:
+                    start = perf_counter()
+                    for _ in range(rounds):
+                        await load(orders)
+                    elapsed = perf_counter() - start
+
+                print(
+                    f"page {page_size:<4} {name:<8} {queries.count // rounds:4d} commands"
+                    f"  {elapsed / rounds * 1000:8.2f} ms"
+                )
+    finally:
+        for collection in (
+            orders_route.orders_collection,
+            orders_route.customers_collection,
+            orders_route.invoices_collection,
+        ):
+            await collection.drop()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:2])))
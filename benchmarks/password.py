@@ -0,0 +1,42 @@
+"""
+Login throughput by password hashing workers::
+
+    python -m benchmarks.password [logins]
+
+Verifies the same bcrypt hash concurrently through `PasswordService`
+with 1, 2, 4 and 8 workers. No database is needed.
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+
+from app.services.auth.password_service import PasswordService
+from app.utils.auth_utils import pwd_context
+from config import settings
+
+
+async def run(logins: int = 32) -> None:
+    hashed = pwd_context.hash("benchmark-password")
+    print(f"bcrypt rounds: {settings.BCRYPT_ROUNDS}, logins per run: {logins}")
+
+    for workers in (1, 2, 4, 8):
+        service = PasswordService(pwd_context, workers)
+        start = perf_counter()
+
+        await asyncio.gather(
+            *(service.verify("benchmark-password", hashed) for _ in range(logins))
+        )
+
+        elapsed = perf_counter() - start
+        p_max = service.stats()["verify"]["maxMs"]
+        service.shutdown()
+
+        print(
+            f"workers={workers:<2} {logins / elapsed:8.1f} logins/s  "
+            f"max latency {p_max:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(run(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,127 @@
+"""
+Product search latency at 10k, 100k and 1M products.
+
+Compares the previous unanchored word-boundary regex over name,
+code, tags and categories with the anchored prefix filter on the
+indexed `searchKeywords` array, unranked and ranked by relevance::
+
+    python -m benchmarks.product_search [size ...]
+"""
+
+import asyncio
+import random
+import re
+import sys
+from time import perf_counter
+from typing import Any
+
+from app.db.indexes import declared_indexes
+from app.db.mongo import db
+from app.modules.products.service.product_search import (
+    SEARCH_FIELDS,
+    build_search_filter,
+    build_search_score,
+    search_keywords,
+)
+from app.utils.pagination import paginate
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+ROUNDS = 20
+
+INSERT_BATCH_SIZE = 10_000
+
+WORDS = (
+    "cotton", "linen", "shirt", "frame", "oak", "walnut", "canvas", "print",
+    "poster", "mug", "ceramic", "red", "blue", "green", "black", "white",
+    "vintage", "modern", "classic", "large", "small", "gift", "wall", "desk",
+)
+
+SEARCHES = (
+    ("full word", "walnut"),
+    ("partial word", "shir"),
+    ("two words", "red frame"),
+    ("product code", "PRD-20250812-4"),
+    ("no hits", "zzzz"),
+)
+
+
+def _product(index: int, rng: random.Random) -> dict[str, Any]:
+    product = {
+        "name": " ".join(rng.sample(WORDS, 3)).title(),
+        "code": f"PRD-2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}-{rng.randint(10000, 99999)}",
+        "tags": rng.sample(WORDS, 2),
+        "categories": [rng.choice(("frames", "prints", "apparel", "home"))],
+        "status": "published",
+        "createdAt": index,
+    }
+    product["searchKeywords"] = search_keywords(product)
+    return product
+
+
+def _legacy_filter(search: str) -> dict[str, Any]:
+    # The filter this change replaces.
+    prefix = {"$regex": f"\\b{re.escape(search)}", "$options": "i"}
+    return {"$or": [{field: prefix} for field in SEARCH_FIELDS]}
+
+
+async def _seed(collection, size: int) -> None:
+    rng = random.Random(size)
+    await collection.drop()
+
+    for spec in declared_indexes()["products"]:
+        await collection.create_index(spec.keys, **spec.create_kwargs())
+
+    for start in range(0, size, INSERT_BATCH_SIZE):
+        await collection.insert_many(
+            [
+                _product(index, rng)
+                for index in range(start, min(start + INSERT_BATCH_SIZE, size))
+            ],
+            ordered=False,
+        )
+
+
+async def _measure(
+    collection,
+    query: dict[str, Any],
+    score: dict[str, Any] | None = None,
+) -> tuple[float, int]:
+    start = perf_counter()
+
+    for _ in range(ROUNDS):
+        await paginate(collection, query, page_size=20, total_mode="estimate", score=score)
+
+    elapsed = (perf_counter() - start) / ROUNDS
+    explanation = await collection.find(query).explain()
+    examined = explanation.get("executionStats", {}).get("totalDocsExamined", -1)
+
+    return elapsed, examined
+
+
+async def run(collection, sizes=SIZES) -> None:
+    try:
+        for size in sizes:
+            await _seed(collection, size)
+            print(f"📦 {size:,} products")
+
+            for label, search in SEARCHES:
+                query = {"status": "published"}
+
+                for name, search_filter, score in (
+                    ("regex", _legacy_filter(search), None),
+                    ("keywords", build_search_filter(search), None),
+                    ("ranked", build_search_filter(search), build_search_score(search)),
+                ):
+                    elapsed, examined = await _measure(collection, {**query, **search_filter}, score)
+                    print(
+                        f"  {label:<13} {name:<9} {elapsed * 1000:9.2f} ms/page"
+                        f"  {examined:>9,} docs examined"
+                    )
+    finally:
+        await collection.drop()
+
+
+if __name__ == "__main__":
+    sizes = tuple(int(size) for size in sys.argv[1:]) or SIZES
+    asyncio.run(run(db["product_search_benchmark"], sizes))
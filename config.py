@@ -15,8 +15,25 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 # minutes
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7 # days
     ALGORITHM: str = "HS256"
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    CUSTOMER_CACHE_MAX_SIZE: int = 10000
+    CUSTOMER_CACHE_TTL_SECONDS: int = 30 # seconds
+    REVOKED_TOKENS_FILTER_CAPACITY: int = 100000
+    REVOKED_TOKENS_FILTER_ERROR_RATE: float = 0.001
+    REVOKED_TOKENS_SYNC_SECONDS: int = 5 # seconds
+    BCRYPT_ROUNDS: int = 12 # existing hashes are upgraded on login
+    PASSWORD_HASH_WORKERS: int = 4
     PROJECT_ROOT: str = ""
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = "" # empty uses the OpenAI API
+    OPENAI_MEAL_MODEL: str = "gpt-4.1-mini"
+    OPENAI_TIMEOUT_SECONDS: float = 30 # seconds
+    OPENAI_MAX_RETRIES: int = 1
+    OPENAI_MAX_CONCURRENCY: int = 4
+    MEAL_PLAN_CACHE_MAX_SIZE: int = 256
+    MEAL_PLAN_CACHE_TTL_SECONDS: int = 6 * 3600 # seconds
+    MEAL_PLANNER_STORAGE: str = "mongo" # "mongo" or "json"
+    MEAL_PLANNER_CACHE_TTL_SECONDS: int = 30 # seconds
 
     AZURE_STORAGE_ACCOUNT_NAME: str
     AZURE_STORAGE_ACCOUNT_KEY: str
@@ -24,6 +41,18 @@ class Settings(BaseSettings):
 
     POSTGRES_CONNECTION_STRING: str = ""
     MONGO_URL: str = ""
+    MONGO_DB_NAME: str = "artisanstudios_db"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 60000 # milliseconds
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000 # milliseconds, pool checkout
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000 # milliseconds
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000 # milliseconds
+    MONGO_COMPRESSORS: str = "zlib" # in order of preference, empty disables; zstd/snappy need extra packages
+    MONGO_CATALOG_READ_PREFERENCE: str = "primary" # e.g. "secondaryPreferred" on a replica set
+    MONGO_SLOW_COMMAND_MS: int = 100 # milliseconds
+    QUERY_METRICS_HEADERS: bool = False # X-DB-* response headers, debug only
+    QUERY_METRICS_BYTES: bool = False # re-encodes every reply to count bytes, debug only
 
     MAIL_MODE: str = ""
     MAIL_HOST: str = ""
@@ -32,9 +61,30 @@ class Settings(BaseSettings):
     MAIL_PASS: str = ""
     MAIL_USE_TLS: bool = True
     MAIL_FROM: str = ""
+    MAIL_OUTBOX_CONNECTIONS: int = 2
+    MAIL_OUTBOX_BATCH_SIZE: int = 20
+    MAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    MAIL_OUTBOX_SWEEP_SECONDS: int = 10 # seconds
 
     RAZORPAY_KEY_ID: str = ""
     RAZORPAY_KEY_SECRET: str = ""
+    RAZORPAY_BASE_URL: str = "" # empty uses the SDK default
+    RAZORPAY_MAX_WORKERS: int = 8
+    RAZORPAY_TIMEOUT_SECONDS: float = 10 # seconds
+
+    PRODUCT_CACHE_MAX_SIZE: int = 5000
+    PRODUCT_CACHE_TTL_SECONDS: int = 300 # seconds
+    PRODUCT_CACHE_POLL_SECONDS: int = 5 # seconds, standalone mongod only
+
+    STOCK_RESERVATION_TTL_MINUTES: int = 30 # minutes, unpaid online orders
+    STOCK_RESERVATION_SWEEP_SECONDS: int = 60 # seconds
+    QUOTE_TTL_SECONDS: int = 900 # seconds, checkout price quotes
+
+    DASHBOARD_STATS_MAX_AGE_SECONDS: int = 300 # seconds
+
+    PDF_RENDER_WORKERS: int = 2
+    PDF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # bytes
+    PDF_CACHE_DIR: str = "" # empty disables the disk tier
 
     class Config:
         env_file = ".env"
@@ -1,3 +1,6 @@
+from app.db.indexes import ensure_indexes
+from app.modules.products.service.product_search import backfill_search_keywords
+from core.seed.seed_meal_plans import seed_meal_plans
 from core.seed.seed_permissions import seed_role_permissions
 from core.seed.seed_roles import seed_default_roles
 from core.seed.seed_users import seed_admin_user
@@ -10,6 +13,9 @@ async def init_database():
         await seed_role_permissions()
         await seed_default_roles()
         await seed_admin_user()
+        await ensure_indexes()
+        await backfill_search_keywords()
+        await seed_meal_plans()
         print("🎉 Database initialization completed successfully.")
 
     except Exception as e:
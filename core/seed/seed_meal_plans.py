@@ -0,0 +1,60 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from app.services.meal_plan_storage import (
+    DEFAULT_PLAN_ID,
+    MongoMealPlanStore,
+    meal_plan_meals_collection,
+)
+from app.services.meal_planner_service import get_meal_planner_file
+from config import Settings
+
+
+async def seed_meal_plans(
+    path: Path | None = None,
+    plan_id: str = DEFAULT_PLAN_ID,
+    force: bool = False,
+):
+    """
+    Import the JSON meal plan file into MongoDB.
+
+    Runs at boot only while the plan is still empty, so later edits
+    are never overwritten. With force=True (the CLI), meals are
+    upserted by id and the import can be re-run safely.
+    """
+
+    settings = Settings()
+
+    if settings.MEAL_PLANNER_STORAGE == "json" and not force:
+        return
+
+    path = path or get_meal_planner_file(settings)
+
+    if not path.exists():
+        return
+
+    if not force and await meal_plan_meals_collection.find_one({"planId": plan_id}):
+        return
+
+    with open(path, "r") as f:
+        weekly_meals = json.load(f)
+
+    imported = await MongoMealPlanStore().import_weekly_meals(
+        plan_id,
+        weekly_meals,
+    )
+
+    print(f"✅ Imported {imported} meals from {path} into plan '{plan_id}'.")
+
+
+# python -m core.seed.seed_meal_plans [path] [plan_id]
+if __name__ == "__main__":
+    asyncio.run(
+        seed_meal_plans(
+            path=Path(sys.argv[1]) if len(sys.argv) > 1 else None,
+            plan_id=sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PLAN_ID,
+            force=True,
+        )
+    )
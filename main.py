@@ -1,11 +1,20 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from app.db.mongo import close_database, connect_database
+from app.db.query_metrics import QueryMetricsMiddleware
 from core.bootstrap import init_database
 from core.routes import setup_router
 from core.cores import setup_cors
 from dotenv import load_dotenv
 from config import Settings
+from app.modules.invoice.pdf_renderer import invoice_pdf_renderer
+from app.modules.products.service.product_cache import product_cache
+from app.modules.website.order.services.inventory_service import inventory_service
+from app.modules.website.order.services.razorpay_gateway import razorpay_gateway
+from app.services.auth.password_service import password_service
+from app.services.auth.token_revocation import token_revocation
+from app.services.mail_outbox import mail_outbox
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,11 +25,23 @@ settings = Settings()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await connect_database()
     await init_database()
     # await create_default_admin()
+    product_cache.start()
+    mail_outbox.start()
+    inventory_service.start()
+    token_revocation.start()
     yield
+    await product_cache.stop()
+    await mail_outbox.stop()
+    await inventory_service.stop()
+    await token_revocation.stop()
+    invoice_pdf_renderer.shutdown()
+    razorpay_gateway.shutdown()
+    password_service.shutdown()
+    close_database()
     print("🛑 Application shutdown!")
-    # await close_database()
 
 
 app = FastAPI(
@@ -36,6 +57,9 @@ app = FastAPI(
 # Register routes
 setup_router(app)
 
+# Attribute Mongo commands to the request that issued them
+app.add_middleware(QueryMetricsMiddleware, headers=settings.QUERY_METRICS_HEADERS)
+
 # Register CORS middleware
 setup_cors(app)
 
@@ -0,0 +1,44 @@
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time; give the required ones test values.
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("AZURE_STORAGE_ACCOUNT_NAME", "test")
+os.environ.setdefault("AZURE_STORAGE_ACCOUNT_KEY", "test")
+os.environ.setdefault("AZURE_STORAGE_CONTAINER", "test")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DB_NAME", "artisanstudios_test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail when a block issues more MongoDB commands than allowed::
+
+        with query_budget(4):
+            await list_orders(pageSize=20)
+
+    Only commands of clients that have `command_metrics` as an
+    event listener (the application client does) are counted.
+    """
+    # Imported here: settings must see the environment above first.
+    from app.db.query_metrics import track_queries
+
+    @contextmanager
+    def budget(max_commands: int):
+        with track_queries() as queries:
+            yield queries
+
+        assert queries.count <= max_commands, (
+            f"{queries.count} MongoDB commands, budget is {max_commands}: "
+            f"{queries.commands}"
+        )
+
+    return budget
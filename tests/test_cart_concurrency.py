@@ -0,0 +1,108 @@
+"""
+Parallel writers against a real MongoDB.
+
+Set MONGO_TEST_URL (e.g. mongodb://localhost:27017) to run; the
+pipeline updates used by the cart are not supported by mongomock.
+"""
+
+import asyncio
+import os
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.indexes import declared_indexes
+from app.modules.cart.public import cart_public_route
+from app.modules.cart.schemas.cart import AddCartItemIn
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+pytestmark = pytest.mark.skipif(
+    not MONGO_TEST_URL,
+    reason="MONGO_TEST_URL is not set",
+)
+
+WRITERS = 25
+
+PRODUCT_ID = str(ObjectId())
+
+PRODUCT = {
+    "_id": ObjectId(PRODUCT_ID),
+    "name": "Test product",
+    "status": "published",
+    "price": {
+        "basePrice": 100,
+        "sellingPrice": 90,
+        "tax": {"included": True, "rate": 18, "className": "GST"},
+    },
+}
+
+
+@pytest.fixture
+def patch_cart_route(monkeypatch):
+    async def get_product(product_id):
+        return PRODUCT
+
+    async def get_products(product_ids):
+        return {PRODUCT_ID: PRODUCT}
+
+    monkeypatch.setattr(cart_public_route, "get_product", get_product)
+    monkeypatch.setattr(cart_public_route, "get_products", get_products)
+
+    return monkeypatch
+
+
+async def _with_carts(monkeypatch, scenario):
+    client = AsyncIOMotorClient(MONGO_TEST_URL)
+    database = client[f"cart_concurrency_{ObjectId()}"]
+    carts = database["carts"]
+
+    monkeypatch.setattr(cart_public_route, "cart_collection", carts)
+
+    try:
+        for spec in declared_indexes()["carts"]:
+            await carts.create_index(spec.keys, **spec.create_kwargs())
+
+        await scenario(carts)
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+def add_item(**owner) -> AddCartItemIn:
+    return AddCartItemIn(productId=PRODUCT_ID, quantity=1, **owner)
+
+
+def test_parallel_first_adds_create_one_guest_cart(patch_cart_route):
+    async def scenario(carts):
+        await asyncio.gather(
+            *(
+                cart_public_route.add_cart_item(add_item(guestCartId="guest-1"), None)
+                for _ in range(WRITERS)
+            )
+        )
+
+        documents = await carts.find({"guestCartId": "guest-1"}).to_list(None)
+
+        assert len(documents) == 1
+        assert documents[0]["items"][0]["quantity"] == WRITERS
+        assert documents[0]["version"] == WRITERS
+
+    asyncio.run(_with_carts(patch_cart_route, scenario))
+
+
+def test_parallel_first_adds_create_one_customer_cart(patch_cart_route):
+    async def scenario(carts):
+        await asyncio.gather(
+            *(
+                cart_public_route.add_cart_item(add_item(customerId="customer-1"), None)
+                for _ in range(WRITERS)
+            )
+        )
+
+        documents = await carts.find({"customerId": "customer-1"}).to_list(None)
+
+        assert len(documents) == 1
+        assert documents[0]["guestCartId"] is None
+        assert documents[0]["items"][0]["quantity"] == WRITERS
@@ -0,0 +1,305 @@
+"""
+Cart line snapshots and the stored summary.
+
+The read-path tests run anywhere. The write-path tests need a real
+MongoDB (MONGO_TEST_URL), like tests/test_cart_concurrency.py.
+"""
+
+import asyncio
+import dataclasses
+import os
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.indexes import declared_indexes
+from app.db.query_metrics import command_metrics
+from app.modules.cart.public import cart_public_route
+from app.modules.cart.schemas.cart import (
+    AddCartItemIn,
+    MergeGuestCartIn,
+    RemoveCartItemIn,
+    UpdateCartItemIn,
+)
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+needs_mongo = pytest.mark.skipif(
+    not MONGO_TEST_URL,
+    reason="MONGO_TEST_URL is not set",
+)
+
+
+def make_product(selling_price: float, tax_included: bool = True) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": "Test product",
+        "status": "published",
+        "price": {
+            "basePrice": 100,
+            "sellingPrice": selling_price,
+            "tax": {"included": tax_included, "rate": 18, "className": "GST"},
+        },
+    }
+
+
+PRODUCTS = [make_product(90), make_product(45.5, tax_included=False)]
+CATALOG = {str(product["_id"]): product for product in PRODUCTS}
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    async def get_product(product_id):
+        return CATALOG[product_id]
+
+    async def get_products(product_ids):
+        return {
+            product_id: CATALOG[product_id]
+            for product_id in product_ids
+            if product_id in CATALOG
+        }
+
+    monkeypatch.setattr(cart_public_route, "get_product", get_product)
+    monkeypatch.setattr(cart_public_route, "get_products", get_products)
+
+    return monkeypatch
+
+
+def priced_cart(version: int = 3) -> dict:
+    items = []
+
+    for quantity, product in enumerate(PRODUCTS, start=1):
+        items.append(
+            {
+                "productId": str(product["_id"]),
+                "productType": "physical",
+                "quantity": quantity,
+                "priced": cart_public_route.price_cart_line(product, quantity),
+            }
+        )
+
+    summary = cart_public_route.summarize_lines(
+        [item["priced"]["totals"] for item in items]
+    )
+
+    return {
+        "_id": ObjectId(),
+        "guestCartId": "guest-1",
+        "customerId": None,
+        "version": version,
+        "items": items,
+        "summary": {**summary, "version": version},
+    }
+
+
+# ============================================================
+# Read path
+# ============================================================
+
+
+def test_fresh_cart_is_served_without_pricing_or_writes(catalog):
+    cart = priced_cart()
+    writes = []
+
+    def price_cart_line(product, quantity):
+        raise AssertionError("fresh line was repriced")
+
+    catalog.setattr(cart_public_route, "price_cart_line", price_cart_line)
+    catalog.setattr(
+        cart_public_route,
+        "save_snapshots_in_background",
+        lambda *args: writes.append(args),
+    )
+
+    response = asyncio.run(cart_public_route.build_cart_response(cart))
+
+    assert writes == []
+    assert response["version"] == 3
+    assert response["summary"] == {
+        key: value for key, value in cart["summary"].items() if key != "version"
+    }
+    assert [item["quantity"] for item in response["items"]] == [1, 2]
+
+
+def test_price_change_reprices_only_that_line(catalog):
+    writes = []
+
+    catalog.setattr(
+        cart_public_route,
+        "save_snapshots_in_background",
+        lambda cart, repriced, summary: writes.append((repriced, summary)),
+    )
+
+    cart = priced_cart()
+    changed = make_product(80)
+    changed["_id"] = PRODUCTS[0]["_id"]
+    catalog.setitem(CATALOG, str(changed["_id"]), changed)
+
+    response = asyncio.run(cart_public_route.build_cart_response(cart))
+
+    [(repriced, summary)] = writes
+
+    assert list(repriced) == [0]
+    assert response["items"][0]["price"]["sellingPrice"] == 80
+    assert summary["subtotal"] == 80 + 45.5 * 2
+    assert summary["version"] == 3
+
+
+def test_stored_summary_of_an_older_version_is_rebuilt(catalog):
+    writes = []
+
+    catalog.setattr(
+        cart_public_route,
+        "save_snapshots_in_background",
+        lambda cart, repriced, summary: writes.append((repriced, summary)),
+    )
+
+    cart = priced_cart()
+    cart["version"] = 4
+
+    asyncio.run(cart_public_route.build_cart_response(cart))
+
+    [(repriced, summary)] = writes
+
+    assert repriced == {}
+    assert summary["version"] == 4
+
+
+# ============================================================
+# Write path (MongoDB)
+# ============================================================
+
+
+async def _with_carts(monkeypatch, scenario):
+    # The listener lets `track_queries` count this client's commands.
+    client = AsyncIOMotorClient(MONGO_TEST_URL, event_listeners=[command_metrics])
+    database = client[f"cart_summary_{ObjectId()}"]
+    carts = database["carts"]
+
+    monkeypatch.setattr(cart_public_route, "cart_collection", carts)
+    monkeypatch.setattr(
+        cart_public_route,
+        "cart_merge",
+        dataclasses.replace(cart_public_route.cart_merge, collection=carts),
+    )
+
+    try:
+        for spec in declared_indexes()["carts"]:
+            await carts.create_index(spec.keys, **spec.create_kwargs())
+
+        await scenario(carts)
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+async def _drain() -> None:
+    while cart_public_route._snapshot_tasks:
+        await asyncio.gather(*cart_public_route._snapshot_tasks)
+
+
+def _assert_summary_matches_lines(cart: dict) -> None:
+    expected = cart_public_route.summarize_lines(
+        [item["priced"]["totals"] for item in cart["items"]]
+    )
+
+    assert cart["summary"] == {**expected, "version": cart["version"]}
+
+
+@needs_mongo
+def test_mutations_store_the_summary_in_the_same_update(catalog, query_budget):
+    first, second = (str(product["_id"]) for product in PRODUCTS)
+
+    async def mutate(handler, payload):
+        # One find_one_and_update; the response needs no write-back.
+        with query_budget(1):
+            await handler(payload, None)
+            await _drain()
+
+    async def scenario(carts):
+        route = cart_public_route
+
+        await mutate(route.add_cart_item, AddCartItemIn(guestCartId="guest-1", productId=first))
+        await mutate(route.add_cart_item, AddCartItemIn(guestCartId="guest-1", productId=second, quantity=3))
+        _assert_summary_matches_lines(await carts.find_one({"guestCartId": "guest-1"}))
+
+        await mutate(route.update_cart_item, UpdateCartItemIn(guestCartId="guest-1", productId=first, quantity=5))
+        _assert_summary_matches_lines(await carts.find_one({"guestCartId": "guest-1"}))
+
+        await mutate(route.remove_cart_item, RemoveCartItemIn(guestCartId="guest-1", productId=second))
+        cart = await carts.find_one({"guestCartId": "guest-1"})
+        _assert_summary_matches_lines(cart)
+        assert cart["summary"]["totalQuantity"] == 5
+
+    asyncio.run(_with_carts(catalog, scenario))
+
+
+@needs_mongo
+def test_incremented_line_is_repriced_once(catalog, query_budget):
+    product_id = str(PRODUCTS[0]["_id"])
+
+    async def scenario(carts):
+        payload = AddCartItemIn(guestCartId="guest-1", productId=product_id)
+
+        await cart_public_route.add_cart_item(payload, None)
+        response = await cart_public_route.add_cart_item(payload, None)
+        await _drain()
+
+        assert response["summary"]["totalQuantity"] == 2
+
+        cart = await carts.find_one({"guestCartId": "guest-1"})
+        _assert_summary_matches_lines(cart)
+
+        with query_budget(0):
+            await cart_public_route.build_cart_response(cart)
+            await _drain()
+
+    asyncio.run(_with_carts(catalog, scenario))
+
+
+@needs_mongo
+def test_merge_bumps_legacy_version_and_drops_stale_summary(catalog):
+    first, second = (str(product["_id"]) for product in PRODUCTS)
+
+    async def scenario(carts):
+        legacy = priced_cart()
+        legacy.update(customerId="customer-1", guestCartId=None)
+        # Carts written before versioning count as version 0.
+        del legacy["version"]
+        await carts.insert_one(legacy)
+
+        await cart_public_route.add_cart_item(
+            AddCartItemIn(guestCartId="guest-1", productId=second), None
+        )
+
+        await cart_public_route.merge_guest_cart(
+            MergeGuestCartIn(customerId="customer-1", guestCartId="guest-1"),
+            None,
+        )
+        await _drain()
+
+        cart = await carts.find_one({"customerId": "customer-1"})
+
+        assert cart["version"] == 1
+        assert [item["quantity"] for item in cart["items"]] == [1, 3]
+        # The merge drops the summary of the old lines; a read may
+        # have stored a new one since.
+        if "summary" in cart:
+            _assert_summary_matches_lines(cart)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await cart_public_route.update_cart_item(
+                UpdateCartItemIn(
+                    customerId="customer-1",
+                    productId=first,
+                    quantity=2,
+                    expectedVersion=0,
+                ),
+                None,
+            )
+
+        assert exc_info.value.status_code == 409
+
+    asyncio.run(_with_carts(catalog, scenario))
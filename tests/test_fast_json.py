@@ -0,0 +1,51 @@
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+
+def _product(product_id: ObjectId) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": product_id,
+        "name": "Oak frame",
+        "code": "PRD-1",
+        "status": "published",
+        "searchKeywords": ["frame", "oak", "prd"],
+        "createdAt": now,
+        "updatedAt": now,
+    }
+
+
+def test_product_page_serializes_raw_documents():
+    from app.modules.products.schemas.product import PaginatedProductsOut
+    from app.utils.fast_json import model_json_response
+
+    product_id = ObjectId()
+    response = model_json_response(
+        PaginatedProductsOut,
+        {"total": 1, "page": 1, "pageSize": 10, "items": [_product(product_id)]},
+    )
+
+    (item,) = json.loads(response.body)["items"]
+    assert item["id"] == str(product_id)
+    assert "_id" not in item
+    assert "searchKeywords" not in item
+
+
+def test_product_out_still_accepts_id():
+    from app.modules.products.schemas.product import ProductOut
+
+    document = _product(ObjectId())
+    document["id"] = str(document.pop("_id"))
+
+    assert ProductOut(**document).id == document["id"]
+
+
+def test_fast_json_response_encodes_bson_values():
+    from app.utils.fast_json import FastJSONResponse
+
+    product_id = ObjectId()
+    body = json.loads(FastJSONResponse({"_id": product_id, "at": datetime(2025, 1, 1)}).body)
+
+    assert body == {"_id": str(product_id), "at": "2025-01-01T00:00:00"}
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.db import indexes
+from app.db.indexes import IndexBuildError, IndexSpec
+
+
+class FakeCollection:
+    def __init__(self, failing: set[str]):
+        self.failing = failing
+        self.created: list[str] = []
+        self.existing: set[str] = {"products_text_search"}
+        self.dropped: list[str] = []
+
+    async def create_index(self, keys, name, **options):
+        if name in self.failing:
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+
+        self.created.append(name)
+
+    async def drop_index(self, name):
+        if name not in self.existing:
+            raise OperationFailure("index not found", code=27)
+
+        self.existing.discard(name)
+        self.dropped.append(name)
+
+
+class FakeDatabase:
+    def __init__(self, failing: set[str]):
+        self.collections: dict[str, FakeCollection] = {}
+        self.failing = failing
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection(self.failing))
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(indexes, "_index_registry", {})
+    monkeypatch.setattr(indexes, "_retired_indexes", {})
+
+    indexes.register_indexes(
+        "carts",
+        IndexSpec("carts_customer_unique", [("customerId", 1)], unique=True),
+        IndexSpec("carts_updated", [("updatedAt", 1)]),
+    )
+
+
+def test_failed_unique_index_fails_boot(registry):
+    database = FakeDatabase({"carts_customer_unique"})
+
+    with pytest.raises(IndexBuildError, match="carts.carts_customer_unique"):
+        asyncio.run(indexes.ensure_indexes(database))
+
+    # The other indexes are still applied before failing.
+    assert database["carts"].created == ["carts_updated"]
+
+
+def test_failed_plain_index_is_skipped(registry):
+    database = FakeDatabase({"carts_updated"})
+
+    asyncio.run(indexes.ensure_indexes(database))
+
+    assert database["carts"].created == ["carts_customer_unique"]
+
+
+def test_retired_indexes_are_dropped_once(registry):
+    indexes.retire_indexes("products", "products_text_search", "products_gone")
+    database = FakeDatabase(set())
+
+    asyncio.run(indexes.ensure_indexes(database))
+    asyncio.run(indexes.ensure_indexes(database))
+
+    assert database["products"].dropped == ["products_text_search"]
@@ -0,0 +1,19 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    from app.modules.invoice.invoice_routes import router
+
+    app = FastAPI()
+    app.include_router(router, prefix="/invoices")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": -5}, {"page": 0}])
+def test_invalid_page_parameters_are_rejected(client, params):
+    response = client.get("/invoices", params=params)
+
+    assert response.status_code == 422
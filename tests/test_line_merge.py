@@ -0,0 +1,94 @@
+"""
+Field rules of LineMerge. The pipeline cases need MongoDB
+(MONGO_TEST_URL).
+"""
+
+import asyncio
+import os
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db import line_merge
+from app.db.line_merge import LineMerge
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+needs_mongo = pytest.mark.skipif(
+    not MONGO_TEST_URL,
+    reason="MONGO_TEST_URL is not set",
+)
+
+DETAILS = {"engraving": "For Asha"}
+
+EMPTY_DETAILS = [None, "", {}, []]
+
+
+def _merge(collection=None) -> LineMerge:
+    return LineMerge(
+        collection,
+        quantity_field="quantity",
+        max_quantity=999,
+        keep_fields=("customizedDetails",),
+    )
+
+
+@pytest.mark.parametrize("empty", EMPTY_DETAILS)
+def test_collapse_fills_empty_keep_fields(empty):
+    lines = _merge().collapse(
+        [
+            {"productId": "p1", "quantity": 1, "customizedDetails": empty},
+            {"productId": "p1", "quantity": 2, "customizedDetails": DETAILS},
+        ]
+    )
+
+    assert lines == [{"productId": "p1", "quantity": 3, "customizedDetails": DETAILS}]
+
+
+@needs_mongo
+@pytest.mark.parametrize("empty", EMPTY_DETAILS)
+def test_pipeline_fills_empty_keep_fields_like_collapse(monkeypatch, empty):
+    async def no_transactions() -> bool:
+        return False
+
+    # Sessions come from the application client; this test has its own.
+    monkeypatch.setattr(line_merge, "supports_transactions", no_transactions)
+
+    async def scenario():
+        client = AsyncIOMotorClient(MONGO_TEST_URL)
+        collection = client[f"line_merge_{ObjectId()}"]["carts"]
+
+        try:
+            await collection.insert_many(
+                [
+                    {
+                        "guestCartId": "guest",
+                        "customerId": None,
+                        "items": [{"productId": "p1", "quantity": 2, "customizedDetails": DETAILS}],
+                    },
+                    {
+                        "guestCartId": None,
+                        "customerId": "customer",
+                        "items": [
+                            {"productId": "p1", "quantity": 1, "customizedDetails": empty},
+                            {"productId": "p2", "quantity": 1, "customizedDetails": {"size": "L"}},
+                        ],
+                    },
+                ]
+            )
+
+            return await _merge(collection).merge(
+                source_filter={"guestCartId": "guest", "customerId": None},
+                target_filter={"customerId": "customer", "guestCartId": None},
+            )
+        finally:
+            await client.drop_database(collection.database.name)
+            client.close()
+
+    cart = asyncio.run(scenario())
+
+    assert cart["items"] == [
+        {"productId": "p1", "quantity": 3, "customizedDetails": DETAILS},
+        {"productId": "p2", "quantity": 1, "customizedDetails": {"size": "L"}},
+    ]
@@ -0,0 +1,157 @@
+"""
+Mail outbox delivery against a local aiosmtpd server.
+
+Only the SMTP side is exercised: `send_batch` is what the outbox
+workers run on their thread, and its results decide whether a
+message is sent, retried or dropped.
+"""
+
+import socket
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+aiosmtpd_smtp = pytest.importorskip("aiosmtpd.smtp")
+
+from app.services.mail_outbox import _PooledSMTPConnection  # noqa: E402
+from app.services.mail_service import SMTPConfig  # noqa: E402
+
+
+class RecordingHandler:
+    """Accepts mail, except for recipients listed in `replies`."""
+
+    def __init__(self, replies=None):
+        self.replies = replies or {}
+        self.delivered: list[list[str]] = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.replies:
+            return self.replies[address]
+
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append(list(envelope.rcpt_tos))
+        return "250 Message accepted"
+
+
+class StubOutbox:
+    def __init__(self):
+        self.metrics = {"connectionsOpened": 0}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(handler, **kwargs):
+        controller = aiosmtpd_controller.Controller(
+            handler,
+            hostname="127.0.0.1",
+            port=_free_port(),
+            **kwargs,
+        )
+        controller.start()
+        servers.append(controller)
+        return controller
+
+    yield start
+
+    for controller in servers:
+        controller.stop()
+
+
+def make_connection(port: int, **config) -> _PooledSMTPConnection:
+    return _PooledSMTPConnection(
+        SMTPConfig(mode="local", host="127.0.0.1", port=port, timeout=5, **config),
+        StubOutbox(),
+    )
+
+
+def message(recipient: str) -> dict:
+    return {"subject": "Hello", "recipients": [recipient], "body": "Body"}
+
+
+def test_batch_is_sent_over_one_connection(smtp_server):
+    handler = RecordingHandler()
+    server = smtp_server(handler)
+    connection = make_connection(server.port)
+
+    results = connection.send_batch(
+        [message(f"user{index}@example.com") for index in range(5)]
+    )
+    results += connection.send_batch([message("late@example.com")])
+    connection.close()
+
+    assert results == [None] * 6
+    assert len(handler.delivered) == 6
+    assert connection.outbox.metrics["connectionsOpened"] == 1
+
+
+def test_rejected_recipient_fails_only_its_message(smtp_server):
+    handler = RecordingHandler({"bad@example.com": "550 No such user"})
+    server = smtp_server(handler)
+    connection = make_connection(server.port)
+
+    results = connection.send_batch(
+        [
+            message("first@example.com"),
+            message("bad@example.com"),
+            message("last@example.com"),
+        ]
+    )
+    connection.close()
+
+    assert results[0] is None
+    assert results[1][1] is True
+    assert results[2] is None
+    assert handler.delivered == [["first@example.com"], ["last@example.com"]]
+
+
+def test_temporary_recipient_rejection_is_retried(smtp_server):
+    handler = RecordingHandler({"busy@example.com": "451 Try again later"})
+    server = smtp_server(handler)
+    connection = make_connection(server.port)
+
+    results = connection.send_batch([message("busy@example.com")])
+    connection.close()
+
+    assert results[0][1] is False
+
+
+def test_login_failure_keeps_every_message_retryable(smtp_server):
+    def reject(server, session, envelope, mechanism, auth_data):
+        return aiosmtpd_smtp.AuthResult(success=False, handled=False)
+
+    server = smtp_server(
+        RecordingHandler(),
+        authenticator=reject,
+        auth_require_tls=False,
+    )
+    connection = make_connection(server.port, user="user", password="wrong")
+
+    results = connection.send_batch(
+        [message(f"user{index}@example.com") for index in range(3)]
+    )
+
+    assert len(results) == 3
+    assert all("535" in error for error, _ in results)
+    assert all(permanent is False for _, permanent in results)
+
+
+def test_refused_connection_keeps_every_message_retryable():
+    connection = make_connection(_free_port())
+
+    results = connection.send_batch(
+        [message(f"user{index}@example.com") for index in range(3)]
+    )
+
+    assert len(results) == 3
+    assert all(permanent is False for _, permanent in results)
@@ -0,0 +1,12 @@
+import pytest
+
+
+def test_incomplete_store_fails_at_instantiation():
+    from app.services.meal_plan_storage import MealPlanStore
+
+    class WeekOnlyStore(MealPlanStore):
+        async def get_weekly_meals(self, plan_id: str) -> list[dict]:
+            return []
+
+    with pytest.raises(TypeError, match="add_meal"):
+        WeekOnlyStore()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+def _meal(name: str) -> dict:
+    return {
+        "name": name,
+        "type": "Breakfast",
+        "servings": 1,
+        "cookingTime": 10,
+        "ingredients": ["besan", "onion"],
+    }
+
+
+def _feed_in_chunks(text: str, size: int = 7) -> list[dict]:
+    from app.services.meal_generator_service import MealStreamParser
+
+    parser = MealStreamParser()
+    meals = []
+    for start in range(0, len(text), size):
+        meals.extend(parser.feed(text[start:start + size]))
+    return meals
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        [_meal("Chilla"), _meal("Poha")],
+        {"meals": [_meal("Chilla"), _meal("Poha")]},
+        {"notes": ["low oil", "[no sugar]"], "mealPlan": [_meal("Chilla"), _meal("Poha")]},
+        {"days": [{"day": "Mon"}], "data": [_meal("Chilla"), _meal("Poha")], "extra": [{"x": 1}]},
+    ],
+)
+def test_parser_reads_the_same_meals_as_parse_meal_plan(document):
+    from app.services.meal_generator_service import parse_meal_plan
+
+    text = json.dumps(document)
+    expected = [meal.model_dump() for meal in parse_meal_plan(text)]
+
+    assert [meal["name"] for meal in _feed_in_chunks(text)] == [
+        meal["name"] for meal in expected
+    ]
+
+
+def test_parser_ignores_arrays_under_other_keys():
+    assert _feed_in_chunks(json.dumps({"days": [_meal("Chilla")]})) == []
+
+
+class _FakeCache:
+    def __init__(self):
+        self.stored = None
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, request, meals):
+        self.stored = meals
+
+
+def _chunk(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_semaphore_is_released_before_the_client_finishes_reading(monkeypatch):
+    from app.services import meal_generator_service as service
+
+    text = json.dumps({"meals": [_meal("Chilla"), _meal("Poha"), _meal("Upma")]})
+
+    async def chunks():
+        for start in range(0, len(text), 16):
+            yield _chunk(text[start:start + 16])
+
+    async def create(**kwargs):
+        return chunks()
+
+    cache = _FakeCache()
+    semaphore = asyncio.Semaphore(1)
+
+    monkeypatch.setattr(service, "meal_plan_cache", cache)
+    monkeypatch.setattr(service, "_openai_semaphore", semaphore)
+    monkeypatch.setattr(
+        service,
+        "client",
+        SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))),
+    )
+
+    async def scenario():
+        stream = service.stream_meal_plan({"days": 1})
+        first = await stream.__anext__()
+
+        # The client stalls after one meal; generation still completes.
+        await asyncio.gather(*service._stream_tasks)
+
+        assert first.name == "Chilla"
+        assert not semaphore.locked()
+        assert [meal["name"] for meal in cache.stored] == ["Chilla", "Poha", "Upma"]
+
+        assert [meal.name async for meal in stream] == ["Poha", "Upma"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,93 @@
+"""
+Query budget of the admin order listings.
+
+Set MONGO_TEST_URL (e.g. mongodb://localhost:27017) to run.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.db.query_metrics import command_metrics
+from app.modules.orders import orders_route
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+pytestmark = pytest.mark.skipif(
+    not MONGO_TEST_URL,
+    reason="MONGO_TEST_URL is not set",
+)
+
+ORDERS = 40
+
+# paginate (find + count), customers, invoices.
+PAGE_BUDGET = 4
+
+
+async def _with_orders(monkeypatch, scenario):
+    # The listener lets `track_queries` count this client's commands.
+    client = AsyncIOMotorClient(MONGO_TEST_URL, event_listeners=[command_metrics])
+    database = client[f"order_listing_{ObjectId()}"]
+
+    for name in ("orders", "customers", "invoices"):
+        monkeypatch.setattr(orders_route, f"{name}_collection", database[name])
+
+    try:
+        await _seed(database)
+        await scenario(database)
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+
+async def _seed(database) -> None:
+    now = datetime.now(timezone.utc)
+    customer_ids = [ObjectId() for _ in range(ORDERS // 2)]
+
+    await database["customers"].insert_many(
+        [{"_id": customer_id, "name": f"Customer {index}"} for index, customer_id in enumerate(customer_ids)]
+    )
+
+    orders = [
+        {
+            "_id": ObjectId(),
+            "orderCode": f"ORD-{index}",
+            "customerId": str(customer_ids[index % len(customer_ids)]),
+            "items": [{"productId": "p1"}],
+            "totalAmount": 100.0,
+            "orderStatus": "pending",
+            "createdAt": now - timedelta(minutes=index),
+        }
+        for index in range(ORDERS)
+    ]
+    await database["orders"].insert_many(orders)
+
+    # Two invoices per order; the newer one is paid.
+    await database["invoices"].insert_many(
+        [
+            {
+                "orderIds": [order["_id"]],
+                "paymentStatus": status,
+                "createdAt": now - timedelta(minutes=age),
+            }
+            for order in orders
+            for status, age in (("pending", 10), ("paid", 1))
+        ]
+    )
+
+
+@pytest.mark.parametrize("page_size", [5, 20, 40])
+def test_order_page_costs_the_same_commands_at_any_size(monkeypatch, query_budget, page_size):
+    async def scenario(database):
+        with query_budget(PAGE_BUDGET):
+            result = await orders_route.list_orders(pageSize=page_size)
+
+        assert len(result["items"]) == page_size
+        assert all(item.paymentStatus == "paid" for item in result["items"])
+        assert all(item.customerName.startswith("Customer") for item in result["items"])
+
+    asyncio.run(_with_orders(monkeypatch, scenario))
@@ -0,0 +1,33 @@
+from app.modules.products.service.product_cache import _is_stock_update
+
+
+def update(*fields: str, removed=()) -> dict:
+    return {
+        "operationType": "update",
+        "updateDescription": {
+            "updatedFields": {field: 1 for field in fields},
+            "removedFields": list(removed),
+            "truncatedArrays": [],
+        },
+    }
+
+
+def test_stock_reservation_is_not_a_product_edit():
+    assert _is_stock_update(
+        update(
+            "inventory.quantityInShelf",
+            "inventory.quantity",
+            "inventory.holds",
+            "stockUpdatedAt",
+        )
+    )
+
+
+def test_product_edit_is_invalidated():
+    assert not _is_stock_update(update("inventory.quantity", "price", "updatedAt"))
+    assert not _is_stock_update(update("stockUpdatedAt", removed=["name"]))
+
+
+def test_replace_and_delete_are_invalidated():
+    assert not _is_stock_update({"operationType": "replace"})
+    assert not _is_stock_update({"operationType": "delete"})
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import re
+
+import pytest
+from bson import ObjectId
+from bson.regex import Regex
+
+from app.modules.products.service.product_search import (
+    SEARCH_KEYWORDS_FIELD,
+    build_search_filter,
+    build_search_score,
+    search_keywords,
+)
+from app.utils.pagination import paginate
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+PRODUCT = {
+    "name": "Walnut Frame, Large",
+    "code": "PRD-20250812-49301",
+    "tags": ["Gift", "wall-art"],
+    "categories": ["Frames"],
+}
+
+
+def matches(search: str, product: dict = PRODUCT) -> bool:
+    """Evaluate a search filter against a product the way MongoDB would."""
+    condition = build_search_filter(search)["searchKeywords"]
+    keywords = search_keywords(product)
+
+    if isinstance(condition, Regex):
+        prefixes = [condition]
+    elif "$all" in condition:
+        prefixes = condition["$all"]
+    else:
+        return False
+
+    return all(
+        any(re.match(prefix.pattern, keyword) for keyword in keywords)
+        for prefix in prefixes
+    )
+
+
+def test_keywords_are_lower_cased_words_of_every_field():
+    assert search_keywords(PRODUCT) == [
+        "20250812",
+        "49301",
+        "art",
+        "frame",
+        "frames",
+        "gift",
+        "large",
+        "prd",
+        "wall",
+        "walnut",
+    ]
+
+
+def test_every_search_word_is_an_anchored_prefix():
+    for prefix in build_search_filter("Red  SHIR")["searchKeywords"]["$all"]:
+        assert prefix.pattern.startswith("^")
+        assert prefix.flags == 0
+
+
+def test_full_words_partial_words_and_codes_match():
+    assert matches("walnut")
+    assert matches("WALN")
+    assert matches("frame large")
+    assert matches("PRD-20250812-49301")
+    assert matches("4930")
+
+
+def test_every_word_must_match():
+    assert not matches("walnut shirt")
+    assert not matches("PRD-20250812-12345")
+
+
+def test_punctuation_only_matches_nothing():
+    assert build_search_filter("--") == {"searchKeywords": {"$in": []}}
+
+
+def test_punctuation_only_has_no_score():
+    assert build_search_score("--") is None
+
+
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="MONGO_TEST_URL is not set")
+def test_results_are_ranked_by_relevance():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    # Oldest first, so newest-first order alone would reverse them.
+    products = [
+        {"name": "Oak Shelf", "code": "PRD-1", "tags": ["oak", "oakwood"]},
+        {"name": "Oak Frame", "code": "PRD-2", "tags": []},
+        {"name": "Oakwood Frame", "code": "PRD-3", "tags": []},
+    ]
+
+    async def scenario():
+        client = AsyncIOMotorClient(MONGO_TEST_URL)
+        collection = client[f"product_search_{ObjectId()}"]["products"]
+
+        try:
+            await collection.insert_many(
+                [
+                    {**product, "createdAt": index, SEARCH_KEYWORDS_FIELD: search_keywords(product)}
+                    for index, product in enumerate(products)
+                ]
+            )
+
+            result = await paginate(
+                collection,
+                build_search_filter("oak"),
+                score=build_search_score("oak"),
+            )
+            return [item["name"] for item in result["items"]], result["total"]
+        finally:
+            await client.drop_database(collection.database.name)
+            client.close()
+
+    names, total = asyncio.run(scenario())
+
+    # Exact name word and two keywords, exact name word, prefix only.
+    assert names == ["Oak Shelf", "Oak Frame", "Oakwood Frame"]
+    assert total == 3
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.db.query_metrics import CommandMetrics, track_queries
+
+REPLY = {"cursor": {"firstBatch": [{"_id": index, "name": "x" * 100} for index in range(50)]}, "ok": 1}
+
+
+def run_command(metrics: CommandMetrics, request_id: int) -> None:
+    metrics.started(
+        SimpleNamespace(
+            request_id=request_id,
+            connection_id=("localhost", 27017),
+            command_name="find",
+            command={"find": "products", "filter": {"status": "published"}},
+        )
+    )
+    metrics.succeeded(
+        SimpleNamespace(
+            request_id=request_id,
+            connection_id=("localhost", 27017),
+            command_name="find",
+            duration_micros=1500,
+            reply=REPLY,
+        )
+    )
+
+
+def test_commands_are_attributed_to_the_tracking_block():
+    metrics = CommandMetrics(slow_command_ms=1000)
+
+    run_command(metrics, 1)
+
+    with track_queries() as queries:
+        run_command(metrics, 2)
+        run_command(metrics, 3)
+
+    assert queries.count == 2
+    assert queries.commands == {"find": 2}
+    assert queries.duration_ms == pytest.approx(3.0)
+
+
+def test_reply_bytes_are_only_counted_when_enabled():
+    with track_queries() as default:
+        run_command(CommandMetrics(slow_command_ms=1000), 1)
+
+    with track_queries() as counted:
+        run_command(CommandMetrics(slow_command_ms=1000, count_bytes=True), 1)
+
+    assert default.bytes == 0
+    assert counted.bytes > 5000
+
+
+def test_query_budget_fails_when_exceeded(query_budget):
+    metrics = CommandMetrics(slow_command_ms=1000)
+
+    with query_budget(2):
+        run_command(metrics, 1)
+        run_command(metrics, 2)
+
+    with pytest.raises(AssertionError, match="3 MongoDB commands, budget is 2"):
+        with query_budget(2):
+            for request_id in range(3):
+                run_command(metrics, request_id)
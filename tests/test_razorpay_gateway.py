@@ -0,0 +1,186 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeRazorpay(ThreadingHTTPServer):
+    """
+    Minimal Razorpay API: order create and payment fetch, with a
+    configurable response delay. Counts TCP connections so tests can
+    check keep-alive reuse.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = 0.0
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        time.sleep(self.server.delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except OSError:
+            # The client timed out and went away.
+            pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        data = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append(("POST", self.path))
+
+        if self.path == "/v1/orders":
+            self._reply(200, {"id": "order_fake1", "entity": "order", "status": "created", **data})
+        else:
+            self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "not found"}})
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+
+        if self.path.startswith("/v1/payments/"):
+            payment_id = self.path.rsplit("/", 1)[-1]
+            self._reply(200, {"id": payment_id, "entity": "payment", "status": "captured"})
+        else:
+            self._reply(404, {"error": {"code": "BAD_REQUEST_ERROR", "description": "not found"}})
+
+
+@pytest.fixture
+def fake_razorpay():
+    server = FakeRazorpay()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def gateway_for(fake_razorpay):
+    from app.modules.website.order.services.razorpay_gateway import RazorpayGateway
+
+    gateways = []
+
+    def build(max_workers: int = 4, timeout_seconds: float = 2.0) -> RazorpayGateway:
+        gateway = RazorpayGateway(
+            key_id="rzp_test_key",
+            key_secret="secret",
+            max_workers=max_workers,
+            timeout_seconds=timeout_seconds,
+            base_url=fake_razorpay.base_url,
+        )
+        gateways.append(gateway)
+        return gateway
+
+    yield build
+
+    for gateway in gateways:
+        gateway.shutdown()
+
+
+def test_order_and_payment_round_trip(fake_razorpay, gateway_for):
+    gateway = gateway_for()
+
+    async def scenario():
+        order = await gateway.create_order({"amount": 49900, "currency": "INR"})
+        payment = await gateway.fetch_payment("pay_fake1")
+        return order, payment
+
+    order, payment = asyncio.run(scenario())
+
+    assert order["id"] == "order_fake1"
+    assert order["amount"] == 49900
+    assert payment == {"id": "pay_fake1", "entity": "payment", "status": "captured"}
+    assert fake_razorpay.requests == [("POST", "/v1/orders"), ("GET", "/v1/payments/pay_fake1")]
+
+    stats = gateway.stats()
+    assert stats["order.create"]["outcomes"] == {"ok": 1}
+    assert stats["payment.fetch"]["outcomes"] == {"ok": 1}
+
+
+def test_slow_calls_do_not_block_the_event_loop(fake_razorpay, gateway_for):
+    fake_razorpay.delay = 0.3
+    gateway = gateway_for(max_workers=4)
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        await asyncio.gather(*(gateway.fetch_payment(f"pay_{index}") for index in range(4)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await ticking
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(scenario())
+
+    # Four 300 ms calls overlap on the pool instead of running back
+    # to back, and the loop keeps serving other work meanwhile.
+    assert elapsed < 0.9
+    assert ticks >= 10
+
+
+def test_connections_are_reused(fake_razorpay, gateway_for):
+    gateway = gateway_for(max_workers=2)
+
+    async def scenario():
+        for index in range(10):
+            await gateway.fetch_payment(f"pay_{index}")
+
+    asyncio.run(scenario())
+
+    assert len(fake_razorpay.requests) == 10
+    assert fake_razorpay.connections == 1
+
+
+def test_slow_gateway_times_out(fake_razorpay, gateway_for):
+    from app.modules.website.order.services.razorpay_gateway import RazorpayGatewayTimeout
+
+    fake_razorpay.delay = 1.0
+    gateway = gateway_for(timeout_seconds=0.2)
+
+    async def scenario():
+        start = time.perf_counter()
+        with pytest.raises(RazorpayGatewayTimeout):
+            await gateway.fetch_payment("pay_slow")
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1.0
+    assert gateway.stats()["payment.fetch"]["outcomes"] == {"timeout": 1}
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.modules.website.auth import auth
+from app.services.auth import token_service
+
+
+class MemoryRevocationStore:
+    """In-memory stand-in for `token_revocation`."""
+
+    def __init__(self):
+        self.revoked: set[str] = set()
+
+    async def revoke(self, token_id: str, expires_at: datetime) -> bool:
+        if token_id in self.revoked:
+            return False
+
+        self.revoked.add(token_id)
+        return True
+
+    async def is_revoked(self, token_ids) -> bool:
+        return any(token_id in self.revoked for token_id in token_ids if token_id)
+
+
+@pytest.fixture
+def revocation_store(monkeypatch):
+    store = MemoryRevocationStore()
+    monkeypatch.setattr(token_service, "token_revocation", store)
+    return store
+
+
+def refresh(refresh_token: str) -> dict:
+    return asyncio.run(
+        auth.refresh_token(
+            auth.RefreshTokenRequest(refresh_token=refresh_token)
+        )
+    )
+
+
+def test_refresh_rotates_the_refresh_token(revocation_store):
+    tokens = token_service.create_auth_tokens(customer_id="customer-1")
+
+    result = refresh(tokens["refresh_token"])
+
+    assert result["access_token"]
+    assert result["refresh_token"] != tokens["refresh_token"]
+
+
+def test_replayed_refresh_token_is_rejected_with_401(revocation_store):
+    tokens = token_service.create_auth_tokens(customer_id="customer-1")
+
+    refresh(tokens["refresh_token"])
+
+    with pytest.raises(HTTPException) as exc_info:
+        refresh(tokens["refresh_token"])
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid or expired refresh token."
+
+
+def test_unknown_refresh_token_is_rejected_with_401(revocation_store):
+    with pytest.raises(HTTPException) as exc_info:
+        refresh("not-a-token")
+
+    assert exc_info.value.status_code == 401
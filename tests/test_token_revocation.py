@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _RevokedTokens:
+    """Just enough of `revoked_tokens` for rebuild and sync."""
+
+    def __init__(self, count: int):
+        now = datetime.now(timezone.utc)
+        self.documents = [
+            {"_id": f"jti-{index}", "revokedAt": now, "expiresAt": now + timedelta(hours=1)}
+            for index in range(count)
+        ]
+        self.full_scans = 0
+
+    def find(self, query, projection=None):
+        if "expiresAt" in query:
+            self.full_scans += 1
+        return _Cursor(self.documents)
+
+
+def test_overfull_store_is_not_rebuilt_on_every_sync(monkeypatch):
+    from app.services.auth import token_revocation as module
+
+    collection = _RevokedTokens(count=50)
+    monkeypatch.setattr(module, "revoked_tokens_collection", collection)
+
+    store = module.TokenRevocationStore(capacity=10, error_rate=0.01, sync_interval_seconds=60)
+
+    async def scenario():
+        await store.rebuild()
+        for _ in range(3):
+            await store.sync()
+
+    asyncio.run(scenario())
+
+    assert collection.full_scans == 1
+    assert store._filter.capacity == 100
+    assert all(document["_id"] in store._filter for document in collection.documents)